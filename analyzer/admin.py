@@ -1,3 +1,48 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AnalysisJob, StoredTranscript, ApiQuotaDay, ApiQuotaUsage, AnalysisLease, VideoAnalysis, CommentAggregate
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'user', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'started_at', 'heartbeat_at', 'finished_at')
+
+
+@admin.register(StoredTranscript)
+class StoredTranscriptAdmin(admin.ModelAdmin):
+    list_display = ('video_id', 'title', 'word_count', 'created_at')
+    search_fields = ('video_id', 'title')
+    exclude = ('text',)
+
+
+@admin.register(ApiQuotaDay)
+class ApiQuotaDayAdmin(admin.ModelAdmin):
+    list_display = ('day', 'units_used')
+
+
+@admin.register(ApiQuotaUsage)
+class ApiQuotaUsageAdmin(admin.ModelAdmin):
+    list_display = ('day', 'call_type', 'priority', 'units', 'calls')
+    list_filter = ('day', 'priority')
+
+
+@admin.register(AnalysisLease)
+class AnalysisLeaseAdmin(admin.ModelAdmin):
+    list_display = ('key', 'status', 'owner', 'expires_at', 'updated_at')
+    list_filter = ('status',)
+    exclude = ('result',)
+
+
+@admin.register(VideoAnalysis)
+class VideoAnalysisAdmin(admin.ModelAdmin):
+    list_display = ('video_id', 'title', 'analyzer_version', 'created_at', 'updated_at')
+    list_filter = ('analyzer_version',)
+    search_fields = ('video_id', 'title')
+
+
+@admin.register(CommentAggregate)
+class CommentAggregateAdmin(admin.ModelAdmin):
+    list_display = ('video_id', 'total_comments', 'understanding_count', 'confusion_count', 'newest_published_at', 'updated_at')
+    search_fields = ('video_id',)
@@ -0,0 +1,297 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from analyzer.services.analysis_store import AnalysisStore, transcript_hash
+from analyzer.services.analysis_executor import AnalysisExecutor
+from analyzer.services.quota_governor import QuotaExceeded, PRIORITY_BATCH
+from analyzer.services.video_pipeline import VideoPipeline
+from analyzer.utils.youtube import extract_video_id, parse_duration
+
+
+class Command(BaseCommand):
+    help = (
+        'Analyze many videos offline: reads video IDs/URLs from a file (or stdin), '
+        'writes one JSON result per line and can resume from its checkpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input',
+            nargs='?',
+            default='-',
+            help='File with one video ID or URL per line ("-" or omitted reads stdin)'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            required=True,
+            help='JSONL file to append results to'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file of finished video IDs (default: <output>.checkpoint)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Maximum concurrent metadata/transcript fetches'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 2,
+            help='Worker processes for transcript analysis'
+        )
+        parser.add_argument(
+            '--index',
+            action='store_true',
+            help='Also chunk + embed each transcript into the vector store'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Stop after this many new videos (0 = no limit)'
+        )
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint'] or f"{options['output']}.checkpoint"
+        done = self._load_checkpoint(checkpoint_path)
+
+        video_ids, invalid = self._read_video_ids(options['input'], done)
+        if options['limit']:
+            video_ids = video_ids[:options['limit']]
+
+        for line in invalid:
+            self.stderr.write(f"Skipping invalid video URL/ID: {line[:80]}")
+        self.stdout.write(
+            f"📋 {len(video_ids)} videos to analyze "
+            f"({len(done)} already done, {len(invalid)} invalid)"
+        )
+        if not video_ids:
+            return
+
+        try:
+            VideoPipeline(priority=PRIORITY_BATCH).get_youtube()
+        except ValueError as e:
+            raise CommandError(str(e))
+        # googleapiclient clients are not thread-safe: one pipeline per fetch thread
+        self._local = threading.local()
+
+        rag_service = None
+        if options['index']:
+            from analyzer.services.rag_service import RAGService
+            rag_service = RAGService()
+            if not getattr(settings, 'CHROMA_PERSIST_DIR', ''):
+                self.stderr.write('⚠️ CHROMA_PERSIST_DIR is not set - the index will not outlive this command')
+
+        # Videos this analyzer version already analyzed skip the process pool
+        store = AnalysisStore()
+
+        stats = {
+            'ok': 0,
+            'cached': 0,
+            'failed': 0,
+            'words': 0,
+            'fetch_seconds': 0.0,
+            'analysis_seconds': 0.0,
+            'quota_exhausted': False,
+        }
+        started = time.perf_counter()
+
+        with open(options['output'], 'a', encoding='utf-8') as output, \
+                open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+                ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as fetch_pool, \
+                AnalysisExecutor(max(1, options['processes'])).start() as analysis_pool:
+
+            def record(result):
+                output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                output.flush()
+                checkpoint.write(f"{result['video_id']}\t{result['status']}\n")
+                checkpoint.flush()
+                stats['ok' if result['status'] == 'ok' else 'failed'] += 1
+
+                total = stats['ok'] + stats['failed']
+                if total % 25 == 0:
+                    self._print_summary(stats, started, prefix=f"… {total}/{len(video_ids)}")
+
+            def finish(fetched, analysis, topics):
+                if rag_service is not None:
+                    self._index(rag_service, fetched)
+
+                stats['words'] += fetched['transcript'].word_count
+                record({
+                    'video_id': fetched['video_id'],
+                    'status': 'ok',
+                    'title': fetched['title'],
+                    'channel': fetched['channel'],
+                    'duration_minutes': fetched['duration_minutes'],
+                    'word_count': fetched['transcript'].word_count,
+                    'skill_level': analysis['skill_level'],
+                    'analysis': analysis,
+                    'topics': topics,
+                })
+
+            pending_ids = iter(video_ids)
+            fetching = {}
+            analyzing = {}
+            # Keep the window bounded so thousands of IDs don't sit in memory at once
+            max_fetching = max(1, options['concurrency'])
+            max_analyzing = max(1, options['processes']) * 2
+
+            def fill_fetch_window():
+                # Once the batch share of the daily quota is gone, stop; a rerun resumes tomorrow
+                while (not stats['quota_exhausted'] and len(fetching) < max_fetching
+                       and len(analyzing) < max_analyzing):
+                    video_id = next(pending_ids, None)
+                    if video_id is None:
+                        return
+                    fetching[fetch_pool.submit(self._fetch, video_id)] = video_id
+
+            fill_fetch_window()
+            while fetching or analyzing:
+                finished, _ = wait(list(fetching) + list(analyzing), return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    if future in fetching:
+                        video_id = fetching.pop(future)
+                        try:
+                            fetched = future.result()
+                        except QuotaExceeded as e:
+                            if not stats['quota_exhausted'] and 'daily' in str(e).lower():
+                                stats['quota_exhausted'] = True
+                                self.stderr.write(f"⛔ {e} - stopping; rerun to resume")
+                            record({'video_id': video_id, 'status': 'error', 'stage': 'quota', 'error': str(e)[:300]})
+                            continue
+                        except Exception as e:
+                            record({'video_id': video_id, 'status': 'error', 'stage': 'fetch', 'error': str(e)[:300]})
+                            continue
+
+                        stats['fetch_seconds'] += fetched['fetch_seconds']
+                        fetched['transcript_hash'] = transcript_hash(fetched['transcript'].text)
+                        stored = store.get(video_id, fetched['transcript_hash'])
+                        if stored and stored['analysis'] and stored['topics'] is not None:
+                            stats['cached'] += 1
+                            finish(fetched, stored['analysis'], stored['topics'])
+                            continue
+
+                        analyzing[analysis_pool.submit(
+                            video_id, fetched['title'], fetched['transcript']
+                        )] = fetched
+                    else:
+                        fetched = analyzing.pop(future)
+                        try:
+                            analyzed = future.result()
+                        except Exception as e:
+                            record({'video_id': fetched['video_id'], 'status': 'error', 'stage': 'analysis', 'error': str(e)[:300]})
+                            continue
+
+                        store.save(
+                            fetched['video_id'], fetched['transcript_hash'], title=fetched['title'],
+                            analysis=analyzed['analysis'], topics=analyzed['topics']
+                        )
+                        stats['analysis_seconds'] += analyzed['analysis_seconds']
+                        finish(fetched, analyzed['analysis'], analyzed['topics'])
+
+                fill_fetch_window()
+
+        self._print_summary(stats, started, prefix='✅ Done')
+
+    def _fetch(self, video_id):
+        """Fetch metadata and transcript for one video (runs in the fetch thread pool)"""
+        try:
+            return self._fetch_video(video_id)
+        finally:
+            # The quota governor uses the database: don't leave this thread's connection open
+            connections.close_all()
+
+    def _fetch_video(self, video_id):
+        started = time.perf_counter()
+
+        pipeline = getattr(self._local, 'pipeline', None)
+        if pipeline is None:
+            pipeline = self._local.pipeline = VideoPipeline(priority=PRIORITY_BATCH)
+
+        video = pipeline.fetch_video(video_id)
+        if not video:
+            raise ValueError('Video not found (private, deleted or region-locked)')
+        # IngestedTranscript: text + compact arrays, cheap to pickle into the pool
+        transcript = pipeline.fetch_transcript(video_id)
+
+        return {
+            'video_id': video_id,
+            'title': video['snippet']['title'],
+            'channel': video['snippet']['channelTitle'],
+            'duration_minutes': parse_duration(video['contentDetails']['duration']),
+            'transcript': transcript,
+            'fetch_seconds': time.perf_counter() - started,
+        }
+
+    def _index(self, rag_service, fetched):
+        try:
+            rag_service.process_transcript(
+                fetched['transcript'].text,
+                fetched['video_id'],
+                fetched['duration_minutes']
+            )
+        except Exception as e:
+            self.stderr.write(f"⚠️ Indexing failed for {fetched['video_id']}: {e}")
+
+    def _load_checkpoint(self, path):
+        """Video IDs that already finished successfully in an earlier run"""
+        if not os.path.exists(path):
+            return set()
+
+        done = set()
+        with open(path, encoding='utf-8') as checkpoint:
+            for line in checkpoint:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) == 2 and parts[1] == 'ok':
+                    done.add(parts[0])
+        return done
+
+    def _read_video_ids(self, source, done):
+        """Parse IDs/URLs, dropping blanks, comments, duplicates and finished videos"""
+        stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+        video_ids = []
+        invalid = []
+        seen = set(done)
+
+        try:
+            for line in stream:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+
+                video_id = extract_video_id(line)
+                if not video_id:
+                    invalid.append(line)
+                elif video_id not in seen:
+                    seen.add(video_id)
+                    video_ids.append(video_id)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        return video_ids, invalid
+
+    def _print_summary(self, stats, started, prefix):
+        elapsed = time.perf_counter() - started
+        processed = stats['ok'] + stats['failed']
+        per_minute = processed / elapsed * 60 if elapsed else 0
+        words_per_second = stats['words'] / elapsed if elapsed else 0
+        avg_fetch = stats['fetch_seconds'] / processed if processed else 0
+        analyzed = stats['ok'] - stats['cached']
+        avg_analysis = stats['analysis_seconds'] / analyzed if analyzed else 0
+
+        self.stdout.write(
+            f"{prefix}: {stats['ok']} ok ({stats['cached']} stored), {stats['failed']} failed in {elapsed:.1f}s | "
+            f"{per_minute:.1f} videos/min, {words_per_second:,.0f} words/s | "
+            f"avg fetch {avg_fetch:.2f}s, avg analysis {avg_analysis:.2f}s"
+        )
@@ -0,0 +1,109 @@
+import logging
+import multiprocessing
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_main(worker_index, poll_interval, stale_after_seconds, exit_when_idle):
+    """Entry point of each worker process"""
+    import django
+    from django.apps import apps
+
+    # Spawned (non-forked) children start with an empty app registry
+    if not apps.ready:
+        django.setup()
+
+    from analyzer.services.job_queue import JobWorker
+    from analyzer.services.nlp_resources import preload
+
+    # Pay NLTK loading once here rather than inside the first job
+    preload()
+
+    worker = JobWorker(
+        poll_interval=poll_interval,
+        stale_after=timedelta(seconds=stale_after_seconds)
+    )
+    logger.info("🚀 Analysis worker %d started (%s)", worker_index, worker.worker_id)
+    try:
+        worker.run_forever(exit_when_idle=exit_when_idle)
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Process queued video analysis/comparison jobs using a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=getattr(settings, 'ANALYSIS_WORKER_PROCESSES', 2),
+            help='Number of worker processes to run in parallel'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between queue polls when idle'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Requeue running jobs with no heartbeat for this many seconds'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+
+        # Results of older analyzer code are never read again
+        from analyzer.services.analysis_store import AnalysisStore
+        purged = AnalysisStore().purge_stale()
+        if purged:
+            self.stdout.write(f'Removed {purged} analyses stored by older analyzer versions')
+        from analyzer.services.single_flight import SingleFlight
+        SingleFlight.purge_expired()
+        from analyzer.services.transcript_store import TranscriptStore
+        TranscriptStore().purge_expired()
+
+        worker_args = (
+            options['poll_interval'],
+            options['stale_after'],
+            options['once'],
+        )
+
+        if processes == 1:
+            _worker_main(0, *worker_args)
+            return
+
+        # Children must open their own database connections
+        from django.db import connections
+        connections.close_all()
+
+        # Not daemonic: each worker starts its own AnalysisExecutor pool (ANALYSIS_POOL_SIZE),
+        # and daemonic processes may not have children. Ctrl-C still stops them below.
+        workers = [
+            multiprocessing.Process(target=_worker_main, args=(index, *worker_args), daemon=False)
+            for index in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        self.stdout.write(self.style.SUCCESS(f'Started {processes} analysis workers'))
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping analysis workers...')
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from .services import stage_timing
+
+
+class StageTimingMiddleware:
+    """
+    Times each request and its pipeline stages: adds a Server-Timing header
+    and feeds the histograms served at /metrics. Removed from the middleware
+    chain entirely unless METRICS_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings, token = stage_timing.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stage_timing.finish_request(token)
+        total = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unmatched'
+        stage_timing.REGISTRY.observe_request(view, request.method, response.status_code, total)
+        response['Server-Timing'] = stage_timing.server_timing(timings, total)
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('handle', models.CharField(max_length=64, unique=True)),
+                ('video_id', models.CharField(db_index=True, max_length=20)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('text', models.TextField()),
+                ('word_count', models.PositiveIntegerField(default=0)),
+                ('duration_minutes', models.FloatField(default=60)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'text_hash'), name='unique_transcript_per_video')],
+            },
+        ),
+    ]
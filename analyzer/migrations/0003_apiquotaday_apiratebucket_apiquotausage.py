@@ -0,0 +1,45 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0002_storedtranscript'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiQuotaDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('units_used', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ApiRateBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.FloatField()),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ApiQuotaUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('call_type', models.CharField(max_length=50)),
+                ('priority', models.CharField(max_length=20)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('calls', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'call_type', 'priority'), name='unique_quota_usage_row')],
+            },
+        ),
+    ]
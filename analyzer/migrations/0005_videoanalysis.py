@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_analysislease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(db_index=True, max_length=20)),
+                ('transcript_hash', models.CharField(max_length=64)),
+                ('analyzer_version', models.CharField(max_length=64)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('analysis', models.JSONField(blank=True, null=True)),
+                ('topics', models.JSONField(blank=True, null=True)),
+                ('chapters', models.JSONField(blank=True, null=True)),
+                ('comments', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'transcript_hash', 'analyzer_version'), name='unique_analysis_per_transcript_version')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_videoanalysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=20, unique=True)),
+                ('scoring_version', models.CharField(max_length=32)),
+                ('total_comments', models.PositiveIntegerField(default=0)),
+                ('understanding_count', models.PositiveIntegerField(default=0)),
+                ('confusion_count', models.PositiveIntegerField(default=0)),
+                ('sample_comments', models.JSONField(blank=True, default=list)),
+                ('newest_comment_id', models.CharField(blank=True, max_length=64)),
+                ('newest_published_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-19 02:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_commentaggregate'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='videoanalysis',
+            name='comments',
+        ),
+    ]
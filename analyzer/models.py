@@ -1,3 +1,222 @@
+import uuid
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class AnalysisJob(models.Model):
+    """A queued video analysis or comparison, processed by `manage.py run_analysis_worker`"""
+
+    KIND_ANALYZE = 'analyze'
+    KIND_COMPARE = 'compare'
+    KIND_CHOICES = [
+        (KIND_ANALYZE, 'Single video analysis'),
+        (KIND_COMPARE, 'Video comparison'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='analysis_jobs'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+
+    # Inputs, and a hash of them so identical requests can reuse a finished result
+    payload = models.JSONField(default=dict)
+    cache_key = models.CharField(max_length=64, db_index=True)
+
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    def to_status_dict(self):
+        """Compact status payload for the polling/streaming endpoints"""
+        return {
+            'id': str(self.id),
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.progress_message,
+            'error': self.error,
+            'finished': self.is_finished,
+            # Interim results a running job published (the comparison ranking so far)
+            'partial': self.result if not self.is_finished and self.result else None,
+        }
+
+
+class StoredTranscript(models.Model):
+    """Server-side copy of an analyzed transcript, referenced by an opaque handle"""
+
+    handle = models.CharField(max_length=64, unique=True)
+    video_id = models.CharField(max_length=20, db_index=True)
+    title = models.CharField(max_length=255, blank=True)
+    text_hash = models.CharField(max_length=64)
+    text = models.TextField()
+    word_count = models.PositiveIntegerField(default=0)
+    duration_minutes = models.FloatField(default=60)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video_id', 'text_hash'], name='unique_transcript_per_video'),
+        ]
+
+    def __str__(self):
+        return f"Transcript {self.video_id} ({self.word_count} words)"
+
+
+class ApiQuotaDay(models.Model):
+    """Total YouTube Data API units spent on one (Pacific time) quota day"""
+
+    day = models.DateField(unique=True)
+    units_used = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.units_used} units"
+
+
+class ApiQuotaUsage(models.Model):
+    """Per call type / priority breakdown of the daily spend"""
+
+    day = models.DateField()
+    call_type = models.CharField(max_length=50)
+    priority = models.CharField(max_length=20)
+    units = models.PositiveIntegerField(default=0)
+    calls = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'call_type', 'priority'], name='unique_quota_usage_row'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.call_type} ({self.priority}): {self.units} units"
+
+
+class ApiRateBucket(models.Model):
+    """Token bucket shared across processes; `version` guards concurrent refills"""
+
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField()  # Unix timestamp, comparable across processes
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.tokens:.1f} tokens"
+
+
+class AnalysisLease(models.Model):
+    """
+    Cross-process single-flight lock: the first process to create the row for a
+    key computes the result, the others wait for it and reuse `result`.
+    """
+
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    key = models.CharField(max_length=255, unique=True)
+    owner = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    expires_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
+
+
+class VideoAnalysis(models.Model):
+    """
+    Stored analysis of one transcript by one version of the analyzer code.
+    A new transcript or analyzer version gets a new row; old rows are never reused.
+    """
+
+    video_id = models.CharField(max_length=20, db_index=True)
+    transcript_hash = models.CharField(max_length=64)
+    analyzer_version = models.CharField(max_length=64)
+    title = models.CharField(max_length=255, blank=True)
+
+    analysis = models.JSONField(null=True, blank=True)
+    topics = models.JSONField(null=True, blank=True)
+    chapters = models.JSONField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['video_id', 'transcript_hash', 'analyzer_version'],
+                name='unique_analysis_per_transcript_version'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Analysis {self.video_id} ({self.analyzer_version})"
+
+
+class CommentAggregate(models.Model):
+    """
+    Running comment scores for one video. Re-analysis fetches only comments
+    newer than newest_published_at (time-ordered) and adds them to the counts.
+    """
+
+    video_id = models.CharField(max_length=20, unique=True)
+    # Keywords/scoring that produced the counts; a different version starts over
+    scoring_version = models.CharField(max_length=32)
+
+    total_comments = models.PositiveIntegerField(default=0)
+    understanding_count = models.PositiveIntegerField(default=0)
+    confusion_count = models.PositiveIntegerField(default=0)
+    sample_comments = models.JSONField(default=list, blank=True)
+
+    newest_comment_id = models.CharField(max_length=64, blank=True)
+    newest_published_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Comments {self.video_id} ({self.total_comments})"
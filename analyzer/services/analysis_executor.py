@@ -0,0 +1,120 @@
+# analyzer/services/analysis_executor.py
+#
+# CPU-bound transcript analysis (tokenization, readability, topics) runs in a
+# pool of worker processes instead of the request/job thread, so one long
+# comparison doesn't hold the GIL for everything else. Kept free of
+# module-level Django imports: the children only import the analyzers.
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .bulk_analysis import analyze_compact
+from .nlp_resources import preload
+
+logger = logging.getLogger(__name__)
+
+
+def pool_size():
+    """settings.ANALYSIS_POOL_SIZE worker processes; 0 analyzes in the calling process"""
+    from django.conf import settings
+    return max(0, getattr(settings, 'ANALYSIS_POOL_SIZE', 0))
+
+
+def _warm_up():
+    # Runs after preload(): only makes sure the child exists before real work arrives
+    return os.getpid()
+
+
+class AnalysisExecutor:
+    """
+    Runs `analyze_compact` (TranscriptAnalyzer + TopicDetector) in a persistent
+    process pool. Children load NLTK data once (preload) and are started up
+    front; inputs are IngestedTranscripts, which pickle as one string plus a
+    few arrays. With 0 processes everything runs inline.
+    """
+
+    def __init__(self, processes=None, mp_context=None):
+        self.processes = pool_size() if processes is None else max(0, processes)
+        # 'spawn' by default: forking a threaded web server can copy held locks
+        self.mp_context = mp_context or multiprocessing.get_context('spawn')
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def start(self):
+        """Create the pool and start every child now, rather than on the first analyses"""
+        with self._lock:
+            if self._pool is None and self.processes:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=self.mp_context, initializer=preload
+                )
+                warm_up = [self._pool.submit(_warm_up) for _ in range(self.processes)]
+            else:
+                warm_up = []
+        for future in warm_up:
+            future.result()
+        return self
+
+    def submit(self, video_id, title, transcript):
+        """Future for analyze_compact(video_id, title, transcript)"""
+        if not self.processes:
+            return self._inline(video_id, title, transcript)
+
+        if self._pool is None:
+            self.start()
+        try:
+            return self._pool.submit(analyze_compact, video_id, title, transcript)
+        except BrokenProcessPool:
+            # A child died (e.g. killed for memory): start a fresh pool for later calls
+            self._restart()
+            return self._inline(video_id, title, transcript)
+
+    def analyze(self, video_id, title, transcript):
+        """{'analysis', 'topics', 'word_count', 'analysis_seconds', ...} for one transcript"""
+        future = self.submit(video_id, title, transcript)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._restart()
+            return analyze_compact(video_id, title, transcript)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _restart(self):
+        self.shutdown(wait=False)
+        logger.warning("⚠️ Analysis worker process died - restarting the pool")
+
+    @staticmethod
+    def _inline(video_id, title, transcript):
+        future = Future()
+        try:
+            future.set_result(analyze_compact(video_id, title, transcript))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_executor():
+    """The process-wide executor (ANALYSIS_POOL_SIZE processes), created on first use"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AnalysisExecutor()
+            atexit.register(_shared.shutdown)
+    return _shared
@@ -1,54 +1,31 @@
-import nltk
-import textstat
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.corpus import stopwords
+import logging
 import re
+import string
+from itertools import count
+import numpy as np
+from .nlp_resources import english_stopwords, TECHNICAL_TERMS
+from .tokenized_transcript import TokenizedTranscript
+from .language_detection import detect_language
+from .readability import count_syllables, readability_scores
+from .transcript_ingest import IngestedTranscript
+
+logger = logging.getLogger(__name__)
+
+# Bump when analysis output changes, so coalesced/cached results aren't reused across versions
+ANALYSIS_VERSION = '3'
 
 class TranscriptAnalyzer:
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.technical_terms = self.load_technical_terms()
+        # Shared, immutable resources: no per-instance corpus reads
+        self.stop_words = english_stopwords()
+        self.technical_terms = TECHNICAL_TERMS
     
     def load_technical_terms(self):
-        # Basic programming terms - we can expand this later
-        terms = [
-            # Programming basics
-            'algorithm', 'variable', 'function', 'class', 'object', 
-            'loop', 'array', 'database', 'api', 'framework',
-            'syntax', 'compiler', 'interpreter', 'debugging',
-            
-            # Python specific
-            'python', 'django', 'flask', 'list', 'dictionary',
-            'tuple', 'module', 'package', 'import', 'def', 'class',
-            
-            # Common technical terms
-            'recursion', 'iteration', 'inheritance', 'polymorphism',
-            'abstraction', 'encapsulation', 'algorithm', 'complexity'
-        ]
-        return set(terms)
+        return TECHNICAL_TERMS
     
     def detect_language(self, text):
-        """Simple language detection"""
-        # Check for common Hindi words/characters
-        hindi_chars = ['़', 'ऽ', 'ा', 'ि', 'ी', 'ु', 'ू', 'े', 'ै', 'ो', 'ौ', 'ं', 'ः', 'ँ']
-        english_chars = sum(1 for char in text if 'a' <= char.lower() <= 'z')
-        
-        hindi_count = sum(1 for char in text if char in hindi_chars)
-        total_chars = len(text)
-        
-        if total_chars == 0:
-            return 'en'
-        
-        hindi_ratio = hindi_count / total_chars
-        
-        if hindi_ratio > 0.1:  # More than 10% Hindi characters = Hindi
-            return 'hi'
-        elif english_chars / total_chars > 0.5:  # More than 50% English = English
-            return 'en'
-        elif hindi_count > 0:  # Any Hindi characters present = Hindi
-            return 'hi'
-        else:
-            return 'en'  # Default to English
+        """Language code of the transcript ('en', 'hi', 'hinglish', ...)"""
+        return detect_language(text)
     
     def calculate_readability(self, text):
         """Calculate how easy the text is to read"""
@@ -56,27 +33,31 @@ class TranscriptAnalyzer:
             return 0
         
         try:
-            # Flesch Reading Ease: Higher = easier to read
-            # Note: Can produce negative values for extremely difficult text
-            flesch_score_raw = textstat.flesch_reading_ease(text)
-            
-            # Clamp to 0-100 range (Flesch formula can go negative for very technical content)
-            flesch_score = max(0, min(100, flesch_score_raw))
-            
-            # Flesch-Kincaid Grade Level: US grade level needed
-            fk_grade = textstat.flesch_kincaid_grade(text)
-            
-            # Use clamped score for display and interpretation
-            normalized_score = flesch_score
-            
-            return {
-                'flesch_score': round(flesch_score, 1),
-                'fk_grade': round(fk_grade, 1),
-                'normalized': round(normalized_score, 1),
-                'interpretation': self.interpret_readability(flesch_score)
-            }
-        except:
+            # Both Flesch metrics from one pass (optionally a stratified sample)
+            scores = readability_scores(text)
+        except Exception as e:
+            # E.g. missing corpus data: the rest of the analysis still runs, scored as before
+            logger.warning("⚠️ Readability unavailable: %.200s", e)
             return {'flesch_score': 0, 'fk_grade': 0, 'normalized': 0, 'interpretation': 'Not enough text'}
+        
+        # Flesch Reading Ease: Higher = easier to read
+        # Clamp to 0-100 range (Flesch formula can go negative for very technical content)
+        flesch_score = max(0, min(100, scores['flesch']))
+        
+        # Flesch-Kincaid Grade Level: US grade level needed
+        fk_grade = scores['fk_grade']
+        
+        results = {
+            'flesch_score': round(flesch_score, 1),
+            'fk_grade': round(fk_grade, 1),
+            'normalized': round(flesch_score, 1),
+            'interpretation': self.interpret_readability(flesch_score)
+        }
+        if scores['sampled']:
+            low, high = scores['flesch_ci']
+            results['flesch_ci'] = (round(max(0, low), 1), round(min(100, high), 1))
+            results['sampled_sentences'] = scores['sampled']
+        return results
     
     def interpret_readability(self, score):
         # Standard Flesch Reading Ease interpretation
@@ -95,12 +76,12 @@ class TranscriptAnalyzer:
         else:
             return "Very Difficult (Professional)"
     
-    def analyze_jargon(self, text):
+    def analyze_jargon(self, text, tokenized=None):
         """Analyze technical jargon density"""
-        words = word_tokenize(text.lower())
+        tokenized = tokenized or TokenizedTranscript(text)
         
-        # Remove punctuation and stop words
-        words_clean = [word for word in words if word.isalnum() and word not in self.stop_words]
+        # Punctuation and stop words already removed
+        words_clean = tokenized.content_words
         
         if not words_clean:
             return 0
@@ -135,8 +116,13 @@ class TranscriptAnalyzer:
             return {'words_per_minute': 0, 'pacing': 'Unknown'}
         
         # Calculate words per minute (approx)
-        total_words = sum(len(snippet.text.split()) for snippet in transcript_data)
-        total_minutes = transcript_data[-1].start / 60 if hasattr(transcript_data[-1], 'start') else 1
+        if hasattr(transcript_data, 'word_count'):
+            # IngestedTranscript: counted once at ingestion
+            total_words = transcript_data.word_count
+            total_minutes = transcript_data.last_start / 60
+        else:
+            total_words = sum(len(snippet.text.split()) for snippet in transcript_data)
+            total_minutes = transcript_data[-1].start / 60 if hasattr(transcript_data[-1], 'start') else 1
         
         if total_minutes == 0:
             total_minutes = 1
@@ -161,7 +147,81 @@ class TranscriptAnalyzer:
         else:
             return "Very Fast (Challenging to follow)"
     
-    def determine_skill_level(self, analysis_results):
+    def analyze_time_series(self, transcript_data, window_seconds=60, readability=True):
+        """
+        Words/minute, jargon density and readability per `window_seconds` window,
+        as parallel lists the templates can plot:
+        {'window_seconds', 'start', 'wpm', 'jargon', 'readability'}
+        """
+        if not transcript_data or len(transcript_data) < 10:
+            return None
+        if not hasattr(transcript_data, 'word_counts'):
+            transcript_data = IngestedTranscript.from_snippets(transcript_data)
+
+        starts = np.frombuffer(transcript_data.starts, dtype=np.float64)
+        ends = starts + np.frombuffer(transcript_data.durations, dtype=np.float64)
+        word_counts = np.frombuffer(transcript_data.word_counts, dtype=np.int64)
+
+        # Every word gets the id of its first occurrence, so the per-word features
+        # below are computed once per distinct word and then gathered
+        words = transcript_data.text.lower().split()
+        first_seen = {}
+        ids = np.fromiter(map(first_seen.setdefault, words, count()), dtype=np.int64, count=len(words))
+
+        syllables = np.zeros(len(words))
+        content = np.zeros(len(words))
+        technical = np.zeros(len(words))
+        sentence_ends = np.zeros(len(words))
+        for word, index in first_seen.items():
+            core = word.strip(string.punctuation)
+            if core.isalnum() and core not in self.stop_words:
+                content[index] = 1
+                technical[index] = core in self.technical_terms
+            if readability and core:
+                syllables[index] = count_syllables(core)
+                sentence_ends[index] = word[-1] in '.!?'
+
+        # Window of each word, via the window of its snippet
+        snippet_windows = (starts // window_seconds).astype(np.int64)
+        windows = int(snippet_windows.max()) + 1
+        word_windows = np.repeat(snippet_windows, word_counts)
+
+        def per_window(weights=None):
+            return np.bincount(word_windows, weights=weights, minlength=windows)
+
+        window_words = per_window().astype(float)
+        window_content = per_window(content[ids])
+
+        # The last window only lasts until the final snippet ends
+        spans = np.full(windows, float(window_seconds))
+        spans[-1] = np.clip(ends.max() - (windows - 1) * window_seconds, 1.0, window_seconds)
+
+        wpm = window_words * 60 / spans
+        jargon = np.divide(
+            per_window(technical[ids]) * 100, window_content,
+            out=np.zeros(windows), where=window_content > 0
+        )
+
+        curve = {
+            'window_seconds': window_seconds,
+            'start': (np.arange(windows) * window_seconds).tolist(),
+            'wpm': np.round(wpm).astype(int).tolist(),
+            'jargon': np.round(jargon, 1).tolist(),
+            'readability': None,
+        }
+        if readability:
+            # Same formula as readability.flesch_reading_ease, per window
+            safe_words = np.maximum(window_words, 1)
+            flesch = (
+                206.835
+                - 1.015 * window_words / np.maximum(per_window(sentence_ends[ids]), 1)
+                - 84.6 * per_window(syllables[ids]) / safe_words
+            )
+            curve['readability'] = np.round(np.where(window_words > 0, np.clip(flesch, 0, 100), 0), 1).tolist()
+        return curve
+    
+    @staticmethod
+    def determine_skill_level(analysis_results):
         """Determine if video is Beginner/Intermediate/Advanced using research-based thresholds"""
         readability = analysis_results.get('readability', {}).get('normalized', 0)
         jargon = analysis_results.get('jargon', {}).get('percentage', 0)
@@ -203,7 +263,8 @@ class TranscriptAnalyzer:
         else:  # 5 or below = advanced
             return "Advanced", score, "Designed for advanced learners"
     
-    def determine_hindi_skill_level(self, analysis_results):
+    @staticmethod
+    def determine_hindi_skill_level(analysis_results):
         """Special skill level determination for Hindi videos"""
         # Hindi videos often have different characteristics
         jargon = analysis_results.get('jargon', {}).get('percentage', 0)
@@ -237,8 +298,12 @@ class TranscriptAnalyzer:
         else:
             return "Advanced", score, "हिंदी ट्यूटोरियल - उन्नत स्तर के लिए"
     
-    def analyze_transcript(self, transcript_text, transcript_data):
-        """Main analysis function"""
+    def analyze_transcript(self, transcript_text, transcript_data, tokenized=None):
+        """
+        Main analysis function.
+        Pass `tokenized` to share one TokenizedTranscript with other stages (TopicDetector).
+        """
+        tokenized = tokenized or TokenizedTranscript(transcript_text)
         results = {}
         
         # 0. Detect language
@@ -257,7 +322,7 @@ class TranscriptAnalyzer:
             }
         
         # 2. Jargon analysis (adjust for non-English)
-        jargon_results = self.analyze_jargon(transcript_text)
+        jargon_results = self.analyze_jargon(transcript_text, tokenized)
         if language != 'en':
             jargon_results['level'] = f"Language: {language.upper()}"
         results['jargon'] = jargon_results
@@ -265,9 +330,12 @@ class TranscriptAnalyzer:
         # 3. Pacing analysis
         results['pacing'] = self.analyze_pacing(transcript_data)
         
+        # 3b. Per-minute curve (readability only meaningful for English)
+        results['curve'] = self.analyze_time_series(transcript_data, readability=language == 'en')
+        
         # 4. Determine skill level (adjust for non-English)
-        if language == 'hi':
-            # Hindi-specific analysis
+        if language in ('hi', 'hinglish'):
+            # Hindi-specific analysis (also for Romanized Hindi)
             level, score, explanation = self.determine_hindi_skill_level(results)
         else:
             level, score, explanation = self.determine_skill_level(results)
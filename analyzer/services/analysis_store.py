@@ -0,0 +1,79 @@
+# analyzer/services/analysis_store.py
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from ..models import VideoAnalysis
+from .analysis_service import ANALYSIS_VERSION
+
+# Modules whose code decides what an analysis contains: editing any of them
+# changes analyzer_version(), so results computed by older code are not reused
+ANALYZER_MODULES = (
+    'analysis_service.py',
+    'chapter_extractor.py',
+    'comments_analyzer.py',
+    'fast_tokenizer.py',
+    'keyword_matcher.py',
+    'language_detection.py',
+    'nlp_resources.py',
+    'readability.py',
+    'tokenized_transcript.py',
+    'topic_detector.py',
+    'transcript_ingest.py',
+)
+
+
+@lru_cache(maxsize=None)
+def analyzer_version():
+    """ANALYSIS_VERSION plus a hash of the analyzer source files, e.g. '3-1a2b3c4d5e6f'"""
+    digest = hashlib.sha256()
+    services = Path(__file__).resolve().parent
+    for name in ANALYZER_MODULES:
+        digest.update((services / name).read_bytes())
+    return f"{ANALYSIS_VERSION}-{digest.hexdigest()[:12]}"
+
+
+def transcript_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class AnalysisStore:
+    """
+    Analysis results kept per (video, transcript hash, analyzer version), so a
+    video analyzed or compared again skips the analyzers and comment fetches.
+    """
+
+    # Comment scores change as viewers post: they live in CommentAggregate, not here
+    FIELDS = ('analysis', 'topics', 'chapters')
+
+    def __init__(self, version=None):
+        self.version = version or analyzer_version()
+
+    def get(self, video_id, text_hash):
+        """Stored fields for this transcript ({'analysis': ..., 'topics': ..., ...}), or None"""
+        return VideoAnalysis.objects.filter(
+            video_id=video_id, transcript_hash=text_hash, analyzer_version=self.version
+        ).values(*self.FIELDS).first()
+
+    def save(self, video_id, text_hash, title='', **fields):
+        """Store (or add to) the results for this transcript; None values are left as they were"""
+        updates = {name: value for name, value in fields.items() if name in self.FIELDS and value is not None}
+        lookup = {'video_id': video_id, 'transcript_hash': text_hash, 'analyzer_version': self.version}
+
+        existing = VideoAnalysis.objects.filter(**lookup)
+        # QuerySet.update() skips auto_now: bump updated_at so the library index sees the change
+        if updates and existing.update(**updates, updated_at=timezone.now()) or not updates and existing.exists():
+            return
+
+        try:
+            with transaction.atomic():
+                VideoAnalysis.objects.create(title=title[:255], **lookup, **updates)
+        except IntegrityError:
+            # Another request stored this transcript first
+            VideoAnalysis.objects.filter(**lookup).update(**updates, updated_at=timezone.now())
+
+    def purge_stale(self):
+        """Delete results computed by other analyzer versions; returns how many"""
+        deleted, _ = VideoAnalysis.objects.exclude(analyzer_version=self.version).delete()
+        return deleted
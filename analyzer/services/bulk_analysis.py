@@ -0,0 +1,29 @@
+# analyzer/services/bulk_analysis.py
+#
+# Helpers for `manage.py analyze_bulk`. Everything run inside the process pool
+# lives here and avoids Django imports, so child processes start cheaply.
+import time
+from .analysis_service import TranscriptAnalyzer
+from .topic_detector import TopicDetector
+from .tokenized_transcript import TokenizedTranscript
+
+
+def analyze_compact(video_id, title, transcript):
+    """
+    Run TranscriptAnalyzer and TopicDetector on an IngestedTranscript.
+    Executed in a worker process; returns a JSON-serializable dict.
+    """
+    started = time.perf_counter()
+
+    # One tokenization shared by both stages
+    tokenized = TokenizedTranscript(transcript.text)
+    analysis = TranscriptAnalyzer().analyze_transcript(transcript.text, transcript, tokenized)
+    topics = TopicDetector().detect_topics(transcript.text, title, tokenized)
+
+    return {
+        'video_id': video_id,
+        'word_count': transcript.word_count,
+        'analysis': analysis,
+        'topics': topics,
+        'analysis_seconds': round(time.perf_counter() - started, 3),
+    }
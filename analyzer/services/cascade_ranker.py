@@ -0,0 +1,201 @@
+# analyzer/services/cascade_ranker.py
+#
+# Two-stage ranking for comparisons with many candidates. Every candidate is
+# screened on cheap signals - title keywords, the metadata duration and an
+# evenly spaced sample of the transcript (pacing, readability, jargon) -
+# and scored with calculate_recommendation_score. Only the top `finalists`
+# then get the full analyze_transcript + comments evaluation. No Django
+# imports: the benchmarks drive it directly.
+from functools import lru_cache
+from itertools import combinations
+from .analysis_service import TranscriptAnalyzer
+from .fast_tokenizer import regex_word_tokenize
+from .keyword_matcher import KeywordMatcher
+from .language_detection import detect_language
+from .nlp_resources import TECHNICAL_TERMS, english_stopwords
+from .readability import readability_scores
+from .recommendation import calculate_recommendation_score
+
+# Words of transcript read per candidate, in SAMPLE_SPANS evenly spaced stretches
+SAMPLE_WORDS = 600
+SAMPLE_SPANS = 6
+
+# Audience the title announces (KeywordMatcher syntax)
+BEGINNER_TITLE_TERMS = (
+    'beginner*', 'basics', 'introduction', 'intro', 'for dummies', 'from scratch', 'crash course',
+    'getting started', 'zero to hero', 'made easy', 'step by step', 'for absolute beginners',
+    'shuru se', 'aasan bhasha', 'asan bhasha',
+)
+ADVANCED_TITLE_TERMS = (
+    'advanced', 'deep dive', 'internals', 'under the hood', 'expert*', 'masterclass',
+    'optimi*', 'in depth', 'architecture',
+)
+
+
+@lru_cache(maxsize=None)
+def _title_matcher():
+    return KeywordMatcher((*BEGINNER_TITLE_TERMS, *ADVANCED_TITLE_TERMS))
+
+
+def title_level(title):
+    """'Beginner' or 'Advanced' when the title names only one of them, else None"""
+    found = set(_title_matcher().found((title or '').lower()))
+    beginner = any(term.lower() in found for term in BEGINNER_TITLE_TERMS)
+    advanced = any(term.lower() in found for term in ADVANCED_TITLE_TERMS)
+    if beginner != advanced:
+        return 'Beginner' if beginner else 'Advanced'
+    return None
+
+
+def transcript_sample(transcript, words=SAMPLE_WORDS, spans=SAMPLE_SPANS):
+    """About `words` words of an IngestedTranscript, from `spans` evenly spaced runs of snippets"""
+    count = len(transcript)
+    if not count or transcript.word_count <= words:
+        return transcript.text
+
+    per_span = words / spans
+    parts = []
+    for span in range(spans):
+        index = span * count // spans
+        taken = 0
+        while index < count and taken < per_span:
+            parts.append(transcript.snippet_text(index))
+            taken += transcript.word_counts[index]
+            index += 1
+    return ' '.join(parts)
+
+
+def _sample_jargon(sample):
+    try:
+        stop_words = english_stopwords()
+    except LookupError:
+        stop_words = frozenset()
+    words = [
+        token for token in (token.lower() for token in regex_word_tokenize(sample))
+        if token.isalnum() and token not in stop_words
+    ]
+    technical = sum(1 for word in words if word in TECHNICAL_TERMS)
+    return {
+        'technical_count': technical,
+        'total_words': len(words),
+        'percentage': round(technical / len(words) * 100, 1) if words else 0,
+        'level': 'Estimated from a transcript sample',
+    }
+
+
+def cheap_analysis(title, transcript, duration_minutes=None):
+    """
+    An analyze_transcript-shaped estimate (skill_level, level_score,
+    readability, jargon, pacing) from the title, the duration and a
+    transcript sample. Marked 'estimated'.
+    """
+    sample = transcript_sample(transcript)
+    language = detect_language(sample)
+    results = {'language': language, 'estimated': True}
+
+    if language == 'en' and len(sample.split()) >= 10:
+        scores = readability_scores(sample)
+        flesch = max(0, min(100, scores['flesch']))
+        results['readability'] = {
+            'flesch_score': round(flesch, 1),
+            'fk_grade': round(scores['fk_grade'], 1),
+            'normalized': round(flesch, 1),
+            'interpretation': 'Estimated from a transcript sample',
+        }
+    else:
+        results['readability'] = {
+            'flesch_score': 'N/A',
+            'fk_grade': 'N/A',
+            'normalized': 50,
+            'interpretation': f'Language: {language.upper()} (estimated)',
+        }
+
+    results['jargon'] = _sample_jargon(sample)
+
+    # Pacing needs only the word count and the length: both are known without reading the text
+    minutes = transcript.last_start / 60 or duration_minutes or 1
+    results['pacing'] = {'words_per_minute': round(transcript.word_count / minutes), 'pacing': 'Estimated'}
+
+    if language in ('hi', 'hinglish'):
+        level, score, explanation = TranscriptAnalyzer.determine_hindi_skill_level(results)
+    else:
+        level, score, explanation = TranscriptAnalyzer.determine_skill_level(results)
+    # The audience the creator names beats the sample's estimate
+    announced = title_level(title)
+    if announced and announced != level:
+        level, explanation = announced, f'{announced} audience named in the title'
+
+    results.update({'skill_level': level, 'level_score': score, 'level_explanation': explanation})
+    return results
+
+
+def kendall_tau(first, second):
+    """Rank agreement (-1..1) of two orderings over the items both contain; None below two items"""
+    position = {item: index for index, item in enumerate(second)}
+    common = [item for item in first if item in position]
+    if len(common) < 2:
+        return None
+    concordant = sum(1 if position[a] < position[b] else -1 for a, b in combinations(common, 2))
+    return round(concordant / (len(common) * (len(common) - 1) / 2), 3)
+
+
+def agreement(screen_scores, full_scores, finalists):
+    """
+    How well screening predicts full evaluation, given both scores for every
+    candidate ({id: score}): rank correlation, whether the best video makes the
+    cut, and the share of the true top-`finalists` that does.
+    """
+    screen_order = sorted(screen_scores, key=screen_scores.get, reverse=True)
+    full_order = sorted(full_scores, key=full_scores.get, reverse=True)
+    shortlisted = set(screen_order[:finalists])
+    best = full_order[:finalists]
+    return {
+        'kendall_tau': kendall_tau(screen_order, full_order),
+        'best_is_finalist': bool(best) and best[0] in shortlisted,
+        'top_k_recall': round(len(shortlisted.intersection(best)) / len(best), 3) if best else None,
+    }
+
+
+class CascadeRanker:
+    """Screen every candidate cheaply, keep the best `finalists` for full evaluation"""
+
+    def __init__(self, target_level, finalists=5):
+        self.target_level = target_level
+        self.finalists = finalists
+
+    def score(self, video):
+        try:
+            return calculate_recommendation_score(video, self.target_level)
+        except (KeyError, TypeError, AttributeError):
+            return 50  # Default middle score
+
+    def select(self, candidates):
+        """(finalists, screened out), best screen score first; sets each candidate's 'screen_score'"""
+        for video in candidates:
+            video['screen_score'] = self.score(video)
+        ordered = sorted(candidates, key=lambda video: video['screen_score'], reverse=True)
+        return ordered[:self.finalists], ordered[self.finalists:]
+
+    def report(self, finalists, screened_out, deep_evaluations, screen_seconds, deep_seconds):
+        """
+        Compute saved and agreement for one comparison. Finalists carry both
+        their screen score and the full 'recommendation_score'; agreement is
+        measured among them (the others were never fully evaluated).
+        """
+        skipped = sum(1 for video in screened_out if video['analysis'].get('estimated'))
+        per_evaluation = deep_seconds / deep_evaluations if deep_evaluations else 0.0
+        screen_order = [video['video_id'] for video in finalists]
+        full_order = [video['video_id'] for video in
+                      sorted(finalists, key=lambda video: video['recommendation_score'], reverse=True)]
+        return {
+            'candidates': len(finalists) + len(screened_out),
+            'finalists': len(finalists),
+            'deep_evaluations': deep_evaluations,
+            'deep_evaluations_skipped': skipped,
+            'comment_fetches_skipped': len(screened_out),
+            'screen_seconds': round(screen_seconds, 3),
+            'deep_seconds': round(deep_seconds, 3),
+            'estimated_seconds_saved': round(per_evaluation * skipped, 3),
+            'finalist_rank_agreement': kendall_tau(screen_order, full_order),
+            'top_pick_changed': bool(screen_order) and screen_order[0] != full_order[0],
+        }
@@ -1,5 +1,6 @@
 import re
 from collections import Counter
+from .nlp_resources import lexicon_matcher, CHAPTER_TECH_TERMS
 
 class ChapterExtractor:
     def extract_chapters_from_description(self, description):
@@ -99,21 +100,8 @@ class ChapterExtractor:
     
     def _extract_tech_terms(self, topics):
         """Extract technical terms from chapter topics"""
-        common_tech_terms = {
-            'python', 'javascript', 'react', 'django', 'flask', 'html', 'css',
-            'machine learning', 'ai', 'data science', 'analysis', 'visualization',
-            'langchain', 'llm', 'vector', 'database', 'api', 'web', 'mobile',
-            'design', 'ui', 'ux', 'photoshop', 'figma', 'excel', 'powerpoint'
-        }
-        
-        found_terms = []
-        for topic in topics:
-            topic_lower = topic.lower()
-            for term in common_tech_terms:
-                if term in topic_lower:
-                    found_terms.append(term)
-        
-        return list(set(found_terms))
+        term_counts = lexicon_matcher().counts('\n'.join(topics).lower())
+        return [term for term in CHAPTER_TECH_TERMS if term_counts[term]]
     
     def _generate_fallback_summary(self, video_title):
         """Fallback if no chapters found"""
@@ -0,0 +1,198 @@
+# analyzer/services/comment_classifier.py
+#
+# Labels viewer comments as understood / confused / mixed / neutral. The
+# keyword classifier compiles both lexicons into one KeywordMatcher and scans
+# a whole batch of comments in a single pass. The optional embedding
+# classifier (COMMENT_CLASSIFIER=embedding) also catches paraphrased and
+# Hindi/Hinglish feedback the lexicons miss, by batch-encoding comments with
+# the shared multilingual SentenceTransformer and comparing them with
+# prototype phrases.
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate
+from .embedding_model import shared_embedding_model
+from .keyword_matcher import KeywordMatcher
+
+UNDERSTOOD = 'understood'
+CONFUSED = 'confused'
+MIXED = 'mixed'
+NEUTRAL = 'neutral'
+
+# Terms use KeywordMatcher syntax: whole words, a trailing '*' matches any ending
+UNDERSTANDING_TERMS = (
+    'thank*', 'thx', 'helpful', 'understood', 'clear', 'crystal clear',
+    'explained well', 'well explained', 'good explanation', 'great explanation',
+    'easy to understand', 'makes sense', 'finally understand*', 'got it',
+    # Hinglish, with the common spellings of each phrase
+    'samajh aa gaya', 'samajh aa gya', 'samjh aa gaya', 'samaj aa gaya', 'samajh gaya', 'samajh gya',
+    'achha hai', 'acha hai', 'accha hai', 'achha laga', 'acha laga',
+    'bahut badhiya', 'bahut badiya', 'bahot badhiya', 'bohot badhiya', 'bhut badhiya', 'badhiya',
+    'shukriya', 'dhanyavad', 'dhanyawad', 'maza aa gaya', 'mza aa gya',
+)
+
+CONFUSION_TERMS = (
+    'confus*', 'not clear', 'unclear', 'difficult', 'hard to understand', 'hard to follow',
+    'did not understand', "didn't understand", 'didnt understand', "don't understand", 'dont understand',
+    'can you explain', 'please explain', 'explain again', 'complicated', 'lost me',
+    # Hinglish
+    'samajh nahi aaya', 'samajh nahi aya', 'samajh nhi aaya', 'samajh nhi aya', 'samjh nahi aaya',
+    'samjh nhi aaya', 'samaj nahi aaya', 'mujhe samajh nahi aaya', 'nahi samjha', 'nhi samjha',
+    'samajh nahi aa raha', 'samajh nhi aa rha', 'kuch samajh nahi', 'dobara samjhao', 'phir se samjhao',
+)
+
+# Prototype comments per label for the embedding classifier (English, Hindi, Hinglish)
+PROTOTYPES = {
+    UNDERSTOOD: (
+        'thank you, this explanation was very clear',
+        'now i finally understand this topic',
+        'great video, everything makes sense now',
+        'very helpful, you explained it so well',
+        'अब समझ में आ गया, बहुत अच्छा समझाया',
+        'बहुत बढ़िया वीडियो, धन्यवाद',
+        'ab samajh aa gaya, bahut accha samjhaya',
+        'sir aapne bahut easy bana diya',
+    ),
+    CONFUSED: (
+        'i am confused, i did not understand this part',
+        'this was too fast and hard to follow',
+        'can you please explain this again',
+        'i still do not get how this works',
+        'मुझे यह समझ नहीं आया',
+        'कृपया फिर से समझाइए',
+        'kuch samajh nahi aaya, dobara samjhao',
+        'sir ye part clear nahi hua',
+    ),
+}
+
+
+class KeywordCommentClassifier:
+    """
+    Batch keyword classifier. A comment is 'understood' if it contains an
+    understanding term, 'confused' if it contains a confusion term, 'mixed'
+    for both. Terms are matched whole, so "not clear" is confusion only.
+    """
+
+    def __init__(self, understanding_terms=UNDERSTANDING_TERMS, confusion_terms=CONFUSION_TERMS):
+        self.matcher = KeywordMatcher((*understanding_terms, *confusion_terms))
+        confusion = {term.lower() for term in confusion_terms}
+        self._confusion = {term for term in self.matcher.terms if term in confusion}
+
+    def classify(self, comments):
+        """Labels for lowercased comments, in order, from one scan over the batch"""
+        understood = bytearray(len(comments))
+        confused = bytearray(len(comments))
+        # Comments joined by newlines, which no term (or '\w*' ending) spans
+        starts = list(accumulate((len(comment) + 1 for comment in comments[:-1]), initial=0))
+
+        for position, term in self.matcher.term_matches('\n'.join(comments)):
+            index = bisect_right(starts, position) - 1
+            if term in self._confusion:
+                confused[index] = 1
+            else:
+                understood[index] = 1
+
+        labels = (NEUTRAL, UNDERSTOOD, CONFUSED, MIXED)
+        return [labels[u | c << 1] for u, c in zip(understood, confused)]
+
+
+class EmbeddingCommentClassifier:
+    """
+    Keyword labels first; comments without a keyword hit are encoded in
+    batches and labelled by their cosine similarity to the nearest prototype
+    of each label. Below `threshold` for both labels a comment is neutral;
+    above it for both, within `margin` of each other, it is mixed.
+    """
+
+    def __init__(self, model=None, prototypes=PROTOTYPES, threshold=0.5, margin=0.03, batch_size=64,
+                 keywords=None):
+        self._model = model
+        self.prototypes = prototypes
+        self.threshold = threshold
+        self.margin = margin
+        self.batch_size = batch_size
+        self.keywords = keywords or keyword_classifier()
+        self._prototype_matrix = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = shared_embedding_model()
+        return self._model
+
+    def classify(self, comments):
+        """Labels for lowercased comments, in order; each distinct text is encoded once"""
+        labels = self.keywords.classify(comments)
+        texts = list(dict.fromkeys(
+            comment for comment, label in zip(comments, labels) if label == NEUTRAL and comment.strip()
+        ))
+        if not texts:
+            return labels
+
+        embedded = dict(zip(texts, self._labels(self._encode(texts))))
+        return [embedded.get(comment, label) if label == NEUTRAL else label
+                for comment, label in zip(comments, labels)]
+
+    def _encode(self, texts):
+        return self.model.encode(
+            texts, batch_size=self.batch_size, convert_to_numpy=True,
+            normalize_embeddings=True, show_progress_bar=False,
+        )
+
+    def _labels(self, embeddings):
+        matrix, understood_rows = self._prototypes()
+        # Unit vectors, so dot products are cosine similarities: one (comments x prototypes) product
+        similarities = embeddings @ matrix.T
+        understood = similarities[:, :understood_rows].max(axis=1)
+        confused = similarities[:, understood_rows:].max(axis=1)
+
+        labels = []
+        for u, c in zip(understood.tolist(), confused.tolist()):
+            if max(u, c) < self.threshold:
+                labels.append(NEUTRAL)
+            elif min(u, c) >= self.threshold and abs(u - c) <= self.margin:
+                labels.append(MIXED)
+            else:
+                labels.append(UNDERSTOOD if u > c else CONFUSED)
+        return labels
+
+    def _prototypes(self):
+        """Prototype embeddings (understood rows first), encoded once per classifier"""
+        if self._prototype_matrix is None:
+            understood = list(self.prototypes[UNDERSTOOD])
+            self._prototype_matrix = (self._encode(understood + list(self.prototypes[CONFUSED])), len(understood))
+        return self._prototype_matrix
+
+
+def label_counts(labels):
+    """{'total', 'understanding', 'confusion', 'labels': {label: count}} for a batch"""
+    counts = Counter(labels)
+    return {
+        'total': len(labels),
+        'understanding': counts[UNDERSTOOD] + counts[MIXED],
+        'confusion': counts[CONFUSED] + counts[MIXED],
+        'labels': {label: counts[label] for label in (UNDERSTOOD, CONFUSED, MIXED, NEUTRAL)},
+    }
+
+
+@lru_cache(maxsize=None)
+def keyword_classifier():
+    """Process-wide classifier over the default lexicons (the pattern compiles once)"""
+    return KeywordCommentClassifier()
+
+
+@lru_cache(maxsize=None)
+def embedding_classifier():
+    """Process-wide embedding classifier on the shared model (prototypes encode once)"""
+    return EmbeddingCommentClassifier()
+
+
+def classifier_name():
+    """settings.COMMENT_CLASSIFIER: 'keyword' (default) or 'embedding'"""
+    from django.conf import settings
+    name = getattr(settings, 'COMMENT_CLASSIFIER', 'keyword')
+    return name if name in ('keyword', 'embedding') else 'keyword'
+
+
+def comment_classifier():
+    return embedding_classifier() if classifier_name() == 'embedding' else keyword_classifier()
@@ -1,93 +1,272 @@
 from googleapiclient.discovery import build
+import hashlib
+import json
+import math
 import re
 from collections import Counter
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+from ..models import CommentAggregate
+from .comment_classifier import (
+    CONFUSION_TERMS, PROTOTYPES, UNDERSTANDING_TERMS, classifier_name, comment_classifier, label_counts,
+)
+from .quota_governor import QuotaGovernor, PRIORITY_INTERACTIVE, UNIT_COSTS
+
+# commentThreads.list returns at most 100 threads per page
+PAGE_SIZE = 100
+# 95% normal-approximation interval
+Z_95 = 1.96
+# Bump when scoring changes in a way the keyword lists don't show
+SCORING_VERSION = '1'
+# Set on an aggregate whose refresh missed comments: matches no scorer, so the next analysis starts over
+RECOUNT_VERSION = ''
+
+
+def comment_budget():
+    """settings.COMMENT_MAX_COMMENTS: most comments fetched per video (default 500, i.e. 5 pages)"""
+    return max(1, getattr(settings, 'COMMENT_MAX_COMMENTS', 500))
+
+
+class CommentTally:
+    """Running understanding/confusion counts, updated page by page"""
+
+    def __init__(self, classifier, aggregate=None):
+        self.classifier = classifier
+        # Continue from a stored CommentAggregate
+        self.total = aggregate.total_comments if aggregate else 0
+        self.understanding = aggregate.understanding_count if aggregate else 0
+        self.confusion = aggregate.confusion_count if aggregate else 0
+        self.stored_samples = list(aggregate.sample_comments) if aggregate else []
+        self.new_samples = []
+        self.added = 0
+
+    def add(self, comments):
+        """Count lowercased comment texts (newest first when refreshing)"""
+        counts = label_counts(self.classifier.classify(comments))
+        self.understanding += counts['understanding']
+        self.confusion += counts['confusion']
+        self.total += len(comments)
+        self.added += len(comments)
+        self.new_samples.extend(comments[:3 - len(self.new_samples)])
+        return self
+
+    @property
+    def samples(self):
+        """Three comments to show with the scores, newest first"""
+        return (self.new_samples + self.stored_samples)[:3]
+
+    def margin(self, count):
+        """Half-width of the 95% interval of count/total (as a fraction)"""
+        if not self.total:
+            return 1.0
+        share = count / self.total
+        # Never claim certainty from a 0% or 100% sample: use at least one hit/miss
+        share = min(max(share, 1 / self.total), 1 - 1 / self.total) if self.total > 1 else 0.5
+        return Z_95 * math.sqrt(share * (1 - share) / self.total)
+
+    def is_stable(self, tolerance):
+        """Both shares are known to within ±tolerance"""
+        return max(self.margin(self.understanding), self.margin(self.confusion)) <= tolerance
+
+    def summary(self):
+        if not self.total:
+            return {
+                'total_comments': 0,
+                'understanding_score': 0,
+                'confusion_score': 0,
+                'sentiment': 'No comments'
+            }
+
+        understanding_score = (self.understanding / self.total) * 100
+        confusion_score = (self.confusion / self.total) * 100
+
+        # Determine overall sentiment
+        if understanding_score > confusion_score:
+            sentiment = "Positive"
+        elif confusion_score > understanding_score:
+            sentiment = "Confusing"
+        else:
+            sentiment = "Mixed"
+
+        return {
+            'total_comments': self.total,
+            'understanding_score': round(understanding_score, 1),
+            'confusion_score': round(confusion_score, 1),
+            'understanding_margin': round(self.margin(self.understanding) * 100, 1),
+            'confusion_margin': round(self.margin(self.confusion) * 100, 1),
+            'sentiment': sentiment,
+            'sample_comments': self.samples  # First 3 comments
+        }
+
 
 class CommentsAnalyzer:
-    def __init__(self, api_key):
+    # Keywords that indicate understanding / confusion (English and Hinglish)
+    understanding_keywords = UNDERSTANDING_TERMS
+    confusion_keywords = CONFUSION_TERMS
+
+    def __init__(self, api_key, priority=PRIORITY_INTERACTIVE):
         self.youtube = build('youtube', 'v3', developerKey=api_key)
-        
-        # Keywords that indicate understanding
-        self.understanding_keywords = [
-            'thanks', 'thank you', 'helpful', 'understood', 'clear',
-            'explained well', 'good explanation', 'easy to understand',
-            'samajh aa gaya', 'achha hai', 'bahut badhiya', 'shukriya'
-        ]
-        
-        # Keywords that indicate confusion
-        self.confusion_keywords = [
-            'confusing', 'not clear', 'difficult', 'hard to understand',
-            'did not understand', 'can you explain', 'samajh nahi aaya',
-            'mujhe samajh nahi aaya', 'confuse', 'complicated'
-        ]
-    
-    def analyze_video_comments(self, video_id, max_comments=100):
-        """Analyze comments for sentiment and understanding"""
+        self.priority = priority
+        self.quota = QuotaGovernor()
+
+    @classmethod
+    def scoring_version(cls):
+        """Changes whenever the keyword lists, the classifier (or SCORING_VERSION) change"""
+        scoring = [SCORING_VERSION, cls.understanding_keywords, cls.confusion_keywords]
+        if classifier_name() == 'embedding':
+            # Keyword-only aggregates keep their version
+            scoring += ['embedding', PROTOTYPES]
+        scoring = json.dumps(scoring, ensure_ascii=False)
+        return hashlib.sha256(scoring.encode('utf-8')).hexdigest()[:32]
+
+    def analyze_video_comments(self, video_id, max_comments=None, min_comments=100, tolerance=0.05):
+        """
+        Analyze comments for sentiment and understanding.
+
+        Comments are read newest first, in pages of up to 100, up to
+        `max_comments`. The first analysis of a video stops paging early once
+        `min_comments` are in and both scores are known to within ±`tolerance`
+        (95% interval). Later analyses read only comments newer than the last
+        run and add them to the stored CommentAggregate. A refresh that the
+        budget or an error stops before it reaches those marks the aggregate
+        for a full recount instead: the comments in between were never read.
+        """
+        max_comments = max_comments or comment_budget()
+        page_budget = math.ceil(max_comments / PAGE_SIZE)
+        version = self.scoring_version()
+        aggregate = CommentAggregate.objects.filter(video_id=video_id, scoring_version=version).first()
+        tally = CommentTally(self.classifier(), aggregate)
+        pages = 0
+        more_available = False
+        newest = None
+        # Every comment newer than the stored counts was read (trivially, without stored counts)
+        caught_up = aggregate is None
+
         try:
-            # Fetch comments
-            comments = []
+            for threads, more_available in self.comment_pages(video_id, max_comments):
+                pages += 1
+                newest = newest or (threads[0] if threads else None)
+                new_threads = threads if aggregate is None else _newer_than(threads, aggregate)
+                tally.add([text for _, _, text in new_threads])
+
+                if len(new_threads) < len(threads):
+                    # Reached comments the stored counts already include
+                    caught_up = more_available = True
+                    break
+                if not more_available:
+                    caught_up = True
+                if (aggregate is None and more_available
+                        and tally.total >= min_comments and tally.is_stable(tolerance)):
+                    break
+        except Exception as e:
+            if not pages:
+                if aggregate is not None:
+                    # Stale scores beat none (e.g. the daily quota is spent)
+                    return {**tally.summary(), 'new_comments': 0, 'pages_fetched': 0,
+                            'stopped_early': False, 'quota_units_saved': 0}
+                return {
+                    'error': str(e),
+                    'total_comments': 0,
+                    'understanding_score': 0,
+                    'confusion_score': 0,
+                    'sentiment': 'Error'
+                }
+            # Keep what the earlier pages gave (e.g. the daily quota ran out mid-video)
+            more_available = False
+
+        if tally.added or aggregate is None:
+            self._save_aggregate(video_id, version if caught_up else RECOUNT_VERSION, tally, aggregate, newest)
+
+        result = tally.summary()
+        stopped_early = more_available and pages < page_budget
+        result.update({
+            'new_comments': tally.added,
+            'pages_fetched': pages,
+            'stopped_early': stopped_early,
+            # Pages of the budget left unfetched although the video had more comments
+            'quota_units_saved': (page_budget - pages) * UNIT_COSTS['commentThreads.list'] if stopped_early else 0,
+        })
+        return result
+
+    def comment_pages(self, video_id, max_comments):
+        """
+        Yield ([(comment id, published at, lowercased text), ...], more pages available)
+        per commentThreads.list page, newest first, following nextPageToken up to `max_comments`.
+        """
+        page_token = None
+        fetched = 0
+        while fetched < max_comments:
             request = self.youtube.commentThreads().list(
                 part="snippet",
                 videoId=video_id,
-                maxResults=max_comments,
-                textFormat="plainText"
+                maxResults=min(PAGE_SIZE, max_comments - fetched),
+                order="time",
+                textFormat="plainText",
+                pageToken=page_token
             )
-            
+
+            self.quota.acquire('commentThreads.list', self.priority)
             response = request.execute()
-            
+
+            threads = []
             for item in response.get('items', []):
-                comment = item['snippet']['topLevelComment']['snippet']['textDisplay']
-                comments.append(comment.lower())
-            
-            if not comments:
-                return {
-                    'total_comments': 0,
-                    'understanding_score': 0,
-                    'confusion_score': 0,
-                    'sentiment': 'No comments'
-                }
-            
-            # Analyze comments
-            understanding_count = 0
-            confusion_count = 0
-            
-            for comment in comments:
-                # Check for understanding keywords
-                for keyword in self.understanding_keywords:
-                    if keyword in comment:
-                        understanding_count += 1
-                        break
-                
-                # Check for confusion keywords  
-                for keyword in self.confusion_keywords:
-                    if keyword in comment:
-                        confusion_count += 1
-                        break
-            
-            total_analyzed = len(comments)
-            understanding_score = (understanding_count / total_analyzed) * 100
-            confusion_score = (confusion_count / total_analyzed) * 100
-            
-            # Determine overall sentiment
-            if understanding_score > confusion_score:
-                sentiment = "Positive"
-            elif confusion_score > understanding_score:
-                sentiment = "Confusing"
-            else:
-                sentiment = "Mixed"
-            
-            return {
-                'total_comments': total_analyzed,
-                'understanding_score': round(understanding_score, 1),
-                'confusion_score': round(confusion_score, 1),
-                'sentiment': sentiment,
-                'sample_comments': comments[:3]  # First 3 comments
-            }
-            
-        except Exception as e:
-            return {
-                'error': str(e),
-                'total_comments': 0,
-                'understanding_score': 0,
-                'confusion_score': 0,
-                'sentiment': 'Error'
-            }
\ No newline at end of file
+                comment = item['snippet']['topLevelComment']
+                threads.append((
+                    comment['id'],
+                    comment['snippet']['publishedAt'],
+                    comment['snippet']['textDisplay'].lower()
+                ))
+            fetched += len(threads)
+            page_token = response.get('nextPageToken')
+            more_available = bool(page_token) and bool(threads)
+            yield threads, more_available
+            if not more_available:
+                return
+
+    def score_comments(self, comments):
+        """Understanding/confusion scores for lowercased comment texts"""
+        return CommentTally(self.classifier()).add(comments).summary()
+
+    def classifier(self):
+        """The keyword classifier, or the embedding one with COMMENT_CLASSIFIER=embedding"""
+        return comment_classifier()
+
+    def _save_aggregate(self, video_id, version, tally, aggregate, newest):
+        fields = {
+            'scoring_version': version,
+            'total_comments': tally.total,
+            'understanding_count': tally.understanding,
+            'confusion_count': tally.confusion,
+            'sample_comments': tally.samples,
+        }
+        if newest is not None:
+            fields['newest_comment_id'] = newest[0]
+            fields['newest_published_at'] = parse_datetime(newest[1])
+
+        if aggregate is not None:
+            # Only if no other request refreshed it meanwhile (theirs already has these comments)
+            CommentAggregate.objects.filter(
+                pk=aggregate.pk, newest_comment_id=aggregate.newest_comment_id
+            ).update(**fields)
+            return
+
+        # First analysis, or the keyword lists changed: start the counts over
+        try:
+            with transaction.atomic():
+                CommentAggregate.objects.update_or_create(video_id=video_id, defaults=fields)
+        except IntegrityError:
+            pass
+
+
+def _newer_than(threads, aggregate):
+    """Leading threads posted after the aggregate's newest comment (threads are newest first)"""
+    newest_at = aggregate.newest_published_at
+    newer = []
+    for comment_id, published_at, text in threads:
+        if comment_id == aggregate.newest_comment_id:
+            break
+        if newest_at is not None and parse_datetime(published_at) < newest_at:
+            break
+        newer.append((comment_id, published_at, text))
+    return newer
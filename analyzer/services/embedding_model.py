@@ -0,0 +1,38 @@
+# analyzer/services/embedding_model.py
+#
+# The multilingual SentenceTransformer, loaded once per process and shared by
+# RAGService (chunk/question embeddings) and the embedding comment classifier.
+# sentence_transformers (and torch) are imported on first use only.
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+FALLBACK_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+_model = None
+_lock = threading.Lock()
+
+
+def shared_embedding_model():
+    """The process-wide SentenceTransformer (multilingual, or the English fallback)"""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _model = _load()
+    return _model
+
+
+def _load():
+    from sentence_transformers import SentenceTransformer
+
+    logger.info("📥 Loading multilingual embedding model")
+    try:
+        model = SentenceTransformer(MODEL_NAME)
+        logger.info("✅ Loaded: %s", MODEL_NAME)
+    except Exception as e:
+        logger.warning("❌ Multilingual model unavailable (%s), loading %s", e, FALLBACK_MODEL_NAME)
+        model = SentenceTransformer(FALLBACK_MODEL_NAME)
+    return model
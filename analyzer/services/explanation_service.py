@@ -1,6 +1,9 @@
+import logging
 from .topic_detector import TopicDetector
 from .chapter_extractor import ChapterExtractor
 
+logger = logging.getLogger(__name__)
+
 class ExplanationService:
     def generate_why_this_video(self, video, target_level):
         """Generate detailed explanation of why this video is recommended"""
@@ -129,19 +132,14 @@ class ExplanationService:
         description = video.get('description', '')
         title = video['title']
         
-        print(f"DEBUG: Title: {title}")
-        print(f"DEBUG: Description length: {len(description)}")
-        print(f"DEBUG: First 200 chars of description: {description[:200]}")
-        
         # Initialize chapter extractor
         chapter_extractor = ChapterExtractor()
         
         # Extract actual chapters from description
         chapters = chapter_extractor.extract_chapters_from_description(description)
         
-        print(f"DEBUG: Found {len(chapters)} chapters")
-        for i, chapter in enumerate(chapters):
-            print(f"DEBUG Chapter {i}: {chapter['time']} - {chapter['topic']}")
+        logger.debug("Found %d chapters in a %d-character description of %.100s",
+                     len(chapters), len(description), title)
         
         # Generate summary from REAL chapters
         if chapters:
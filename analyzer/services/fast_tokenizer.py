@@ -0,0 +1,104 @@
+# analyzer/services/fast_tokenizer.py
+#
+# Regex tokenizer used instead of NLTK's word_tokenize when
+# ANALYZER_TOKENIZER=regex. The analyzers only keep alphanumeric tokens, so
+# the goal is the same `isalnum()` word stream as Treebank + Punkt, not the
+# same punctuation tokens.
+import re
+
+# Word characters plus combining marks (Latin diacritics, Devanagari and the
+# other Indic blocks), so "हिंदी" stays one token like it does in NLTK
+_MARKS = r"\u0300-\u036F\u0900-\u0DFF"
+_WORD = rf"[\w{_MARKS}]"
+
+# Characters Treebank always splits off a token
+_SPLIT = r"\s,:;@#$%&?!*()\[\]{}<>\"`«»“”‘’„"
+
+# Anything else stays attached, so "3.5", "x-ray", "and/or", "c++", "'90s"
+# and "you-" come out whole (and are dropped as non-alphanumeric, like in
+# NLTK). Commas and colons only join digits ("1,000", "10:30"); "--", a
+# trailing period and a trailing quote are split off.
+_EDGE = rf"(?:[^\w{_MARKS}{_SPLIT}.'-]|(?<!-)-(?!-))"
+_TOKEN = re.compile(
+    rf"(?:{_EDGE}|')*"
+    rf"{_WORD}+(?:(?:[,:](?=\d)|(?!--)[^{_SPLIT}]){_WORD}+)*"
+    rf"{_EDGE}*"
+)
+
+_WORD_RUN = re.compile(rf"{_WORD}+")
+_QUOTED_LETTER = re.compile(r"'[^\Wmtsdn](?!\w)")
+
+# Sentence ends: . ! ? (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|(?<=[.!?][\'")\]])\s+')
+
+# Clitics Treebank splits off the end of a word (plus n't)
+_CLITICS = ("'s", "'m", "'d", "'ll", "'re", "'ve")
+
+# Words Treebank splits in two, with the split position (CONTRACTIONS2 in
+# nltk.tokenize.destructive; 'tis and 'twas are handled in _clean)
+_SPLIT_WORDS = {
+    'cannot': 3, 'gimme': 3, 'gonna': 3, 'gotta': 3, 'lemme': 3, 'wanna': 3,
+}
+
+
+def _clean(token):
+    """Treebank's quote and contraction splitting, reduced to the parts that can be alphanumeric"""
+    if token.isalnum():
+        cut = _SPLIT_WORDS.get(token.lower())
+        return (token[:cut], token[cut:]) if cut else (token,)
+
+    lowered = token.lower()
+    if "'" in token:
+        # An opening quote before a one-letter word is split off: 'I -> ' I
+        if _QUOTED_LETTER.match(lowered):
+            token, lowered = token[1:], lowered[1:]
+
+        for clitic in _CLITICS:
+            if lowered.endswith(clitic):
+                token, lowered = token[:-len(clitic)], lowered[:-len(clitic)]
+                break
+        else:
+            if lowered.endswith("n't"):
+                token, lowered = token[:-3], lowered[:-3]
+
+    if lowered.startswith("more'n"):
+        return (token[:4], token[4:])
+
+    # cannot/gonna/... are split even with punctuation attached ("-gonna"),
+    # except "wanna", which must be followed by whitespace
+    core = _WORD_RUN.search(lowered)
+    if core is None:
+        return (token,)
+    start, end = core.span()
+    word = core.group()
+    if word in _SPLIT_WORDS and (word != 'wanna' or end == len(token)):
+        cut = start + _SPLIT_WORDS[word]
+        return (token[:start], token[start:cut], token[cut:end], token[end:])
+    if start == 1 and lowered[0] == "'" and word in ('tis', 'twas'):
+        return (token[:2], token[2:])
+    return (token,)
+
+
+def regex_word_tokenize(text):
+    """Tokens whose alphanumeric subset matches nltk.word_tokenize(text)"""
+    tokens = []
+    # No token spans whitespace, and most caption words are plain alphanumeric:
+    # split in C first and only run the regex on words with punctuation
+    for word in text.split():
+        if word.isalnum():
+            if len(word) in (5, 6) and word.lower() in _SPLIT_WORDS:
+                tokens.extend(_clean(word))
+            else:
+                tokens.append(word)
+        elif _WORD_RUN.fullmatch(word):
+            # e.g. Devanagari words: vowel signs are not alphanumeric, no punctuation either
+            tokens.append(word)
+        else:
+            for token in _TOKEN.findall(word):
+                tokens.extend(_clean(token))
+    return tokens
+
+
+def regex_sent_tokenize(text):
+    """Split after . ! ? followed by whitespace (auto-captions usually have none)"""
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence]
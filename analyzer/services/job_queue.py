@@ -0,0 +1,220 @@
+# analyzer/services/job_queue.py
+import hashlib
+import json
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from ..models import AnalysisJob
+from ..utils.error_handler import ErrorHandler
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """SQLite-backed queue of analysis jobs (no external broker)"""
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, result_ttl=None):
+        if result_ttl is None:
+            result_ttl = timedelta(hours=getattr(settings, 'ANALYSIS_JOB_RESULT_TTL_HOURS', 24))
+        self.result_ttl = result_ttl
+
+    @staticmethod
+    def make_cache_key(kind, payload):
+        """Stable hash of the job inputs, used to reuse identical requests"""
+        raw = json.dumps([kind, payload], sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def enqueue(self, kind, payload, user=None):
+        """
+        Queue a job and return it immediately.
+        An identical job of the same user that is still pending, or finished
+        within the result TTL, is returned instead of queueing new work.
+        Other users get their own job (only its creator may view a job);
+        the pipeline's SingleFlight and AnalysisStore still share the work.
+        """
+        cache_key = self.make_cache_key(kind, payload)
+        fresh_since = timezone.now() - self.result_ttl
+        if user is not None and not user.is_authenticated:
+            user = None
+
+        existing = AnalysisJob.objects.filter(cache_key=cache_key, user=user).filter(
+            Q(status__in=[AnalysisJob.STATUS_QUEUED, AnalysisJob.STATUS_RUNNING]) |
+            Q(status=AnalysisJob.STATUS_DONE, finished_at__gte=fresh_since)
+        ).order_by('-created_at').first()
+
+        if existing:
+            return existing
+
+        return AnalysisJob.objects.create(
+            kind=kind,
+            payload=payload,
+            cache_key=cache_key,
+            user=user
+        )
+
+    def claim(self, worker_id):
+        """
+        Atomically move the oldest queued job to running and return it.
+        The conditional UPDATE is what makes this safe across processes:
+        only one worker sees rowcount == 1 for a given job.
+        """
+        while True:
+            candidate = AnalysisJob.objects.filter(
+                status=AnalysisJob.STATUS_QUEUED
+            ).order_by('created_at').values_list('pk', flat=True).first()
+
+            if candidate is None:
+                return None
+
+            now = timezone.now()
+            claimed = AnalysisJob.objects.filter(
+                pk=candidate,
+                status=AnalysisJob.STATUS_QUEUED
+            ).update(
+                status=AnalysisJob.STATUS_RUNNING,
+                worker=worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=F('attempts') + 1,
+                progress=0,
+                progress_message='Starting',
+                result=None
+            )
+
+            if claimed:
+                return AnalysisJob.objects.get(pk=candidate)
+            # Another worker won the race - try the next job
+
+    def update_progress(self, job, percent, message='', partial=None):
+        """Record progress; `partial` (e.g. the running comparison ranking) is kept as the interim result"""
+        fields = {
+            'progress': max(0, min(100, int(percent))),
+            'progress_message': message[:255],
+            'heartbeat_at': timezone.now(),
+        }
+        if partial is not None:
+            fields['result'] = partial
+        AnalysisJob.objects.filter(pk=job.pk).update(**fields)
+
+    def complete(self, job, result):
+        AnalysisJob.objects.filter(pk=job.pk).update(
+            status=AnalysisJob.STATUS_DONE,
+            result=result,
+            error='',
+            progress=100,
+            progress_message='Done',
+            finished_at=timezone.now()
+        )
+
+    def fail(self, job, error, result=None):
+        """Mark the job failed; `result` keeps an error result's details (e.g. failed_videos) for the page"""
+        fields = {'result': result} if result is not None else {}
+        AnalysisJob.objects.filter(pk=job.pk).update(
+            status=AnalysisJob.STATUS_FAILED,
+            error=str(error)[:1000],
+            progress_message='Failed',
+            finished_at=timezone.now(),
+            **fields
+        )
+
+    def requeue_stale(self, stale_after):
+        """Return jobs whose worker stopped heart-beating to the queue (or fail them)"""
+        cutoff = timezone.now() - stale_after
+        stale = AnalysisJob.objects.filter(
+            status=AnalysisJob.STATUS_RUNNING,
+            heartbeat_at__lt=cutoff
+        )
+
+        failed = stale.filter(attempts__gte=self.MAX_ATTEMPTS).update(
+            status=AnalysisJob.STATUS_FAILED,
+            error='Worker stopped responding',
+            finished_at=timezone.now()
+        )
+        requeued = stale.filter(attempts__lt=self.MAX_ATTEMPTS).update(
+            status=AnalysisJob.STATUS_QUEUED,
+            worker=''
+        )
+        return requeued, failed
+
+    def run(self, job):
+        """Execute a claimed job and store its result"""
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            self.fail(job, f'Unknown job kind: {job.kind}')
+            return
+
+        def progress(percent, message, partial=None):
+            self.update_progress(job, percent, message, partial)
+
+        try:
+            result = handler(job.payload, progress)
+        except Exception as e:
+            ErrorHandler.log_error(e, f"Analysis job {job.pk}")
+            self.fail(job, ErrorHandler.get_user_friendly_error(e))
+        else:
+            if isinstance(result, dict) and result.get('error'):
+                # The pipeline reports failures (quota, private video, ...) as {'error': ...}:
+                # fail the job so enqueue() doesn't hand the error out for the whole result TTL
+                self.fail(job, result['error'], result=result)
+            else:
+                self.complete(job, result)
+
+
+def _run_analyze(payload, progress):
+    from .video_pipeline import VideoPipeline
+    return VideoPipeline().analyze_video(payload['video_id'], progress=progress)
+
+
+def _run_compare(payload, progress):
+    from .video_pipeline import VideoPipeline
+    return VideoPipeline().compare_videos(
+        payload['video_urls'],
+        payload['target_level'],
+        progress=progress
+    )
+
+
+JOB_HANDLERS = {
+    AnalysisJob.KIND_ANALYZE: _run_analyze,
+    AnalysisJob.KIND_COMPARE: _run_compare,
+}
+
+
+class JobWorker:
+    """Polls the queue and runs jobs one at a time; run several processes for parallelism"""
+
+    def __init__(self, worker_id=None, poll_interval=1.0, stale_after=timedelta(minutes=10)):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.queue = JobQueue()
+
+    def run_once(self):
+        """Process a single job if one is available. Returns True if a job ran."""
+        close_old_connections()
+        self.queue.requeue_stale(self.stale_after)
+
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+
+        logger.info("⚙️ [%s] Running %s", self.worker_id, job)
+        self.queue.run(job)
+        logger.info("✅ [%s] Finished %s", self.worker_id, job.pk)
+        return True
+
+    def run_forever(self, exit_when_idle=False):
+        while True:
+            if self.run_once():
+                continue
+            if exit_when_idle:
+                return
+            time.sleep(self.poll_interval)
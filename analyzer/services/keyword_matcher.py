@@ -0,0 +1,92 @@
+# analyzer/services/keyword_matcher.py
+#
+# Many-keyword matcher: one compiled regex (the terms folded into a trie, so
+# the engine walks shared prefixes once) scans the text a single time instead
+# of one `term in text` scan per term.
+import re
+from collections import Counter
+
+# Not preceded by a word character (unlike \b, also right for terms such as ".net")
+_START = r"(?<!\w)"
+
+
+class KeywordMatcher:
+    """
+    Counts lexicon terms in lowercased text with one scan.
+
+    - Terms match on word boundaries: 'ai' no longer matches "again"
+    - A trailing '*' makes a prefix term: 'program*' matches "programs", "programming"
+    - A match also counts every term it contains, so 'machine learning' counts
+      'learning' too, as separate scans would
+    """
+
+    def __init__(self, terms):
+        self.terms = tuple(dict.fromkeys(term.lower() for term in terms))
+        self._pattern = re.compile(rf"{_START}(?:{_trie_pattern(self.terms)})(?!\w)")
+        self._term_patterns = [
+            (term, re.compile(rf"{_START}{_trie_pattern((term,))}(?!\w)")) for term in self.terms
+        ]
+        # Matched text -> terms it counts for (a few hundred distinct strings at most)
+        self._resolved = {}
+        self._exact = {}
+
+    def counts(self, text):
+        """Counter of term -> occurrences in `text` (expected lowercase)"""
+        counts = Counter()
+        for matched, occurrences in Counter(self._pattern.findall(text)).items():
+            for term in self._resolve(matched):
+                counts[term] += occurrences
+        return counts
+
+    def found(self, text):
+        """Terms present in `text`, in lexicon order"""
+        counts = self.counts(text)
+        return [term for term in self.terms if counts[term]]
+
+    def term_matches(self, text):
+        """
+        (position, term) for each match, where term is the one lexicon term the
+        matched text spells out; 'not clear' gives only 'not clear', not 'clear'
+        """
+        for match in self._pattern.finditer(text):
+            yield match.start(), self._exact_term(match.group())
+
+    def _exact_term(self, matched):
+        term = self._exact.get(matched)
+        if term is None:
+            term = self._exact[matched] = next(
+                term for term, pattern in self._term_patterns if pattern.fullmatch(matched)
+            )
+        return term
+
+    def _resolve(self, matched):
+        terms = self._resolved.get(matched)
+        if terms is None:
+            terms = self._resolved[matched] = tuple(
+                term for term, pattern in self._term_patterns if pattern.search(matched)
+            )
+        return terms
+
+
+def _trie_pattern(terms):
+    """Regex alternation of `terms` with common prefixes factored out"""
+    trie = {}
+    for term in terms:
+        node = trie
+        prefix = term[:-1] if term.endswith('*') else term
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node['*' if term.endswith('*') else ''] = True
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [re.escape(char) + _node_pattern(child) for char, child in node.items() if char not in ('', '*')]
+    if '*' in node:
+        # Anything after a prefix term's stem, up to the word boundary
+        branches.append(r'\w*')
+    if not branches:
+        return ''
+
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    return f"(?:{pattern})?" if '' in node else pattern
@@ -0,0 +1,151 @@
+# analyzer/services/language_detection.py
+#
+# Script/language detection shared by TranscriptAnalyzer and RAGService.
+# Counts Unicode scripts over code points in bulk with NumPy (sampling long
+# texts), then tells English from Hinglish/Spanish/French by function words.
+import string
+from collections import Counter
+import numpy as np
+
+# Code points looked at per text; longer texts are sampled evenly
+SAMPLE_CHARS = 32_000
+# Characters scanned for function words (taken from a few evenly spaced windows)
+WORD_SAMPLE_CHARS = 4_000
+WORD_SAMPLE_WINDOWS = 4
+
+# Non-Latin scripts as (name, first code point, last code point)
+SCRIPT_RANGES = (
+    ('devanagari', 0x0900, 0x097F),
+    ('cyrillic', 0x0400, 0x04FF),
+    ('arabic', 0x0600, 0x06FF),
+    ('kana', 0x3040, 0x30FF),
+    ('han', 0x4E00, 0x9FFF),
+    ('hangul', 0xAC00, 0xD7AF),
+)
+
+SCRIPT_LANGUAGES = {
+    'devanagari': 'hi',
+    'cyrillic': 'ru',
+    'arabic': 'ar',
+    'kana': 'ja',
+    'han': 'zh',
+    'hangul': 'ko',
+}
+
+# Frequent function words per Latin-script language
+FUNCTION_WORDS = {
+    'en': frozenset({
+        'the', 'and', 'is', 'of', 'to', 'in', 'that', 'it', 'you', 'this', 'we', 'are', 'with', 'for',
+    }),
+    # Romanized Hindi, as spoken in most Indian tutorials
+    'hinglish': frozenset({
+        'hai', 'hain', 'ka', 'ki', 'ke', 'ko', 'se', 'mein', 'aur', 'nahi', 'nahin', 'kya', 'yeh', 'ye',
+        'woh', 'wo', 'hum', 'tum', 'aap', 'karo', 'karte', 'karna', 'hota', 'hoga', 'tha', 'thi', 'jo',
+        'bhi', 'toh', 'ek', 'yaha', 'yahan', 'accha', 'acha', 'matlab', 'dekho', 'samjho', 'bahut',
+        'kaise', 'kyunki', 'agar', 'lekin', 'phir', 'apna', 'apne', 'wala', 'wale',
+    }),
+    'es': frozenset({
+        'el', 'la', 'que', 'los', 'las', 'del', 'y', 'es', 'por', 'para', 'una', 'con', 'como', 'pero',
+    }),
+    'fr': frozenset({
+        'le', 'la', 'les', 'et', 'est', 'des', 'une', 'que', 'pour', 'dans', 'pas', 'du', 'sur', 'avec',
+    }),
+}
+
+# A non-English Latin language needs at least this share of its function words
+MIN_FUNCTION_WORD_SHARE = 0.05
+
+_PUNCTUATION_TO_SPACE = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+_ASCII_LETTERS = bytes(range(0x41, 0x5B)) + bytes(range(0x61, 0x7B))
+
+
+def script_histogram(text, sample_chars=SAMPLE_CHARS):
+    """
+    Letter counts per script: {'latin': n, 'devanagari': n, ..., 'letters': n, 'chars': n}.
+    Texts longer than `sample_chars` are sampled with an even stride.
+    """
+    step = max(1, len(text) // sample_chars)
+    sample = text[::step]
+
+    counts = {'latin': 0, 'chars': len(sample)}
+    counts.update({name: 0 for name, _, _ in SCRIPT_RANGES})
+    if not sample:
+        counts['letters'] = 0
+        return counts
+
+    if sample.isascii():
+        # Most English transcripts: no code point array needed
+        data = sample.encode('ascii')
+        counts['latin'] = len(data) - len(data.translate(None, _ASCII_LETTERS))
+    else:
+        code_points = np.frombuffer(sample.encode('utf-32-le'), dtype=np.uint32)
+        # (cp - first) < size is a range test in one pass (unsigned wrap-around)
+        counts['latin'] = int(
+            np.count_nonzero(((code_points | 0x20) - 0x61) < 26)
+            + np.count_nonzero((code_points - 0xC0) < 0x190)
+        )
+        for name, first, last in SCRIPT_RANGES:
+            counts[name] = int(np.count_nonzero((code_points - first) < (last - first + 1)))
+
+    counts['letters'] = counts['latin'] + sum(counts[name] for name, _, _ in SCRIPT_RANGES)
+    return counts
+
+
+def latin_language(text):
+    """'en', 'hinglish', 'es' or 'fr' for Latin-script text, by function word frequency"""
+    words = _word_sample(text).lower().translate(_PUNCTUATION_TO_SPACE).split()
+    if not words:
+        return 'en'
+
+    frequencies = Counter(words)
+    shares = {
+        language: sum(frequencies[word] for word in markers) / len(words)
+        for language, markers in FUNCTION_WORDS.items()
+    }
+
+    best = max(shares, key=shares.get)
+    if best != 'en' and shares[best] > shares['en'] and shares[best] >= MIN_FUNCTION_WORD_SHARE:
+        return best
+    return 'en'
+
+
+def detect_language(text):
+    """
+    Language code for a transcript or question: 'en', 'hi', 'hinglish',
+    'es', 'fr', 'ru', 'ar', 'ja', 'zh' or 'ko'. Defaults to 'en'.
+    """
+    counts = script_histogram(text)
+    letters = counts['letters']
+    if not letters:
+        return 'en'
+
+    # More than 30% Devanagari letters = Hindi
+    if counts['devanagari'] / letters > 0.3:
+        return 'hi'
+
+    if counts['latin'] / letters > 0.5:
+        return latin_language(text)
+
+    if counts['devanagari']:
+        return 'hi'
+
+    # Japanese mixes kana with Han characters
+    if counts['kana'] and counts['kana'] + counts['han'] > letters / 2:
+        return 'ja'
+
+    script = max(SCRIPT_LANGUAGES, key=lambda name: counts[name])
+    return SCRIPT_LANGUAGES[script] if counts[script] else 'en'
+
+
+def _word_sample(text):
+    """A few evenly spaced windows of the text, cut at spaces"""
+    if len(text) <= WORD_SAMPLE_CHARS:
+        return text
+
+    window = WORD_SAMPLE_CHARS // WORD_SAMPLE_WINDOWS
+    stride = (len(text) - window) // (WORD_SAMPLE_WINDOWS - 1)
+    return ' '.join(
+        text[start:start + window].partition(' ')[2].rpartition(' ')[0]
+        for start in range(0, stride * WORD_SAMPLE_WINDOWS, stride)
+    )
+
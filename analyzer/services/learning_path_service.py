@@ -1,4 +1,5 @@
 # analyzer/services/learning_path_service.py
+from .nlp_resources import lexicon_matcher, SUBJECT_KEYWORDS
 
 class LearningPathService:
     def generate_learning_path(self, video_title, chapters, skill_level, word_count):
@@ -132,23 +133,10 @@ class LearningPathService:
     
     def _detect_possible_subjects(self, video_title):
         """Try to detect subject for slightly personalized tips"""
-        title_lower = video_title.lower()
-        subjects = []
-        
-        # Common subjects (non-exhaustive)
-        subject_keywords = {
-            'programming': ['python', 'javascript', 'java', 'c++', 'coding', 'program'],
-            'data': ['sql', 'excel', 'analysis', 'visualization', 'power bi'],
-            'web': ['html', 'css', 'react', 'website', 'frontend'],
-            'ai': ['machine learning', 'ai', 'neural', 'llm', 'langchain'],
-            'design': ['photoshop', 'figma', 'ui', 'ux', 'design'],
-            'business': ['excel', 'powerpoint', 'marketing', 'finance']
-        }
-        
-        for subject, keywords in subject_keywords.items():
-            for keyword in keywords:
-                if keyword in title_lower:
-                    subjects.append(subject)
-                    break
+        term_counts = lexicon_matcher().counts(video_title.lower())
         
-        return list(set(subjects))
\ No newline at end of file
+        # Common subjects (non-exhaustive), in SUBJECT_KEYWORDS order
+        return [
+            subject for subject, keywords in SUBJECT_KEYWORDS.items()
+            if any(term_counts[keyword] for keyword in keywords)
+        ]
\ No newline at end of file
@@ -0,0 +1,255 @@
+# analyzer/services/library_index.py
+#
+# "Best beginner videos about recursion" over every stored analysis, without
+# YouTube or LLM calls. An in-memory inverted index maps terms (detected key
+# terms, title words, topics, domain) to videos; each video's
+# calculate_recommendation_score for the three levels is computed once when
+# it is indexed. A query sums tf-idf weights of its terms over the matching
+# videos with numpy and blends that with the level score. The index follows
+# VideoAnalysis.updated_at and the primary key, so analyses saved by any
+# process (web, job workers, bulk runs) are picked up on the next search.
+import math
+import re
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from ..models import VideoAnalysis
+from .nlp_resources import GENERIC_TERMS
+from .recommendation import calculate_recommendation_score
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+LEVEL_WORDS = {
+    'beginner': 'beginner', 'beginners': 'beginner', 'basic': 'beginner', 'basics': 'beginner',
+    'intermediate': 'intermediate',
+    'advanced': 'advanced', 'expert': 'advanced', 'experts': 'advanced',
+}
+# Query words that say nothing about the subject
+QUERY_STOPWORDS = frozenset({
+    'best', 'top', 'good', 'great', 'videos', 'about', 'for', 'and', 'the', 'with', 'how', 'what',
+    'learn', 'learning', 'explained', 'introduction', 'intro',
+}) | GENERIC_TERMS
+
+# Title words count this many times a key-term occurrence
+TITLE_WEIGHT = 2.0
+# Share of the final score from topical relevance (the rest is the level score)
+RELEVANCE_WEIGHT = 0.5
+# Rows saved within this window of the last refresh are read again (commit races)
+REFRESH_OVERLAP = timedelta(seconds=5)
+# Every row is read again this often: catches updates committed after the overlap window
+FULL_REFRESH_SECONDS = 600
+
+_WORD = re.compile(r'\w+')
+
+
+def index_terms(text):
+    """Lowercased words of 3+ characters, with a plural 's' dropped ('loops' -> 'loop')"""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) < 3 or word.isdigit():
+            continue
+        if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def parse_query(query):
+    """(subject terms, level named in the query or None)"""
+    level = None
+    subject = []
+    for word in _WORD.findall(query.lower()):
+        if word in LEVEL_WORDS:
+            level = level or LEVEL_WORDS[word]
+        elif word not in QUERY_STOPWORDS:
+            subject.extend(index_terms(word))
+    return subject, level
+
+
+def document_terms(title, topics):
+    """{term: weight} for one stored analysis"""
+    weights = {}
+    topics = topics or {}
+    for term, freq in topics.get('key_terms') or ():
+        for word in index_terms(term):
+            weights[word] = weights.get(word, 0.0) + 1.0 + math.log(max(freq, 1))
+    for word in index_terms(title or ''):
+        if word not in QUERY_STOPWORDS:
+            weights[word] = weights.get(word, 0.0) + TITLE_WEIGHT
+    for topic in [*(topics.get('topics') or ()), topics.get('domain') or '']:
+        for word in index_terms(topic.replace('_', ' ')):
+            weights[word] = weights.get(word, 0.0) + 1.0
+    return weights
+
+
+class LibraryIndex:
+    """In-memory term -> videos index over VideoAnalysis rows, newest analysis per video"""
+
+    def __init__(self, refresh_seconds=None):
+        self.refresh_seconds = (
+            getattr(settings, 'LIBRARY_INDEX_REFRESH_SECONDS', 5) if refresh_seconds is None else refresh_seconds
+        )
+        self._lock = threading.Lock()
+        self._slots = {}                 # video_id -> row in the arrays below
+        self._videos = []                # per slot: {'video_id', 'title', 'skill_level', 'domain', 'updated_at'}
+        self._level_scores = np.zeros((0, len(LEVELS)), dtype=np.float32)
+        self._postings = {}              # term -> {slot: weight}
+        self._posting_arrays = {}        # term -> (slots, weights) as arrays, rebuilt after changes
+        self._slot_terms = []            # per slot: its terms, to unindex a replaced analysis
+        self._synced_at = None
+        self._max_pk = 0
+        self._checked_at = 0.0
+        self._full_refresh_at = 0.0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def refresh(self, force=False):
+        """Index analyses saved since the last refresh; returns how many rows were read"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._synced_at is not None and now - self._checked_at < self.refresh_seconds:
+                return 0
+            self._checked_at = now
+
+            rows = VideoAnalysis.objects.filter(analysis__isnull=False)
+            if self._synced_at is not None and now - self._full_refresh_at < FULL_REFRESH_SECONDS:
+                # New rows by primary key too: an insert can commit long after its updated_at
+                rows = rows.filter(Q(updated_at__gte=self._synced_at - REFRESH_OVERLAP) | Q(pk__gt=self._max_pk))
+            else:
+                self._full_refresh_at = now
+            rows = rows.order_by('updated_at').values(
+                'id', 'video_id', 'title', 'analysis', 'topics', 'updated_at'
+            )
+
+            count = 0
+            for row in rows.iterator():
+                self._add(row)
+                self._synced_at = max(self._synced_at or row['updated_at'], row['updated_at'])
+                self._max_pk = max(self._max_pk, row['id'])
+                count += 1
+            return count
+
+    def add_rows(self, rows):
+        """Index VideoAnalysis-shaped dicts (video_id, title, analysis, topics, updated_at) directly"""
+        with self._lock:
+            for row in rows:
+                self._add(row)
+
+    def _add(self, row):
+        slot = self._slots.get(row['video_id'])
+        if slot is not None and self._videos[slot]['updated_at'] >= row['updated_at']:
+            return  # This analysis, or a newer one of the video, is already indexed
+        analysis = row['analysis']
+        if not analysis or 'skill_level' not in analysis:
+            return
+
+        if slot is None:
+            slot = self._slots[row['video_id']] = len(self._videos)
+            self._videos.append(None)
+            self._slot_terms.append(())
+            if slot == len(self._level_scores):
+                # Grow by doubling, so indexing n videos copies O(n) scores in total
+                grown = np.zeros((max(64, 2 * slot), len(LEVELS)), dtype=np.float32)
+                grown[:slot] = self._level_scores
+                self._level_scores = grown
+        else:
+            for term in self._slot_terms[slot]:
+                del self._postings[term][slot]
+                self._posting_arrays.pop(term, None)
+
+        video = {'skill_level': analysis['skill_level'], 'analysis': analysis}
+        self._level_scores[slot] = [calculate_recommendation_score(video, level) for level in LEVELS]
+        self._videos[slot] = {
+            'video_id': row['video_id'],
+            'title': row['title'],
+            'skill_level': analysis['skill_level'],
+            'domain': (row['topics'] or {}).get('domain', ''),
+            'updated_at': row['updated_at'],
+        }
+
+        terms = document_terms(row['title'], row['topics'])
+        for term, weight in terms.items():
+            self._postings.setdefault(term, {})[slot] = weight
+            self._posting_arrays.pop(term, None)
+        self._slot_terms[slot] = tuple(terms)
+
+    def _posting_array(self, term):
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            postings = self._postings.get(term) or {}
+            arrays = self._posting_arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings)),
+            )
+        return arrays
+
+    def search(self, query, level=None, limit=10):
+        """
+        Best videos for `query` at `level` (or the level the query names;
+        with neither, each video's best-fitting level), best first. A query
+        that names only a level ("beginner") ranks every video by that level.
+        """
+        self.refresh()
+        terms, named_level = parse_query(query)
+        level = level or named_level
+
+        with self._lock:
+            total = len(self._videos)
+            if not total or not terms and level not in LEVELS:
+                return []
+            if not terms:
+                return self._results(np.arange(total), np.zeros(total), level, limit, relevance_weight=0)
+
+            # Relevance: sum over query terms of tf * idf, one bincount over every posting
+            slots, weights = [], []
+            for term in dict.fromkeys(terms):
+                term_slots, term_weights = self._posting_array(term)
+                if len(term_slots):
+                    idf = math.log((total + 1) / (len(term_slots) + 1)) + 1
+                    slots.append(term_slots)
+                    weights.append(term_weights * idf)
+            if not slots:
+                return []
+            relevance = np.bincount(np.concatenate(slots), np.concatenate(weights), minlength=total)
+
+            candidates = np.flatnonzero(relevance)
+            return self._results(candidates, relevance[candidates] / relevance[candidates].max(), level, limit)
+
+    def _results(self, candidates, relevance, level, limit, relevance_weight=RELEVANCE_WEIGHT):
+        """Top `limit` of the candidate slots by relevance blended with the level score"""
+        if level in LEVELS:
+            fit = self._level_scores[candidates, LEVELS.index(level)]
+        else:
+            fit = self._level_scores[candidates].max(axis=1)
+        scores = relevance_weight * relevance + (1 - relevance_weight) * fit / 100
+
+        results = []
+        for i in np.argsort(-scores, kind='stable')[:limit]:
+            video = self._videos[candidates[i]]
+            results.append({
+                'video_id': video['video_id'],
+                'title': video['title'],
+                'url': f"https://www.youtube.com/watch?v={video['video_id']}",
+                'skill_level': video['skill_level'],
+                'domain': video['domain'],
+                'recommendation_score': round(float(fit[i]), 1),
+                'relevance': round(float(relevance[i]), 3),
+                'score': round(float(scores[i]) * 100, 1),
+            })
+        return results
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_library_index():
+    """The process-wide LibraryIndex (built on first use, then refreshed incrementally)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LibraryIndex()
+        return _shared
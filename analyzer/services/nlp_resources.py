@@ -0,0 +1,152 @@
+# analyzer/services/nlp_resources.py
+#
+# Immutable NLP resources shared by every analyzer instance in the process.
+# NLTK costs over a second to import, so the analyzers import it on first use
+# and its data is loaded once, then reused.
+import logging
+from functools import lru_cache
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+# Basic programming terms used for jargon density
+TECHNICAL_TERMS = frozenset([
+    # Programming basics
+    'algorithm', 'variable', 'function', 'class', 'object',
+    'loop', 'array', 'database', 'api', 'framework',
+    'syntax', 'compiler', 'interpreter', 'debugging',
+
+    # Python specific
+    'python', 'django', 'flask', 'list', 'dictionary',
+    'tuple', 'module', 'package', 'import', 'def',
+
+    # Common technical terms
+    'recursion', 'iteration', 'inheritance', 'polymorphism',
+    'abstraction', 'encapsulation', 'complexity'
+])
+
+# Common technical terms across domains (TopicDetector)
+TOPIC_INDICATORS = MappingProxyType({
+    'programming': ('code', 'function', 'variable', 'loop', 'algorithm', 'syntax', 'debug'),
+    'data': ('data', 'analysis', 'dataset', 'visualization', 'statistic', 'chart', 'graph'),
+    'design': ('design', 'layout', 'color', 'interface', 'ui', 'ux', 'prototype'),
+    'business': ('business', 'marketing', 'finance', 'strategy', 'management', 'analysis'),
+    'academic': ('theory', 'concept', 'principle', 'research', 'study', 'paper'),
+    'practical': ('tutorial', 'guide', 'step', 'practice', 'exercise', 'project'),
+})
+
+# Lexicons below are matched on word boundaries by KeywordMatcher
+# (analyzer/services/keyword_matcher.py); a trailing '*' matches any word ending
+
+# Topic areas and difficulty hints (TopicDetector._categorize_topics)
+TOPIC_CATEGORIES = MappingProxyType({
+    'programming': ('python', 'javascript', 'java', 'code*', 'coding', 'program*'),
+    'data_analysis': ('data', 'analy*', 'excel', 'spreadsheet*', 'chart*'),
+    'creative': ('design*', 'photoshop', 'edit*', 'creative', 'art', 'arts'),
+    'business': ('business*', 'marketing', 'financ*', 'excel', 'presentation*'),
+})
+
+LEVEL_INDICATORS = MappingProxyType({
+    'beginner_level': ('beginner*', 'basic*', 'introduct*', 'start*', 'first'),
+    'advanced_level': ('advanced', 'expert*', 'deep', 'complex*', 'master*'),
+})
+
+# First match wins, so the order matters
+DOMAIN_INDICATORS = MappingProxyType({
+    'programming': ('python', 'javascript', 'java', 'c++', 'html', 'css', 'react', 'django'),
+    'data_science': ('data', 'machine learning', 'ai', 'analy*', 'excel', 'sql', 'statistic*'),
+    'web_dev': ('web', 'website*', 'frontend', 'backend', 'html', 'css', 'javascript'),
+    'design': ('photoshop', 'figma', 'ui', 'ux', 'design*', 'graphic*', 'illustrator'),
+    'business': ('excel', 'marketing', 'financ*', 'presentation*', 'powerpoint', 'management'),
+    'language': ('english', 'spanish', 'language*', 'grammar', 'vocabulary', 'speaking'),
+})
+
+TECHNICAL_CONTENT_TERMS = (
+    'code*', 'function*', 'variable*', 'algorithm*', 'syntax',
+    'data', 'analy*', 'formula*', 'equation*', 'technical'
+)
+
+# Named in chapter summaries (ChapterExtractor._extract_tech_terms)
+CHAPTER_TECH_TERMS = (
+    'python', 'javascript', 'react', 'django', 'flask', 'html', 'css',
+    'machine learning', 'ai', 'data science', 'analysis', 'visualization',
+    'langchain', 'llm', 'vector', 'database', 'api', 'web', 'mobile',
+    'design', 'ui', 'ux', 'photoshop', 'figma', 'excel', 'powerpoint'
+)
+
+# Subjects for personalized tips (LearningPathService._detect_possible_subjects)
+SUBJECT_KEYWORDS = MappingProxyType({
+    'programming': ('python', 'javascript', 'java', 'c++', 'coding', 'program*'),
+    'data': ('sql', 'excel', 'analysis', 'visualization', 'power bi'),
+    'web': ('html', 'css', 'react', 'website', 'frontend'),
+    'ai': ('machine learning', 'ai', 'neural', 'llm', 'langchain'),
+    'design': ('photoshop', 'figma', 'ui', 'ux', 'design'),
+    'business': ('excel', 'powerpoint', 'marketing', 'finance'),
+})
+
+# Overly generic terms dropped from key terms
+GENERIC_TERMS = frozenset({'video', 'tutorial', 'learn', 'course', 'channel', 'like', 'subscribe'})
+
+
+@lru_cache(maxsize=None)
+def english_stopwords():
+    """NLTK's English stopword list, read from disk once per process"""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=None)
+def punkt_tokenizer(language='english'):
+    """Punkt sentence model (what nltk.sent_tokenize loads), loaded once per process"""
+    from nltk.tokenize import PunktTokenizer
+    return PunktTokenizer(language)
+
+
+@lru_cache(maxsize=None)
+def cmu_pronunciations():
+    """CMU Pronouncing Dictionary (word -> pronunciations), used for syllable counts"""
+    from nltk.corpus import cmudict
+    return cmudict.dict()
+
+
+@lru_cache(maxsize=None)
+def hyphenator(language='en_US'):
+    """Pyphen hyphenation patterns: syllable fallback for words missing from cmudict"""
+    from pyphen import Pyphen
+    return Pyphen(lang=language)
+
+
+@lru_cache(maxsize=None)
+def lexicon_matcher():
+    """One KeywordMatcher over every lexicon above, compiled once per process"""
+    from .keyword_matcher import KeywordMatcher
+    lexicons = (
+        *TOPIC_CATEGORIES.values(), *LEVEL_INDICATORS.values(), *DOMAIN_INDICATORS.values(),
+        TECHNICAL_CONTENT_TERMS, CHAPTER_TECH_TERMS, *SUBJECT_KEYWORDS.values(),
+    )
+    return KeywordMatcher(term for lexicon in lexicons for term in lexicon)
+
+
+def tokenizer_mode():
+    """'nltk' (default) or 'regex', from settings.ANALYZER_TOKENIZER"""
+    from django.conf import settings
+    return getattr(settings, 'ANALYZER_TOKENIZER', 'nltk')
+
+
+def preload():
+    """
+    Load everything up front, e.g. in a worker process before its first job.
+    Missing NLTK data is reported, not raised: the analyzers raise on use.
+    """
+    hyphenator()
+    lexicon_matcher()
+
+    loaders = (english_stopwords, cmu_pronunciations)
+    if tokenizer_mode() != 'regex':
+        loaders += (punkt_tokenizer,)
+    for loader in loaders:
+        try:
+            loader()
+        except LookupError as e:
+            logger.warning("⚠️ NLTK resource unavailable (%s): run download_nltk.py - %.120s",
+                           loader.__name__, str(e).strip())
@@ -0,0 +1,168 @@
+# analyzer/services/quota_governor.py
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from ..models import ApiQuotaDay, ApiQuotaUsage, ApiRateBucket
+
+# The Data API quota resets at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+# Unit cost per call type (https://developers.google.com/youtube/v3/determine_quota_cost)
+UNIT_COSTS = {
+    'videos.list': 1,
+    'commentThreads.list': 1,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'captions.list': 50,
+    'search.list': 100,
+}
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BATCH = 'batch'
+
+
+class QuotaExceeded(Exception):
+    """Raised instead of making a call that would break the daily budget or rate limit"""
+
+
+class QuotaGovernor:
+    """
+    Accounts YouTube Data API units across every web/worker process.
+
+    - A token bucket (ApiRateBucket) limits the burst rate.
+    - A daily counter (ApiQuotaDay) enforces the daily budget.
+    - Batch callers may not dip into the share reserved for interactive
+      requests, in either the bucket or the daily budget.
+
+    All state lives in the database and is updated with conditional UPDATEs,
+    so it is safe with several processes sharing one SQLite file.
+    """
+
+    BUCKET_NAME = 'youtube-data-api'
+    MAX_RETRIES = 20
+
+    def __init__(self, daily_budget=None, rate_per_second=None, burst=None,
+                 batch_reserve=None, clock=time.time, sleep=time.sleep):
+        self.daily_budget = daily_budget if daily_budget is not None else settings.YOUTUBE_QUOTA_DAILY_BUDGET
+        self.rate_per_second = rate_per_second if rate_per_second is not None else settings.YOUTUBE_QUOTA_RATE_PER_SECOND
+        self.burst = burst if burst is not None else settings.YOUTUBE_QUOTA_BURST
+        self.batch_reserve = batch_reserve if batch_reserve is not None else settings.YOUTUBE_QUOTA_BATCH_RESERVE
+        self.clock = clock
+        self.sleep = sleep
+
+    def acquire(self, call_type, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Block until `call_type` may be made, then record its cost.
+        Interactive callers give up quickly; batch callers wait for tokens.
+        """
+        cost = UNIT_COSTS.get(call_type, 1)
+        if timeout is None:
+            timeout = 10 if priority == PRIORITY_INTERACTIVE else 300
+        deadline = self.clock() + timeout
+
+        while True:
+            wait_seconds = self._take_tokens(cost, priority)
+            if wait_seconds <= 0:
+                break
+            if self.clock() + wait_seconds > deadline:
+                raise QuotaExceeded(
+                    f'YouTube API rate limit reached for {call_type} ({priority}); try again shortly'
+                )
+            self.sleep(wait_seconds)
+
+        self._charge_daily(call_type, cost, priority)
+        return cost
+
+    def current_spend(self):
+        """Today's spend, remaining budget and per call type breakdown"""
+        day = self.quota_day()
+        used = ApiQuotaDay.objects.filter(day=day).values_list('units_used', flat=True).first() or 0
+
+        by_call_type = {}
+        for row in ApiQuotaUsage.objects.filter(day=day).values('call_type', 'priority').annotate(
+            units_total=Sum('units'), calls_total=Sum('calls')
+        ):
+            entry = by_call_type.setdefault(row['call_type'], {'units': 0, 'calls': 0, 'by_priority': {}})
+            entry['units'] += row['units_total']
+            entry['calls'] += row['calls_total']
+            entry['by_priority'][row['priority']] = row['units_total']
+
+        return {
+            'day': day.isoformat(),
+            'daily_budget': self.daily_budget,
+            'batch_limit': self._daily_limit(PRIORITY_BATCH),
+            'units_used': used,
+            'units_remaining': max(0, self.daily_budget - used),
+            'by_call_type': by_call_type,
+        }
+
+    def quota_day(self):
+        return datetime.fromtimestamp(self.clock(), QUOTA_TIMEZONE).date()
+
+    def _daily_limit(self, priority):
+        if priority == PRIORITY_BATCH:
+            return int(self.daily_budget * (1 - self.batch_reserve))
+        return self.daily_budget
+
+    def _charge_daily(self, call_type, cost, priority):
+        day = self.quota_day()
+        limit = self._daily_limit(priority)
+
+        self._ensure_row(ApiQuotaDay, day=day)
+        charged = ApiQuotaDay.objects.filter(
+            day=day,
+            units_used__lte=limit - cost
+        ).update(units_used=F('units_used') + cost)
+
+        if not charged:
+            raise QuotaExceeded(
+                f'Daily YouTube API quota exhausted for {priority} requests ({limit} units)'
+            )
+
+        self._ensure_row(ApiQuotaUsage, day=day, call_type=call_type, priority=priority)
+        ApiQuotaUsage.objects.filter(
+            day=day, call_type=call_type, priority=priority
+        ).update(units=F('units') + cost, calls=F('calls') + 1)
+
+    def _take_tokens(self, cost, priority):
+        """
+        Try to remove `cost` tokens from the shared bucket.
+        Returns 0 on success, otherwise the seconds to wait before retrying.
+        """
+        floor = self.burst * self.batch_reserve if priority == PRIORITY_BATCH else 0
+        # Calls costlier than the bucket (search.list) wait for a full bucket and go into debt
+        needed = min(cost, self.burst - floor)
+
+        for _ in range(self.MAX_RETRIES):
+            now = self.clock()
+            bucket = self._ensure_row(
+                ApiRateBucket,
+                name=self.BUCKET_NAME,
+                defaults={'tokens': self.burst, 'updated_at': now}
+            )
+
+            elapsed = max(0.0, now - bucket.updated_at)
+            tokens = min(self.burst, bucket.tokens + elapsed * self.rate_per_second)
+
+            if tokens - needed < floor:
+                return (needed + floor - tokens) / self.rate_per_second
+
+            # Only succeeds if nobody else refilled/spent since we read the row
+            updated = ApiRateBucket.objects.filter(
+                pk=bucket.pk, version=bucket.version
+            ).update(tokens=tokens - cost, updated_at=now, version=F('version') + 1)
+            if updated:
+                return 0
+
+        return 1.0 / self.rate_per_second
+
+    @staticmethod
+    def _ensure_row(model, defaults=None, **lookup):
+        try:
+            return model.objects.get_or_create(defaults=defaults, **lookup)[0]
+        except IntegrityError:
+            # Created concurrently by another process
+            return model.objects.get(**lookup)
@@ -1,26 +1,38 @@
 # analyzer/services/rag_service.py
+import logging
 import chromadb
-from sentence_transformers import SentenceTransformer
 from groq import Groq
+import hashlib
 import os
 from typing import List, Dict
 import re
+from django.conf import settings
+from .embedding_model import shared_embedding_model
+from .single_flight import SingleFlight
+from .tokenized_transcript import TokenizedTranscript
+from .language_detection import detect_language
+from .stage_timing import stage
+
+logger = logging.getLogger(__name__)
 
 class RAGService:
     def __init__(self):
         """Initialize with LAZY LOADING for multilingual model"""
-        print("🌍 Initializing RAG Service (Multilingual: English + Hindi)...")
+        logger.debug("🌍 Initializing RAG Service (Multilingual: English + Hindi)")
         
         # LAZY LOADING - model loads ONLY when first used
         self.embedding_model = None
         self.model_loaded = False
         
         # Initialize ChromaDB (fast, lightweight)
-        print("💾 Initializing vector database...")
-        self.chroma_client = chromadb.Client()
+        # In-memory by default; set CHROMA_PERSIST_DIR to keep the index on disk
+        persist_dir = getattr(settings, 'CHROMA_PERSIST_DIR', '')
+        if persist_dir:
+            self.chroma_client = chromadb.PersistentClient(path=persist_dir)
+        else:
+            self.chroma_client = chromadb.Client()
         
         # Initialize Groq LLM (fast)
-        print("🤖 Connecting to Groq LLM...")
         self.groq_api_key = self._get_groq_key()
         
         if not self.groq_api_key:
@@ -33,32 +45,18 @@ class RAGService:
         self.supported_languages = {
             'hi': 'Hindi', 'en': 'English', 'es': 'Spanish', 'fr': 'French',
             'de': 'German', 'zh': 'Chinese', 'ja': 'Japanese', 'ko': 'Korean',
-            'ar': 'Arabic', 'ru': 'Russian', 'pt': 'Portuguese'
+            'ar': 'Arabic', 'ru': 'Russian', 'pt': 'Portuguese', 'hinglish': 'Hinglish'
         }
         
-        print("✅ RAG Service ready (Model loads on first question)")
+        logger.debug("✅ RAG Service ready (Model loads on first question)")
     
     def _load_embedding_model(self):
-        """Load multilingual model from cache - called only when needed"""
+        """Use the process-wide multilingual model - loaded only when needed"""
         if self.model_loaded:
             return
-            
-        print("📥 Loading multilingual model from cache (first time only)...")
-        try:
-            # Load from cache (already downloaded, no internet)
-            self.embedding_model = SentenceTransformer(
-                'paraphrase-multilingual-MiniLM-L12-v2'
-            )
-            print("✅ Loaded: paraphrase-multilingual-MiniLM-L12-v2")
-            print("   Supports: English, Hindi, and 50+ languages")
-            print("   Loaded from cache - no internet needed")
-            
-        except Exception as e:
-            print(f"❌ Cache load failed: {e}")
-            print("🔄 Loading smaller model...")
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-            print("✅ Loaded fallback model")
-        
+
+        # Shared with the embedding comment classifier, so it loads once per process
+        self.embedding_model = shared_embedding_model()
         self.model_loaded = True
     
     def _get_groq_key(self):
@@ -69,44 +67,73 @@ class RAGService:
                     if 'GROQ_API_KEY' in line:
                         return line.split('=')[1].strip().strip('"\'')
         except Exception as e:
-            print(f"⚠️ Error reading .env: {e}")
+            logger.warning("⚠️ Error reading .env: %s", e)
         return None
     
-    def process_transcript(self, transcript_text: str, video_id: str, video_duration_minutes=60):
+    def process_transcript(self, transcript_text: str, video_id: str, video_duration_minutes=60, tokenized=None):
         """
         Process transcript: chunk, embed, store in vector DB
         Returns: Number of chunks created
+
+        An unchanged transcript that is already indexed is not re-embedded, and
+        concurrent requests for the same transcript share one embedding pass.
         """
+        transcript_hash = hashlib.sha256(transcript_text.encode('utf-8')).hexdigest()
+        safe_collection_name = "vid_" + video_id.replace('-', '_').replace('.', '_')
+
+        chunks_count = SingleFlight().run(
+            f"embed:{safe_collection_name}:{transcript_hash}",
+            lambda: self._index_transcript(
+                transcript_text, video_id, safe_collection_name, transcript_hash, video_duration_minutes, tokenized
+            )
+        )
+
+        # Another process indexed it into its own (in-memory) store; build ours
+        if self._indexed_chunk_count(safe_collection_name, transcript_hash) is None:
+            chunks_count = self._index_transcript(
+                transcript_text, video_id, safe_collection_name, transcript_hash, video_duration_minutes, tokenized
+            )
+        return chunks_count
+
+    def _indexed_chunk_count(self, collection_name, transcript_hash):
+        """Chunk count if the collection already holds this exact transcript, else None"""
+        try:
+            collection = self.chroma_client.get_collection(collection_name)
+        except Exception:
+            return None
+
+        if (collection.metadata or {}).get('transcript_hash') != transcript_hash:
+            return None
+        return collection.count()
+
+    def _index_transcript(self, transcript_text, video_id, safe_collection_name, transcript_hash,
+                          video_duration_minutes, tokenized=None):
+        existing = self._indexed_chunk_count(safe_collection_name, transcript_hash)
+        if existing is not None:
+            logger.debug("♻️ Vector store already up to date for %s (%d chunks)", video_id, existing)
+            return existing
+
         # LAZY LOAD: Model loads here (first time only)
         self._load_embedding_model()
         
-        print(f"📝 Processing transcript for video: {video_id[:10]}...")
-        
-        # ========== DEBUG: Check transcript ==========
-        print(f"🔍 DEBUG: Transcript length: {len(transcript_text)} characters")
-        print(f"🔍 DEBUG: First 200 chars: {transcript_text[:200]}")
-        # ========== END DEBUG ==========
-        
-        # ========== FIX: Create safe collection name ==========
-        safe_collection_name = "vid_" + video_id.replace('-', '_').replace('.', '_')
-        # ========== END FIX ==========
+        logger.debug("📝 Indexing transcript for %s (%d characters): %.200s",
+                     video_id, len(transcript_text), transcript_text)
         
         # Delete existing collection if any
         try:
             self.chroma_client.delete_collection(safe_collection_name)
-            print(f"♻️ Cleared old vector store for this video")
+            logger.debug("♻️ Cleared old vector store for %s", video_id)
         except:
             pass
         
         # Create new collection
         collection = self.chroma_client.create_collection(
             name=safe_collection_name,
-            metadata={"video_id": video_id}
+            metadata={"video_id": video_id, "transcript_hash": transcript_hash}
         )
         
         # Chunk the transcript
-        chunks = self._chunk_transcript(transcript_text, video_duration_minutes)
-        print(f"✂️ Created {len(chunks)} chunks from transcript")
+        chunks = self._chunk_transcript(transcript_text, video_duration_minutes, tokenized)
         
         # Add chunks to vector DB
         for i, chunk in enumerate(chunks):
@@ -118,26 +145,23 @@ class RAGService:
                 metadatas=[{
                     'chunk_id': i,
                     'timestamp': chunk['timestamp'],
-                    'word_count': len(chunk['text'].split()),
+                    'word_count': chunk['word_count'],
                     'video_id': video_id
                 }],
                 ids=[f"chunk_{i}"]
             )
         
-        print(f"💿 Stored {len(chunks)} chunks in vector database")
+        logger.info("💿 Stored %d chunks for %s in the vector database", len(chunks), video_id)
         return len(chunks)
     
-    def _chunk_transcript(self, transcript_text: str, video_duration_minutes=60):
+    def _chunk_transcript(self, transcript_text: str, video_duration_minutes=60, tokenized=None):
         """Split transcript by WORD COUNT since there's no punctuation"""
         if not transcript_text or len(transcript_text.strip()) < 50:
-            print("⚠️ WARNING: Transcript too short or empty")
+            logger.warning("⚠️ Transcript too short or empty")
             return []
 
-        print(f"🔍 DEBUG: Original transcript length: {len(transcript_text)} chars")
-
-        # Split into words
-        words = transcript_text.split()
-        print(f"🔍 DEBUG: Total words: {len(words)}")
+        # Whitespace words, shared with the other stages when a TokenizedTranscript is passed in
+        words = (tokenized or TokenizedTranscript(transcript_text)).words
 
         # Create chunks of 100 words each
         chunk_size = 100
@@ -155,7 +179,7 @@ class RAGService:
                 'word_count': len(chunk_words)
             })
 
-        print(f"✅ Created {len(chunks)} chunks from {len(words)} words")
+        logger.debug("✂️ Created %d chunks from %d words", len(chunks), len(words))
         return chunks
     
     def _estimate_timestamp(self, position: int, total_items: int, video_duration_minutes=60):
@@ -181,21 +205,23 @@ class RAGService:
     def ask_question(self, question: str, video_id: str, video_title: str, video_duration_minutes=60):
         """Main Q&A with duration for better timestamps"""
         
-        print(f"🤔 Question: {question[:50]}...")
+        logger.debug("🤔 Question: %.50s", question)
         
         try:
-            relevant_chunks = self._search_chunks(question, video_id)
+            with stage('retrieval'):
+                relevant_chunks = self._search_chunks(question, video_id)
             
             if not relevant_chunks:
                 return self._get_fallback_answer(question, video_title)
             
-            print(f"🔍 Found {len(relevant_chunks)} relevant chunks")
+            logger.debug("🔍 Found %d relevant chunks", len(relevant_chunks))
             
-            answer_data = self._generate_groq_answer(question, relevant_chunks, video_title)
+            with stage('llm'):
+                answer_data = self._generate_groq_answer(question, relevant_chunks, video_title)
             return answer_data
             
         except Exception as e:
-            print(f"❌ RAG Error: {e}")
+            logger.warning("❌ RAG Error: %s", e)
             return self._get_fallback_answer(question, video_title)
     
     def _search_chunks(self, question: str, video_id: str):
@@ -226,7 +252,7 @@ class RAGService:
             return chunks
             
         except Exception as e:
-            print(f"⚠️ Search error: {e}")
+            logger.warning("⚠️ Search error: %s", e)
             return []
     
     def _generate_groq_answer(self, question: str, chunks: List[Dict], video_title: str):
@@ -310,7 +336,7 @@ Now create the answer:"""
             }
             
         except Exception as e:
-            print(f"⚠️ Groq API error: {e}")
+            logger.warning("⚠️ Groq API error: %s", e)
             return self._get_local_answer(question, chunks, video_title)
     
     def _clean_formatting(self, answer_text):
@@ -398,24 +424,6 @@ Now create the answer:"""
         return lines
     
     def detect_language(self, text):
-        """Detect language of text"""
-        text_lower = text.lower()[:1000]
-        
-        language_indicators = {
-            'hi': ['है', 'और', 'के', 'में', 'की'],
-            'en': ['the', 'and', 'is', 'in', 'to'],
-            'es': ['el', 'la', 'que', 'en', 'y'],
-            'fr': ['le', 'la', 'et', 'en', 'de'],
-        }
-        
-        scores = {}
-        for lang_code, indicators in language_indicators.items():
-            score = sum(1 for word in indicators if word in text_lower)
-            if score > 0:
-                scores[lang_code] = score
-        
-        if scores:
-            return max(scores.items(), key=lambda x: x[1])[0]
-        
-        return 'en'
+        """Detect language of text (same engine as TranscriptAnalyzer)"""
+        return detect_language(text)
     
\ No newline at end of file
@@ -0,0 +1,162 @@
+# analyzer/services/readability.py
+#
+# Flesch Reading Ease and Flesch-Kincaid grade in one pass, counted the way
+# textstat counts them (cmudict syllables, pyphen fallback) but with each
+# distinct word's syllables looked up once and memoized across transcripts.
+# Long transcripts can optionally be estimated from a stratified sentence
+# sample, with a 95% confidence interval.
+import re
+from collections import Counter
+from functools import lru_cache
+import numpy as np
+from .nlp_resources import cmu_pronunciations, hyphenator
+
+# Distinct words kept in the syllable memo (a long lecture has ~5-10k)
+SYLLABLE_CACHE_SIZE = 50_000
+
+# Sampling: contiguous blocks of sentences, each sampled in proportion to its size
+SAMPLE_STRATA = 10
+Z_95 = 1.96
+
+# textstat's sentence rule, plus punctuation removal that keeps contractions
+# ("don't") and the sentence-ending marks the split needs
+_SENTENCE = re.compile(r"\b[^.!?]+[.!?]*")
+_NON_CONTRACTION_APOSTROPHE = re.compile(r"'(?![tsd]|ve|ll|re)")
+_PUNCTUATION = re.compile(r"[^\w\s'.!?]")
+_SENTENCE_MARKS = str.maketrans('', '', '.!?')
+
+
+def sample_size():
+    """Sentences to sample per transcript (settings.READABILITY_SAMPLE_SENTENCES); 0 = exact count"""
+    from django.conf import settings
+    return max(0, getattr(settings, 'READABILITY_SAMPLE_SENTENCES', 0))
+
+
+@lru_cache(maxsize=None)
+def _pronunciations():
+    try:
+        return cmu_pronunciations()
+    except LookupError:
+        # cmudict not downloaded: every word goes through pyphen
+        return {}
+
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def count_syllables(word):
+    """Syllables in a lowercased word: cmudict stress marks, else pyphen hyphenation points + 1"""
+    pronunciations = _pronunciations().get(word)
+    if pronunciations:
+        return sum(1 for phone in pronunciations[0] if phone[-1].isdigit())
+    return len(hyphenator().positions(word)) + 1
+
+
+def flesch_reading_ease(words_per_sentence, syllables_per_word):
+    if not words_per_sentence or not syllables_per_word:
+        return 0.0
+    return 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+
+
+def flesch_kincaid_grade(words_per_sentence, syllables_per_word):
+    if not words_per_sentence or not syllables_per_word:
+        return 0.0
+    return 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+
+
+def _clean(text):
+    """Lowercased text without punctuation, except contractions and . ! ?"""
+    return _PUNCTUATION.sub('', _NON_CONTRACTION_APOSTROPHE.sub('', text)).lower()
+
+
+def _words(sentence):
+    return sentence.translate(_SENTENCE_MARKS).split()
+
+
+def _word_count(sentence):
+    # Marks only occur at the end of a sentence, so only the last token can be a bare "..."
+    tokens = sentence.split()
+    return len(tokens) - (not tokens[-1].strip('.!?')) if tokens else 0
+
+
+def readability_scores(text, sample_sentences=None, seed=0):
+    """
+    {'flesch': float, 'fk_grade': float, 'words': int, 'sentences': int, 'sampled': int,
+     'flesch_ci': (low, high) | None, 'fk_grade_ci': (low, high) | None}
+
+    With `sample_sentences` (default: READABILITY_SAMPLE_SENTENCES) smaller than
+    the number of sentences, both scores are estimated from a stratified sample
+    and reported with 95% confidence intervals; otherwise they are exact.
+    """
+    cleaned = _clean(text)
+    sentences = _SENTENCE.findall(cleaned)
+    if sample_sentences is None:
+        sample_sentences = sample_size()
+
+    if sample_sentences and len(sentences) > sample_sentences:
+        return _sampled_scores(sentences, sample_sentences, seed)
+
+    # Exact: every distinct word's syllables looked up once
+    frequencies = Counter(cleaned.translate(_SENTENCE_MARKS).split())
+    words = sum(frequencies.values())
+    syllables = sum(count * count_syllables(word) for word, count in frequencies.items())
+    # Fragments of one or two words don't count as sentences (textstat rule)
+    counted = max(1, sum(1 for sentence in sentences if _word_count(sentence) > 2)) if sentences else 0
+
+    words_per_sentence = words / counted if counted else 0.0
+    syllables_per_word = syllables / words if words else 0.0
+    return {
+        'flesch': flesch_reading_ease(words_per_sentence, syllables_per_word),
+        'fk_grade': flesch_kincaid_grade(words_per_sentence, syllables_per_word),
+        'words': words,
+        'sentences': counted,
+        'sampled': 0,
+        'flesch_ci': None,
+        'fk_grade_ci': None,
+    }
+
+
+def _sampled_scores(sentences, sample_sentences, seed):
+    """Stratified sample of sentences; ratio estimates with delta-method intervals"""
+    rng = np.random.default_rng(seed)
+    total = len(sentences)
+
+    strata = []
+    for block in np.array_split(np.arange(total), min(SAMPLE_STRATA, sample_sentences // 2 or 1)):
+        size = min(len(block), max(2, round(sample_sentences * len(block) / total)))
+        picked = rng.choice(block, size=size, replace=False)
+        picked_words = [_words(sentences[i]) for i in picked]
+        words = np.array([len(sentence) for sentence in picked_words], dtype=float)
+        syllables = np.array([sum(map(count_syllables, sentence)) for sentence in picked_words], dtype=float)
+        strata.append((len(block), words, syllables, (words > 2).astype(float)))
+
+    # Estimated totals over the whole transcript
+    total_words = sum(size * words.mean() for size, words, _, _ in strata)
+    total_syllables = sum(size * syllables.mean() for size, _, syllables, _ in strata)
+    total_sentences = max(1.0, sum(size * counted.mean() for size, _, _, counted in strata))
+
+    words_per_sentence = total_words / total_sentences
+    syllables_per_word = total_syllables / total_words if total_words else 0.0
+
+    def interval(estimate, sentence_weight, syllable_weight):
+        # Linearized score per sentence, then the stratified variance of its total
+        variance = 0.0
+        for size, words, syllables, counted in strata:
+            linearized = (
+                sentence_weight * (words - words_per_sentence * counted) / total_sentences
+                + syllable_weight * (syllables - syllables_per_word * words) / (total_words or 1.0)
+            )
+            if len(words) > 1 and size > len(words):
+                variance += size ** 2 * (1 - len(words) / size) * linearized.var(ddof=1) / len(words)
+        margin = Z_95 * variance ** 0.5
+        return (float(estimate - margin), float(estimate + margin))
+
+    flesch = flesch_reading_ease(words_per_sentence, syllables_per_word)
+    fk_grade = flesch_kincaid_grade(words_per_sentence, syllables_per_word)
+    return {
+        'flesch': float(flesch),
+        'fk_grade': float(fk_grade),
+        'words': round(total_words),
+        'sentences': round(total_sentences),
+        'sampled': sum(len(words) for _, words, _, _ in strata),
+        'flesch_ci': interval(flesch, -1.015, -84.6),
+        'fk_grade_ci': interval(fk_grade, 0.39, 11.8),
+    }
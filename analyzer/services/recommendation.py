@@ -0,0 +1,70 @@
+# analyzer/services/recommendation.py
+
+def calculate_recommendation_score(video, target_level):
+    """Calculate how well this video matches target level"""
+    level_values = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
+
+    video_level = video['skill_level'].lower()
+    level_distance = abs(
+        level_values.get(video_level, 2) -
+        level_values.get(target_level, 2)
+    )
+
+    if level_distance == 0:
+        level_match_score = 100
+    elif level_distance == 1:
+        level_match_score = 70
+    else:
+        level_match_score = 30
+
+    # Safe access to readability with proper fallback
+    try:
+        readability = video['analysis']['readability'].get('normalized', 50)
+        if readability == 'N/A':
+            readability = 50
+        readability = float(readability) if readability else 50
+    except (KeyError, TypeError, ValueError):
+        readability = 50
+
+    # Safe access to jargon percentage
+    try:
+        jargon = video['analysis']['jargon'].get('percentage', 0)
+        jargon = float(jargon) if jargon else 0
+    except (KeyError, TypeError, ValueError):
+        jargon = 0
+
+    # Safe access to pacing
+    try:
+        pacing = video['analysis']['pacing'].get('words_per_minute', 150)
+        pacing = float(pacing) if pacing else 150
+    except (KeyError, TypeError, ValueError):
+        pacing = 150
+
+    # PROPER PACING SCORE: 130-160 WPM = ideal for learning (research-based)
+    if 130 <= pacing <= 165:
+        pacing_score = 100  # Perfect learning pace
+    elif 110 <= pacing < 130:
+        # Slower than ideal: 100 at 110, declining to 80 at 130
+        pacing_score = 100 - (130 - pacing) * 1.0
+    elif 165 < pacing <= 185:
+        # Faster than ideal: 100 at 165, declining to 60 at 185
+        pacing_score = 100 - (pacing - 165) * 2.0
+    elif pacing < 110:
+        # Too slow
+        pacing_score = max(40, 100 - (110 - pacing) * 1.5)
+    else:  # pacing > 185
+        # Too fast
+        pacing_score = max(30, 100 - (pacing - 185) * 2.5)
+
+    pacing_score = max(0, min(100, pacing_score))
+
+    # PROPER CONTENT SCORE WEIGHTING
+    content_score = (
+        readability * 0.4 +  # Readability is important
+        (100 - min(jargon * 8, 100)) * 0.35 +  # Jargon penalty (8% = 64 penalty)
+        pacing_score * 0.25  # Pacing matters for learning
+    )
+
+    overall_score = (level_match_score * 0.7) + (content_score * 0.3)
+
+    return round(overall_score, 1)
@@ -0,0 +1,166 @@
+# analyzer/services/single_flight.py
+import copy
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from ..models import AnalysisLease
+
+
+class _InProcessCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent callers asking for the same key share one
+    computation instead of each running it.
+
+    - Threads in the same process wait on an in-memory Event.
+    - Other processes see the AnalysisLease row for the key and poll it until
+      the leader publishes the result (or its lease expires and they take over).
+
+    Finished results stay readable for `share_seconds`, which covers the burst
+    of requests that follows a link being shared. Expired lease rows are
+    deleted by purge_expired(), which publishing leaders run at most once per
+    PURGE_INTERVAL seconds.
+    """
+
+    PURGE_INTERVAL = 300
+
+    _calls_lock = threading.Lock()
+    _calls = {}
+    _purged_at = 0.0
+
+    def __init__(self, lease_seconds=600, share_seconds=120, poll_interval=0.25, wait_timeout=None):
+        self.lease = timedelta(seconds=lease_seconds)
+        self.share = timedelta(seconds=share_seconds)
+        self.poll_interval = poll_interval
+        self.wait_timeout = lease_seconds if wait_timeout is None else wait_timeout
+
+    def run(self, key, compute, cacheable=None):
+        """
+        Return compute() for key, running it at most once across concurrent callers.
+        cacheable(result) -> False keeps a result (e.g. an error page) out of the share window.
+        """
+        with self._calls_lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _InProcessCall()
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            # Same as a cross-process follower: a private copy, safe to mutate
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self._run_across_processes(key, compute, cacheable)
+            # Followers deep-copy call.result while the leader's caller may already be changing its own
+            return copy.deepcopy(call.result)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._calls_lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _run_across_processes(self, key, compute, cacheable):
+        owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            lease, acquired = self._try_acquire(key, owner)
+            if acquired:
+                return self._compute_and_publish(lease, compute, cacheable)
+
+            if lease is not None and lease.status == AnalysisLease.STATUS_DONE:
+                return lease.result
+
+            if time.monotonic() > deadline:
+                # The leader is taking too long; don't keep this request hanging
+                return compute()
+
+            time.sleep(self.poll_interval)
+
+    def _try_acquire(self, key, owner):
+        """Returns (lease, True) if this caller should compute, else (lease, False)"""
+        now = timezone.now()
+        try:
+            # Savepoint, so a lost race doesn't break a surrounding transaction
+            with transaction.atomic():
+                lease = AnalysisLease.objects.create(key=key, owner=owner, expires_at=now + self.lease)
+            return lease, True
+        except IntegrityError:
+            pass
+
+        lease = AnalysisLease.objects.filter(key=key).first()
+        if lease is None:
+            # Deleted between our INSERT and SELECT; the next loop iteration retries
+            return None, False
+
+        # Take over leases whose holder failed/died, or whose shared result went stale
+        if lease.status == AnalysisLease.STATUS_FAILED or lease.expires_at <= now:
+            taken = AnalysisLease.objects.filter(
+                pk=lease.pk,
+                status=lease.status,
+                expires_at=lease.expires_at
+            ).update(
+                owner=owner,
+                status=AnalysisLease.STATUS_RUNNING,
+                result=None,
+                error='',
+                expires_at=now + self.lease
+            )
+            if taken:
+                return lease, True
+
+        return lease, False
+
+    def _compute_and_publish(self, lease, compute, cacheable):
+        try:
+            result = compute()
+        except Exception as e:
+            AnalysisLease.objects.filter(pk=lease.pk).update(
+                status=AnalysisLease.STATUS_FAILED,
+                error=str(e)[:1000],
+                expires_at=timezone.now()
+            )
+            raise
+
+        share = self.share
+        if cacheable is not None and not cacheable(result):
+            # Long enough for callers already waiting to pick it up, no longer
+            share = timedelta(seconds=self.poll_interval * 4)
+
+        AnalysisLease.objects.filter(pk=lease.pk).update(
+            status=AnalysisLease.STATUS_DONE,
+            result=result,
+            expires_at=timezone.now() + share
+        )
+        self._purge_periodically()
+        return result
+
+    @classmethod
+    def _purge_periodically(cls):
+        now = time.monotonic()
+        with cls._calls_lock:
+            if now - cls._purged_at < cls.PURGE_INTERVAL:
+                return
+            cls._purged_at = now
+        cls.purge_expired()
+
+    @staticmethod
+    def purge_expired(grace=timedelta(minutes=10)):
+        """Delete leases that expired more than `grace` ago (nobody reads them again); returns how many"""
+        deleted, _ = AnalysisLease.objects.filter(expires_at__lt=timezone.now() - grace).delete()
+        return deleted
@@ -0,0 +1,137 @@
+# analyzer/services/stage_timing.py
+#
+# Wall time per pipeline stage (metadata, transcript, analysis, comments,
+# embedding, retrieval, llm, render, ...). StageTimingMiddleware opens a
+# per-request collector; `with stage('transcript'):` blocks add to it and to
+# the process-wide latency histograms served at /metrics. Outside a collected
+# request (metrics disabled, job workers, tests) a stage is a shared no-op.
+# No Django imports: the services use this from worker processes too.
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+# Seconds; YouTube/LLM calls take seconds, analysis of long transcripts tens of them
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_collector = ContextVar('stage_timing_collector', default=None)
+_NOT_COLLECTED = nullcontext()
+
+
+class Histogram:
+    """Cumulative Prometheus histogram for one label set"""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Request/stage latency histograms and request counters, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = defaultdict(Histogram)
+        self._requests = defaultdict(Histogram)
+        self._responses = defaultdict(int)
+
+    def observe_stage(self, name, seconds):
+        with self._lock:
+            self._stages[name].observe(seconds)
+
+    def observe_request(self, view, method, status, seconds):
+        with self._lock:
+            self._requests[view].observe(seconds)
+            self._responses[(view, method, status)] += 1
+
+    def render(self):
+        with self._lock:
+            lines = [
+                '# HELP guide_tube_requests_total Responses by view, method and status.',
+                '# TYPE guide_tube_requests_total counter',
+            ]
+            for (view, method, status), count in sorted(self._responses.items()):
+                lines.append(
+                    f'guide_tube_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}'
+                )
+            lines += _histogram_lines(
+                'guide_tube_request_duration_seconds', 'Wall time per request.', 'view', self._requests
+            )
+            lines += _histogram_lines(
+                'guide_tube_stage_duration_seconds', 'Wall time per pipeline stage.', 'stage', self._stages
+            )
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(metric, help_text, label, histograms):
+    lines = [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+    for value, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{{label}="{value}"}} {histogram.total:.6f}')
+        lines.append(f'{metric}_count{{{label}="{value}"}} {histogram.count}')
+    return lines
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Stage:
+    __slots__ = ('name', 'timings', 'started')
+
+    def __init__(self, name, timings):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.started
+        # Repeated stages (one transcript fetch per compared video) add up
+        self.timings[self.name] = self.timings.get(self.name, 0.0) + seconds
+        REGISTRY.observe_stage(self.name, seconds)
+        return False
+
+
+def stage(name):
+    """Context manager timing `name` for the current request; a no-op when nothing collects"""
+    timings = _collector.get()
+    if timings is None:
+        return _NOT_COLLECTED
+    return _Stage(name, timings)
+
+
+def start_request():
+    """Collect stages for the current request; returns (timings dict, token for finish_request)"""
+    timings = {}
+    return timings, _collector.set(timings)
+
+
+def finish_request(token):
+    _collector.reset(token)
+
+
+def server_timing(timings, total_seconds):
+    """Server-Timing header value, e.g. 'transcript;dur=812.3, analysis;dur=95.1, total;dur=930.0'"""
+    metrics = [f'{_token(name)};dur={seconds * 1000:.1f}' for name, seconds in timings.items()]
+    metrics.append(f'total;dur={total_seconds * 1000:.1f}')
+    return ', '.join(metrics)
+
+
+def _token(name):
+    return re.sub(r'[^A-Za-z0-9_-]', '_', name)
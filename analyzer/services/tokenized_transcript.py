@@ -0,0 +1,88 @@
+# analyzer/services/tokenized_transcript.py
+from collections import Counter
+from functools import cached_property, partial
+from .nlp_resources import english_stopwords, punkt_tokenizer, tokenizer_mode
+
+
+class TokenizedTranscript:
+    """
+    One tokenization of a transcript, shared by every analysis stage.
+
+    Each view is computed on first access and then cached, so a stage that
+    only needs whitespace words (the RAG chunker) never pays for NLTK, and
+    TranscriptAnalyzer + TopicDetector share a single word_tokenize pass.
+    """
+
+    def __init__(self, text, tokenizer=None):
+        self.text = text
+        # 'nltk' (Treebank + Punkt) or 'regex' (analyzer/services/fast_tokenizer.py)
+        self.tokenizer = tokenizer or tokenizer_mode()
+
+    @cached_property
+    def words(self):
+        """Whitespace-separated words (chunking, word counts)"""
+        return self.text.split()
+
+    @property
+    def word_count(self):
+        return len(self.words)
+
+    @cached_property
+    def lower_text(self):
+        return self.text.lower()
+
+    @cached_property
+    def _tokenized(self):
+        if self.tokenizer == 'regex':
+            from .fast_tokenizer import regex_sent_tokenize, regex_word_tokenize
+            sentences = regex_sent_tokenize(self.text)
+            tokenize = regex_word_tokenize
+        else:
+            from nltk.tokenize import word_tokenize  # heavy import, deferred to first use
+            # Same split as sent_tokenize, with the Punkt model preload() already loaded
+            sentences = punkt_tokenizer().tokenize(self.text)
+            # Same result as word_tokenize(text), keeping the sentence boundaries
+            tokenize = partial(word_tokenize, preserve_line=True)
+
+        tokens = []
+        sentence_starts = []
+        for sentence in sentences:
+            sentence_starts.append(len(tokens))
+            tokens.extend(tokenize(sentence))
+        return tokens, sentence_starts
+
+    @property
+    def tokens(self):
+        return self._tokenized[0]
+
+    @property
+    def sentence_starts(self):
+        """Index into `tokens` where each sentence begins"""
+        return self._tokenized[1]
+
+    @property
+    def sentence_count(self):
+        return len(self.sentence_starts)
+
+    @cached_property
+    def lower(self):
+        return [token.lower() for token in self.tokens]
+
+    @cached_property
+    def stopword_mask(self):
+        """1 where the (lowercased) token is an English stopword"""
+        stop_words = english_stopwords()
+        return bytearray(token in stop_words for token in self.lower)
+
+    @cached_property
+    def content_words(self):
+        """Lowercased alphanumeric tokens that are not stopwords"""
+        return [
+            token for token, is_stopword in zip(self.lower, self.stopword_mask)
+            if not is_stopword and token.isalnum()
+        ]
+
+    @cached_property
+    def counts(self):
+        """Frequency of each content word, in order of first appearance"""
+        return Counter(self.content_words)
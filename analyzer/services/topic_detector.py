@@ -1,117 +1,91 @@
-import nltk
-from nltk import pos_tag, word_tokenize
-from nltk.corpus import stopwords
 from collections import Counter
 import re
+from .nlp_resources import (
+    english_stopwords, lexicon_matcher, TOPIC_INDICATORS, TOPIC_CATEGORIES, LEVEL_INDICATORS,
+    DOMAIN_INDICATORS, TECHNICAL_CONTENT_TERMS, GENERIC_TERMS
+)
+from .tokenized_transcript import TokenizedTranscript
 
 class TopicDetector:
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
+        # Shared, immutable resources: no per-instance corpus reads
+        self.stop_words = english_stopwords()
         # Common technical terms across domains
-        self.technical_indicators = {
-            'programming': ['code', 'function', 'variable', 'loop', 'algorithm', 'syntax', 'debug'],
-            'data': ['data', 'analysis', 'dataset', 'visualization', 'statistic', 'chart', 'graph'],
-            'design': ['design', 'layout', 'color', 'interface', 'ui', 'ux', 'prototype'],
-            'business': ['business', 'marketing', 'finance', 'strategy', 'management', 'analysis'],
-            'academic': ['theory', 'concept', 'principle', 'research', 'study', 'paper'],
-            'practical': ['tutorial', 'guide', 'step', 'practice', 'exercise', 'project']
-        }
+        self.technical_indicators = TOPIC_INDICATORS
     
-    def detect_topics(self, transcript_text, title):
+    def detect_topics(self, transcript_text, title, tokenized=None):
         """Dynamically detect topics from transcript"""
-        # Combine title and transcript for better context
-        full_text = f"{title} {transcript_text}".lower()
+        tokenized = tokenized or TokenizedTranscript(transcript_text)
+        
+        # One scan of title + transcript for every lexicon below
+        matcher = lexicon_matcher()
+        term_counts = matcher.counts(title.lower()) + matcher.counts(tokenized.lower_text)
         
-        # Extract key terms
-        key_terms = self._extract_key_terms(full_text)
+        # Extract key terms (only the short title is tokenized here)
+        key_terms = self._extract_key_terms(title, tokenized)
         
         # Categorize topics
-        topics = self._categorize_topics(key_terms, full_text)
+        topics = self._categorize_topics(key_terms, term_counts)
         
         # Determine domain
-        domain = self._identify_domain(topics, full_text)
+        domain = self._identify_domain(topics, term_counts)
         
         return {
             'key_terms': key_terms,
             'topics': topics,
             'domain': domain,
-            'is_technical': self._is_technical(full_text)
+            'is_technical': self._is_technical(term_counts)
         }
     
-    def _extract_key_terms(self, text, n=10):
+    def _extract_key_terms(self, title, tokenized, n=10):
         """Extract most frequent and meaningful terms"""
-        # Tokenize and clean
-        words = word_tokenize(text)
-        words = [word.lower() for word in words if word.isalnum() and len(word) > 2]
-        
-        # Remove stopwords
-        filtered = [word for word in words if word not in self.stop_words]
-        
-        # Count frequency
-        word_freq = Counter(filtered)
+        # Title first, so ties keep the order they had when title + transcript were tokenized together
+        word_freq = Counter(
+            word for word in TokenizedTranscript(title).content_words if len(word) > 2
+        )
+        for word, freq in tokenized.counts.items():
+            if len(word) > 2:
+                word_freq[word] += freq
         
         # Get most common (excluding generic terms)
         common_terms = word_freq.most_common(n + 20)
         
         # Filter out overly generic terms
-        generic_terms = {'video', 'tutorial', 'learn', 'course', 'channel', 'like', 'subscribe'}
         meaningful = [(term, freq) for term, freq in common_terms 
-                     if term not in generic_terms and freq > 1]
+                     if term not in GENERIC_TERMS and freq > 1]
         
         return meaningful[:n]
     
-    def _categorize_topics(self, key_terms, text):
-        """Categorize into topic areas"""
+    def _categorize_topics(self, key_terms, term_counts):
+        """Categorize into topic areas (`term_counts` from lexicon_matcher())"""
         topics = set()
         
-        # Check for programming/tech topics
-        if any(term in text for term in ['python', 'javascript', 'java', 'code', 'program']):
-            topics.add('programming')
-        
-        # Check for data topics
-        if any(term in text for term in ['data', 'analysis', 'excel', 'spreadsheet', 'chart']):
-            topics.add('data_analysis')
-        
-        # Check for creative topics
-        if any(term in text for term in ['design', 'photoshop', 'edit', 'creative', 'art']):
-            topics.add('creative')
-        
-        # Check for business topics
-        if any(term in text for term in ['business', 'marketing', 'finance', 'excel', 'presentation']):
-            topics.add('business')
+        # Programming, data, creative and business topics
+        for topic, terms in TOPIC_CATEGORIES.items():
+            if any(term_counts[term] for term in terms):
+                topics.add(topic)
         
         # Check difficulty level indicators
-        if any(term in text for term in ['beginner', 'basic', 'introduction', 'start', 'first']):
-            topics.add('beginner_level')
-        elif any(term in text for term in ['advanced', 'expert', 'deep', 'complex', 'master']):
-            topics.add('advanced_level')
+        for level, terms in LEVEL_INDICATORS.items():
+            if any(term_counts[term] for term in terms):
+                topics.add(level)
+                break
         else:
             topics.add('intermediate_level')
         
         return list(topics)
     
-    def _identify_domain(self, topics, text):
+    def _identify_domain(self, topics, term_counts):
         """Identify the main domain/subject"""
-        domain_indicators = {
-            'programming': ['python', 'javascript', 'java', 'c++', 'html', 'css', 'react', 'django'],
-            'data_science': ['data', 'machine learning', 'ai', 'analysis', 'excel', 'sql', 'statistics'],
-            'web_dev': ['web', 'website', 'frontend', 'backend', 'html', 'css', 'javascript'],
-            'design': ['photoshop', 'figma', 'ui', 'ux', 'design', 'graphic', 'illustrator'],
-            'business': ['excel', 'marketing', 'finance', 'presentation', 'powerpoint', 'management'],
-            'language': ['english', 'spanish', 'language', 'grammar', 'vocabulary', 'speaking']
-        }
-        
-        for domain, indicators in domain_indicators.items():
-            if any(indicator in text for indicator in indicators):
+        for domain, indicators in DOMAIN_INDICATORS.items():
+            if any(term_counts[indicator] for indicator in indicators):
                 return domain
         
         return 'general'
     
-    def _is_technical(self, text):
+    def _is_technical(self, term_counts):
         """Determine if content is technical"""
-        technical_terms = ['code', 'function', 'variable', 'algorithm', 'syntax', 
-                          'data', 'analysis', 'formula', 'equation', 'technical']
-        return any(term in text for term in technical_terms)
+        return any(term_counts[term] for term in TECHNICAL_CONTENT_TERMS)
     
     def generate_learning_summary(self, topics_info, skill_level, word_count):
         """Generate dynamic learning summary based on detected topics"""
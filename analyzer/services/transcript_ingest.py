@@ -0,0 +1,89 @@
+# analyzer/services/transcript_ingest.py
+#
+# Single-pass transcript ingestion. Kept free of Django imports so it can be
+# used (and pickled) inside the analyze_bulk process pool.
+import re
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+from itertools import accumulate
+
+# Lightweight stand-in for youtube_transcript_api snippets (picklable, no API objects)
+Snippet = namedtuple('Snippet', ['text', 'start', 'duration'])
+
+_DEVANAGARI_WORD = re.compile(r'[\u0900-\u097F]+')
+
+
+class IngestedTranscript(Sequence):
+    """
+    A fetched transcript walked exactly once.
+
+    Holds the joined text plus per-snippet offsets/starts/durations/word counts
+    in compact arrays, so the original snippet objects can be dropped. It still
+    behaves like the list of snippets the analyzers expect: indexing yields a
+    Snippet whose text is sliced back out of `text`.
+    """
+
+    SAMPLE_SNIPPETS = 5
+
+    def __init__(self, text, offsets, starts, durations, word_counts, sample, devanagari_words=0):
+        self.text = text
+        self.offsets = offsets
+        self.starts = starts
+        self.durations = durations
+        self.word_counts = word_counts
+        self.sample = sample
+        self.word_count = sum(word_counts)
+        # Language hint: runs of Devanagari characters (~ Hindi words)
+        self.devanagari_words = devanagari_words
+
+    @classmethod
+    def from_snippets(cls, snippets):
+        """Build from any iterable of objects with .text/.start(/.duration), e.g. fetch()"""
+        texts = []
+        starts = array('d')
+        durations = array('d')
+
+        # The only walk over the snippet objects; everything below runs over `texts` in C
+        for snippet in snippets:
+            texts.append(snippet.text)
+            starts.append(snippet.start)
+            durations.append(getattr(snippet, 'duration', 0.0))
+
+        text = ' '.join(texts)
+        # Each snippet is followed by the single joining space
+        offsets = array('q', accumulate(map((1).__add__, map(len, texts)), initial=0))
+        offsets.pop()
+        word_counts = array('q', map(len, map(str.split, texts)))
+
+        return cls(
+            text, offsets, starts, durations, word_counts,
+            sample=' '.join(texts[:cls.SAMPLE_SNIPPETS]),
+            devanagari_words=0 if text.isascii() else len(_DEVANAGARI_WORD.findall(text))
+        )
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('transcript snippet index out of range')
+        return Snippet(self.snippet_text(index), self.starts[index], self.durations[index])
+
+    def snippet_text(self, index):
+        start = self.offsets[index]
+        end = self.offsets[index + 1] - 1 if index + 1 < len(self.offsets) else len(self.text)
+        return self.text[start:end]
+
+    @property
+    def last_start(self):
+        return self.starts[-1] if self.starts else 0.0
+
+    @property
+    def hindi_ratio(self):
+        """Share of words written in Devanagari (0-1)"""
+        return min(1.0, self.devanagari_words / self.word_count) if self.word_count else 0.0
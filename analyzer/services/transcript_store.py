@@ -0,0 +1,104 @@
+# analyzer/services/transcript_store.py
+import hashlib
+import secrets
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.utils import timezone
+from ..models import StoredTranscript
+
+
+class TranscriptStore:
+    """
+    Keeps transcripts on the server so forms only carry an opaque handle.
+    Reads go through the Django cache; the database is the source of truth.
+    A transcript expires STORED_TRANSCRIPT_TTL_HOURS after it was last saved;
+    saves delete expired rows at most once per PURGE_INTERVAL seconds.
+    """
+
+    CACHE_PREFIX = 'transcript:'
+    CACHE_TIMEOUT = 60 * 60  # 1 hour
+    PURGE_INTERVAL = 300
+
+    _purge_lock = threading.Lock()
+    _purged_at = 0.0
+
+    def __init__(self, ttl=None):
+        if ttl is None:
+            ttl = timedelta(hours=getattr(settings, 'STORED_TRANSCRIPT_TTL_HOURS', 168))
+        self.ttl = ttl
+
+    def save(self, video_id, text, title='', duration_minutes=60, word_count=None, text_hash=None):
+        """Store a transcript (idempotent per video + text) and return its handle"""
+        text_hash = text_hash or hashlib.sha256(text.encode('utf-8')).hexdigest()
+        self._purge_periodically()
+
+        existing = StoredTranscript.objects.filter(
+            video_id=video_id, text_hash=text_hash
+        ).values_list('handle', flat=True).first()
+        if existing:
+            # Analyzed again: its lifetime starts over
+            StoredTranscript.objects.filter(handle=existing).update(created_at=timezone.now())
+            return existing
+
+        try:
+            record = StoredTranscript.objects.create(
+                handle=secrets.token_urlsafe(24),
+                video_id=video_id,
+                title=title[:255],
+                text_hash=text_hash,
+                text=text,
+                word_count=len(text.split()) if word_count is None else word_count,
+                duration_minutes=duration_minutes or 60
+            )
+        except IntegrityError:
+            # Another request stored the same transcript first
+            return StoredTranscript.objects.get(video_id=video_id, text_hash=text_hash).handle
+
+        cache.set(self.CACHE_PREFIX + record.handle, self._to_dict(record), self.CACHE_TIMEOUT)
+        return record.handle
+
+    def load(self, handle):
+        """Return the stored transcript for handle as a dict, or None"""
+        if not handle:
+            return None
+
+        cache_key = self.CACHE_PREFIX + handle
+        transcript = cache.get(cache_key)
+        if transcript is not None:
+            return transcript
+
+        record = StoredTranscript.objects.filter(handle=handle, created_at__gte=timezone.now() - self.ttl).first()
+        if record is None:
+            return None
+
+        transcript = self._to_dict(record)
+        cache.set(cache_key, transcript, self.CACHE_TIMEOUT)
+        return transcript
+
+    def purge_expired(self):
+        """Delete transcripts older than the TTL; returns how many"""
+        deleted, _ = StoredTranscript.objects.filter(created_at__lt=timezone.now() - self.ttl).delete()
+        return deleted
+
+    def _purge_periodically(self):
+        now = time.monotonic()
+        with self._purge_lock:
+            if now - TranscriptStore._purged_at < self.PURGE_INTERVAL:
+                return
+            TranscriptStore._purged_at = now
+        self.purge_expired()
+
+    @staticmethod
+    def _to_dict(record):
+        return {
+            'handle': record.handle,
+            'video_id': record.video_id,
+            'title': record.title,
+            'text': record.text,
+            'word_count': record.word_count,
+            'duration_minutes': record.duration_minutes,
+        }
@@ -0,0 +1,682 @@
+# analyzer/services/video_pipeline.py
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from googleapiclient.discovery import build
+from django.conf import settings
+from django.db import connections
+from .analysis_executor import shared_executor
+from .analysis_store import AnalysisStore, analyzer_version, transcript_hash
+from .cascade_ranker import CascadeRanker, cheap_analysis
+from .comments_analyzer import CommentsAnalyzer
+from .chapter_extractor import ChapterExtractor
+from .explanation_service import ExplanationService
+from .learning_path_service import LearningPathService
+from .recommendation import calculate_recommendation_score
+from .transcript_store import TranscriptStore
+from .transcript_ingest import IngestedTranscript
+from .quota_governor import QuotaGovernor, PRIORITY_INTERACTIVE
+from .single_flight import SingleFlight
+from .stage_timing import stage
+from ..utils.error_handler import ErrorHandler
+from ..utils.youtube import extract_video_id, parse_duration
+
+logger = logging.getLogger(__name__)
+
+
+LEVEL_VALUES = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
+
+# Per-video fields of the running comparison ranking (no transcripts or full analyses)
+CARD_FIELDS = (
+    'video_id', 'url', 'title', 'channel', 'skill_level', 'level_score', 'word_count', 'recommendation_score',
+    'screened_out'
+)
+# What the comparison page reads of each video's analysis (e.g. not the per-minute curve)
+RESULT_ANALYSIS_FIELDS = ('skill_level', 'level_score', 'estimated', 'readability', 'jargon', 'pacing', 'comments')
+
+
+def _no_progress(percent, message, partial=None):
+    pass
+
+
+def ranking_key(video):
+    """Sort key, best first with reverse=True: fully evaluated videos rank above screened-out ones"""
+    return not video.get('screened_out', False), video['recommendation_score']
+
+
+def result_video(video):
+    """A video as stored in the comparison result: its card, transcript hash and rendered analysis fields"""
+    analysis = video.get('analysis') or {}
+    return {
+        **{field: video.get(field) for field in CARD_FIELDS},
+        'transcript_hash': video.get('transcript_hash', ''),
+        'analysis': {field: analysis[field] for field in RESULT_ANALYSIS_FIELDS if field in analysis},
+    }
+
+
+def ranking_snapshot(videos_data, failed_videos, total):
+    """Interim comparison result: the videos finished so far, best first"""
+    ranked = sorted(videos_data, key=ranking_key, reverse=True)
+    return {
+        'partial': True,
+        'total': total,
+        'completed': len(videos_data) + len(failed_videos),
+        'ranking': [{field: video.get(field) for field in CARD_FIELDS} for video in ranked],
+        'failed_videos': failed_videos,
+    }
+
+
+class VideoPipeline:
+    """Fetch + analyze pipeline shared by the views and the background job worker"""
+
+    def __init__(self, api_key=None, priority=PRIORITY_INTERACTIVE):
+        self.api_key = settings.YOUTUBE_API_KEY if api_key is None else api_key
+        self.priority = priority
+        self.quota = QuotaGovernor()
+        self._local = threading.local()
+
+    def get_youtube(self):
+        """Build the YouTube Data API client once per pipeline and thread (clients aren't thread-safe)"""
+        if not self.api_key:
+            raise ValueError('YouTube API key is not configured in settings')
+
+        youtube = getattr(self._local, 'youtube', None)
+        if youtube is None:
+            youtube = self._local.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        return youtube
+
+    def fetch_video(self, video_id):
+        """Return the videos.list item for video_id, or None if not found"""
+        youtube = self.get_youtube()
+        self.quota.acquire('videos.list', self.priority)
+        with stage('metadata'):
+            response = youtube.videos().list(
+                part="snippet,contentDetails",
+                id=video_id
+            ).execute()
+
+        items = response.get('items', [])
+        logger.debug("✅ API Response received: %d item(s)", len(items))
+        return items[0] if items else None
+
+    def fetch_transcript(self, video_id):
+        """
+        Fetch the transcript (English first, then Hindi, then any available)
+        and ingest it in one pass into an IngestedTranscript.
+        """
+        from youtube_transcript_api import YouTubeTranscriptApi
+
+        api = YouTubeTranscriptApi()
+        transcript_list = api.list(video_id)
+
+        try:
+            transcript_obj = transcript_list.find_transcript(['en'])
+        except:
+            try:
+                transcript_obj = transcript_list.find_transcript(['hi'])  # Hindi
+            except:
+                # Get the first available transcript
+                transcript_obj = (
+                    transcript_list._manually_created_transcripts[0]
+                    if transcript_list._manually_created_transcripts
+                    else transcript_list._generated_transcripts[0]
+                )
+
+        return IngestedTranscript.from_snippets(transcript_obj.fetch())
+
+    # ======================
+    # SINGLE VIDEO ANALYSIS
+    # ======================
+    def analyze_video(self, video_id, progress=None):
+        """
+        Build the video_info dict rendered by video_analyse_QA.
+        Errors are returned as {'error': ...} rather than raised.
+
+        Concurrent requests for the same video (a link shared in a class chat)
+        wait for one analysis instead of each fetching and analyzing it.
+        """
+        progress = progress or _no_progress
+
+        return SingleFlight().run(
+            f'analyze:{video_id}:{analyzer_version()}',
+            lambda: self._analyze_video(video_id, progress),
+            cacheable=lambda video_info: 'error' not in video_info
+        )
+
+    def _analyze_video(self, video_id, progress):
+
+        if not self.api_key:
+            return {
+                'error': 'YouTube API key is not configured. Please contact the administrator.'
+            }
+
+        try:
+            logger.debug("🌐 Calling YouTube API for video ID: %s", video_id)
+            progress(10, 'Fetching video details')
+            video = self.fetch_video(video_id)
+
+            if not video:
+                # Video not found or private/deleted
+                return {
+                    'error': f'Video not found (ID: {video_id}). The video might be private, deleted, or unavailable in your region.'
+                }
+
+            video_info = {
+                'title': video['snippet']['title'],
+                'channel': video['snippet']['channelTitle'],
+                'description': video['snippet']['description'],
+                'video_id': video_id,
+                'duration_minutes': parse_duration(video['contentDetails']['duration']),
+                'has_transcript': False,
+                'word_count': 0,
+                'transcript_handle': ''
+            }
+
+            try:
+                progress(30, 'Fetching transcript')
+                with stage('transcript'):
+                    transcript_data = self.fetch_transcript(video_id)
+                transcript_text = transcript_data.text
+
+                video_info['has_transcript'] = True
+                video_info['word_count'] = transcript_data.word_count
+                video_info['transcript_sample'] = transcript_data.sample
+
+                # Keep the full transcript server-side; the Q&A form only carries the handle
+                text_hash = transcript_hash(transcript_text)
+                video_info['transcript_handle'] = TranscriptStore().save(
+                    video_id,
+                    transcript_text,
+                    title=video_info['title'],
+                    duration_minutes=video_info['duration_minutes'],
+                    word_count=video_info['word_count'],
+                    text_hash=text_hash
+                )
+
+                # Analyze the transcript (unless this version of the analyzer already did)
+                try:
+                    store = AnalysisStore()
+                    stored = store.get(video_id, text_hash)
+                    if stored and stored['analysis']:
+                        analysis_results = stored['analysis']
+                        video_info['analysis_cached'] = True
+                    else:
+                        progress(60, 'Analyzing transcript')
+                        with stage('analysis'):
+                            analyzed = shared_executor().analyze(video_id, video_info['title'], transcript_data)
+                        analysis_results = analyzed['analysis']
+                        store.save(
+                            video_id, text_hash, title=video_info['title'],
+                            analysis=analysis_results, topics=analyzed['topics']
+                        )
+                    video_info['analysis'] = analysis_results
+                    video_info['skill_level'] = analysis_results['skill_level']
+                except Exception as e:
+                    video_info['analysis_error'] = str(e)
+
+            except Exception as e:
+                logger.warning("❌ Transcript Error for %s: %.200s", video_id, e)
+                video_info['transcript_error'] = str(e)
+                video_info['transcript_blocked'] = 'RequestBlocked' in str(e)
+
+            progress(100, 'Done')
+            return video_info
+
+        except Exception as e:
+            ErrorHandler.log_error(e, "YouTube API")
+            return {'error': ErrorHandler.get_user_friendly_error(e)}
+
+    # ======================
+    # MULTI-VIDEO COMPARISON
+    # ======================
+    def process_comparison_video(self, url):
+        """
+        Fetch and analyze one comparison candidate.
+        Returns (video_data, None) on success or (None, failure) on error.
+        """
+        with stage('url_parse'):
+            video_id = extract_video_id(url)
+        logger.debug("🔍 Processing URL %.200s (video_id %s)", url, video_id)
+
+        if not video_id:
+            logger.info("❌ Invalid URL format: %.200s", url)
+            return None, {'url': url, 'error': 'Invalid YouTube URL format'}
+
+        # Coalesced per video, so the same video pasted as different URLs/by different users runs once
+        outcome = self._coalesced(
+            video_id, lambda: dict(zip(('video', 'failure'), self._process_comparison_video(video_id)))
+        )
+
+        # The outcome may be shared with other callers: set this caller's URL on a copy
+        if outcome['failure']:
+            return None, dict(outcome['failure'], url=url)
+        return dict(outcome['video'], url=url), None
+
+    def _coalesced(self, video_id, compute):
+        """
+        compute() -> {'video', 'failure'} for one comparison video, run once
+        across concurrent comparisons (plain or cascade) of the same video
+        """
+        return SingleFlight().run(
+            f'compare-video:{video_id}:{analyzer_version()}',
+            compute,
+            cacheable=lambda outcome: outcome['failure'] is None
+        )
+
+    def _process_comparison_video(self, video_id):
+        video, transcript_data, failure = self._fetch_comparison_video(video_id)
+        if failure:
+            return None, failure
+
+        text_hash = transcript_hash(transcript_data.text)
+        analysis = self._full_analysis(video_id, video['snippet']['title'], transcript_data, text_hash)
+        self._add_comments(video_id, analysis)
+        return self._comparison_video_data(video_id, video, transcript_data, text_hash, analysis), None
+
+    def _fetch_comparison_video(self, video_id):
+        """(videos.list item, IngestedTranscript, None), or (None, None, failure)"""
+        try:
+            logger.debug("🌐 Calling YouTube API for: %s", video_id)
+            video = self.fetch_video(video_id)
+        except Exception as api_error:
+            ErrorHandler.log_error(api_error, f"YouTube API ({video_id})")
+            return None, None, {
+                'video_id': video_id,
+                'error': f'YouTube API error: {str(api_error)[:100]}'
+            }
+
+        if not video:
+            logger.info("❌ Video not found: %s", video_id)
+            return None, None, {
+                'video_id': video_id,
+                'error': 'Video not found. It may be private, deleted, or unavailable in your region.'
+            }
+
+        try:
+            with stage('transcript'):
+                transcript_data = self.fetch_transcript(video_id)
+        except Exception as transcript_error:
+            logger.warning("⚠️ Transcript blocked for %s: %.150s", video_id, transcript_error)
+            return None, None, {
+                'video_id': video_id,
+                'error': 'Transcript unavailable or blocked'
+            }
+
+        return video, transcript_data, None
+
+    def _full_analysis(self, video_id, title, transcript_data, text_hash):
+        # Reuse what this analyzer version stored for the same transcript
+        store = AnalysisStore()
+        stored = store.get(video_id, text_hash) or {}
+
+        analysis = stored.get('analysis')
+        if analysis is None:
+            with stage('analysis'):
+                analyzed = shared_executor().analyze(video_id, title, transcript_data)
+            analysis = analyzed['analysis']
+            store.save(
+                video_id, text_hash, title=title,
+                analysis=analysis, topics=analyzed['topics']
+            )
+        return analysis
+
+    def _add_comments(self, video_id, analysis):
+        # Add comments analysis (new comments only, merged into the video's CommentAggregate)
+        try:
+            comments_analyzer = CommentsAnalyzer(self.api_key, priority=self.priority)
+            with stage('comments'):
+                comments = comments_analyzer.analyze_video_comments(video_id)
+        except Exception as e:
+            comments = {
+                'error': 'Could not analyze comments'
+            }
+        analysis['comments'] = comments
+
+    def _comparison_video_data(self, video_id, video, transcript_data, text_hash, analysis):
+        return {
+            'video_id': video_id,
+            'title': video['snippet']['title'],
+            'description': video['snippet']['description'],
+            'channel': video['snippet']['channelTitle'],
+            'analysis': analysis,
+            'skill_level': analysis['skill_level'],
+            'level_score': analysis['level_score'],
+            'word_count': transcript_data.word_count,
+            'transcript_hash': text_hash
+        }
+
+    def screen_comparison_video(self, url):
+        """
+        First cascade stage for one candidate: metadata and transcript, plus the
+        stored analysis if there is one, else cheap_analysis. Returns
+        (video_data, None) or (None, failure); video_data keeps the transcript
+        under '_transcript' for evaluate_comparison_video.
+        """
+        with stage('url_parse'):
+            video_id = extract_video_id(url)
+        if not video_id:
+            logger.info("❌ Invalid URL format: %.200s", url)
+            return None, {'url': url, 'error': 'Invalid YouTube URL format'}
+
+        video, transcript_data, failure = self._fetch_comparison_video(video_id)
+        if failure:
+            failure['url'] = url
+            return None, failure
+
+        text_hash = transcript_hash(transcript_data.text)
+        stored = AnalysisStore().get(video_id, text_hash) or {}
+        analysis = stored.get('analysis')
+        if analysis is None:
+            with stage('screening'):
+                analysis = cheap_analysis(
+                    video['snippet']['title'], transcript_data,
+                    parse_duration(video['contentDetails']['duration'])
+                )
+
+        video_data = self._comparison_video_data(video_id, video, transcript_data, text_hash, analysis)
+        video_data.update({'url': url, '_transcript': transcript_data})
+        return video_data, None
+
+    def evaluate_comparison_video(self, video_data):
+        """
+        Second cascade stage: full analysis (unless stored) and comments for a
+        finalist. Shares the single-flight key of process_comparison_video, so
+        a video another comparison is already evaluating is not done twice.
+        """
+        transcript_data = video_data.pop('_transcript')
+
+        def evaluate():
+            analysis = video_data['analysis']
+            if analysis.get('estimated'):
+                analysis = self._full_analysis(
+                    video_data['video_id'], video_data['title'], transcript_data, video_data['transcript_hash']
+                )
+            else:
+                analysis = dict(analysis)
+            self._add_comments(video_data['video_id'], analysis)
+            return {'video': {**video_data, 'analysis': analysis}, 'failure': None}
+
+        outcome = self._coalesced(video_data['video_id'], evaluate)
+        if outcome['failure']:
+            # Another comparison's fetch failed; this one already has the transcript
+            outcome = evaluate()
+
+        analysis = outcome['video']['analysis']
+        video_data.update({
+            'analysis': analysis,
+            'skill_level': analysis['skill_level'],
+            'level_score': analysis['level_score'],
+        })
+        return video_data
+
+    def compare_videos(self, video_urls, target_level, progress=None):
+        """
+        Build the comparison_results dict rendered by compare_videos.
+        A 'notice' entry ({'level', 'text'}) carries the flash message for the page.
+        After each video, `progress` also gets the running ranking (see ranking_snapshot).
+
+        With more than COMPARE_FINALISTS candidates, all of them are screened
+        cheaply and only the finalists get the full analysis and comments;
+        the rest are listed after them, marked 'screened_out', and a
+        'cascade' entry reports what that saved.
+        """
+        progress = progress or _no_progress
+
+        try:
+            self.get_youtube()
+            videos_data = []
+            failed_videos = []  # Track failed videos
+            cascade = None
+
+            finalists = getattr(settings, 'COMPARE_FINALISTS', 5)
+            if 0 < finalists < len(video_urls):
+                videos_data, failed_videos, cascade = self._cascade_videos(
+                    video_urls, target_level, finalists, progress
+                )
+            else:
+                # Videos finish in any order; each one updates the running ranking
+                outcomes = self._as_completed(self.process_comparison_video, video_urls)
+                for completed, (video_data, failure) in enumerate(outcomes, 1):
+                    if failure:
+                        failed_videos.append(failure)
+                    else:
+                        video_data['recommendation_score'] = self._score_video(video_data, target_level)
+                        videos_data.append(video_data)
+                    progress(
+                        int(80 * completed / len(video_urls)),
+                        f'Analyzed {completed} of {len(video_urls)} videos',
+                        partial=ranking_snapshot(videos_data, failed_videos, len(video_urls))
+                    )
+
+            progress(80, 'Ranking videos')
+
+            # ✅ CHECK IF ANY VIDEOS WERE SUCCESSFULLY PROCESSED
+            if not videos_data:
+                # All videos failed
+                error_msg = "Unable to process any videos. "
+                if failed_videos:
+                    error_msg += "Errors: " + "; ".join([f"{v.get('video_id', 'Unknown')}: {v['error']}" for v in failed_videos])
+                return {
+                    'error': error_msg,
+                    'failed_videos': failed_videos,
+                    'notice': {'level': 'error', 'text': error_msg}
+                }
+
+            if len(videos_data) < 2:
+                # Less than 2 videos succeeded
+                return {
+                    'error': f'Only {len(videos_data)} video(s) could be processed. Please provide at least 2 valid YouTube videos.',
+                    'failed_videos': failed_videos,
+                    'videos': videos_data,
+                    'notice': {
+                        'level': 'warning',
+                        'text': f'Only {len(videos_data)} video(s) could be processed. Need at least 2 for comparison.'
+                    }
+                }
+
+            # Success - 2 or more videos processed
+            comparison_results = {
+                'videos': videos_data,
+                'target_level': target_level,
+                'recommended_video': None,
+                'comparison_metrics': {},
+                'failed_videos': failed_videos  # Show which ones failed
+            }
+
+            videos_data.sort(key=ranking_key, reverse=True)
+
+            comparison_results['recommended_video'] = videos_data[0]
+            comparison_results['videos'] = videos_data
+            if cascade:
+                comparison_results['cascade'] = cascade
+
+            progress(90, 'Writing recommendation')
+            with stage('recommendation'):
+                self._add_recommendation_details(comparison_results, videos_data[0], target_level)
+            self._add_best_for_level(
+                comparison_results,
+                [video for video in videos_data if not video.get('screened_out')],
+                target_level
+            )
+
+            # The result is stored as job JSON and polled by the browser: keep only what the page renders
+            results_by_id = {id(video): result_video(video) for video in videos_data}
+            for key, value in comparison_results.items():
+                if isinstance(value, dict) and id(value) in results_by_id:
+                    comparison_results[key] = results_by_id[id(value)]
+            comparison_results['videos'] = [results_by_id[id(video)] for video in videos_data]
+
+            # Show success message with any failed videos
+            if failed_videos:
+                comparison_results['notice'] = {
+                    'level': 'warning',
+                    'text': f'{len(videos_data)} videos successfully compared. {len(failed_videos)} video(s) failed.'
+                }
+            else:
+                comparison_results['notice'] = {
+                    'level': 'success',
+                    'text': f'Successfully compared {len(videos_data)} videos!'
+                }
+
+            progress(100, 'Done')
+            return comparison_results
+
+        except Exception as e:
+            ErrorHandler.log_error(e, "Video Comparison")
+            return {
+                'error': ErrorHandler.get_user_friendly_error(e)
+            }
+
+    def _cascade_videos(self, video_urls, target_level, finalists, progress):
+        """
+        Screen every URL (screen_comparison_video), then fully evaluate the
+        best `finalists` (evaluate_comparison_video).
+        Returns (videos_data, failed_videos, CascadeRanker.report).
+        """
+        ranker = CascadeRanker(target_level, finalists)
+        total = len(video_urls)
+        videos_data = []
+        failed_videos = []
+
+        started = time.perf_counter()
+        for completed, (video_data, failure) in enumerate(
+                self._as_completed(self.screen_comparison_video, video_urls), 1):
+            if failure:
+                failed_videos.append(failure)
+            else:
+                video_data['recommendation_score'] = ranker.score(video_data)
+                videos_data.append(video_data)
+            progress(
+                int(40 * completed / total),
+                f'Screened {completed} of {total} videos',
+                partial=ranking_snapshot(videos_data, failed_videos, total)
+            )
+        screen_seconds = time.perf_counter() - started
+
+        shortlist, screened_out = ranker.select(videos_data)
+        for video in screened_out:
+            del video['_transcript']
+            video['screened_out'] = True
+
+        deep_evaluations = sum(1 for video in shortlist if video['analysis'].get('estimated'))
+        started = time.perf_counter()
+        for evaluated, video_data in enumerate(self._as_completed(self.evaluate_comparison_video, shortlist), 1):
+            video_data['recommendation_score'] = ranker.score(video_data)
+            progress(
+                40 + int(40 * evaluated / len(shortlist)),
+                f'Fully analyzed {evaluated} of {len(shortlist)} finalists',
+                partial=ranking_snapshot(videos_data, failed_videos, total)
+            )
+        deep_seconds = time.perf_counter() - started
+
+        report = ranker.report(shortlist, screened_out, deep_evaluations, screen_seconds, deep_seconds)
+        logger.info(
+            "🏁 Cascade: %d candidates, %d fully analyzed, %d skipped (~%.1fs saved)",
+            report['candidates'], report['deep_evaluations'],
+            report['deep_evaluations_skipped'], report['estimated_seconds_saved']
+        )
+        return videos_data, failed_videos, report
+
+    def _as_completed(self, function, items):
+        """
+        Yield function(item) for each item as the calls complete. Up to
+        COMPARE_CONCURRENCY run at once, so one slow video doesn't hold back
+        the others.
+        """
+        workers = min(getattr(settings, 'COMPARE_CONCURRENCY', 4), len(items))
+        if workers <= 1:
+            for item in items:
+                yield function(item)
+            return
+
+        pool = ThreadPoolExecutor(workers, thread_name_prefix='compare')
+        try:
+            # Each task runs in a copy of this context, so its stages still reach the request's timings
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._call_in_thread, function, item)
+                for item in items
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # After an error, don't start the videos still waiting for a thread
+            pool.shutdown(cancel_futures=True)
+
+    def _call_in_thread(self, function, item):
+        try:
+            return function(item)
+        finally:
+            # Worker threads open their own database connections
+            connections.close_all()
+
+    def _score_video(self, video, target_level):
+        try:
+            return calculate_recommendation_score(video, target_level)
+        except Exception as score_error:
+            logger.warning("⚠️ Error calculating score for %s: %s", video.get('title', 'Unknown'), score_error)
+            return 50  # Default middle score
+
+    def _add_recommendation_details(self, comparison_results, recommended, target_level):
+        """Explanations, pre-watch summary and learning path for the recommended video"""
+        explanation_service = ExplanationService()
+
+        try:
+            comparison_results['why_this_video'] = explanation_service.generate_why_this_video(
+                recommended,
+                target_level
+            )
+        except Exception as exp_error:
+            logger.warning("⚠️ Error generating explanation: %s", exp_error)
+            comparison_results['why_this_video'] = "Unable to generate explanation"
+
+        try:
+            comparison_results['pre_watch_summary'] = explanation_service.generate_pre_watch_summary(
+                recommended
+            )
+        except Exception as summary_error:
+            logger.warning("⚠️ Error generating summary: %s", summary_error)
+            comparison_results['pre_watch_summary'] = "Unable to generate summary"
+
+        try:
+            store = AnalysisStore()
+            text_hash = recommended.get('transcript_hash', '')
+            stored = store.get(recommended['video_id'], text_hash) or {}
+            chapters = stored.get('chapters')
+            if chapters is None:
+                chapters = ChapterExtractor().extract_chapters_from_description(
+                    recommended.get('description', '')
+                )
+                if text_hash:
+                    store.save(recommended['video_id'], text_hash, chapters=chapters)
+            comparison_results['learning_path'] = LearningPathService().generate_learning_path(
+                recommended['title'],
+                chapters,
+                recommended['skill_level'],
+                recommended.get('word_count', 0)
+            )
+        except Exception as path_error:
+            logger.warning("⚠️ Error generating learning path: %s", path_error)
+            comparison_results['learning_path'] = "Unable to generate learning path"
+
+    def _add_best_for_level(self, comparison_results, videos_data, target_level):
+        """Best video at the target level, or the closest level if none match"""
+        level_videos = [
+            v for v in videos_data
+            if v['skill_level'].lower() == target_level
+        ]
+
+        if level_videos:
+            best = max(level_videos, key=lambda x: x['recommendation_score'])
+        else:
+            best = min(
+                videos_data,
+                key=lambda v: abs(
+                    LEVEL_VALUES.get(v['skill_level'].lower(), 2) -
+                    LEVEL_VALUES.get(target_level, 2)
+                )
+            )
+
+        comparison_results[f'best_for_{target_level}'] = best
+        comparison_results['best_for_level_display'] = target_level.title()
@@ -1,3 +1,1288 @@
-from django.test import TestCase
+import json
+import logging
+import multiprocessing
+import threading
+import unittest
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from .models import AnalysisJob, AnalysisLease, CommentAggregate, StoredTranscript, VideoAnalysis
+from .services import job_queue
+from .services.job_queue import JobQueue, JobWorker
+from .services.transcript_store import TranscriptStore
+from .services.quota_governor import QuotaGovernor, QuotaExceeded, PRIORITY_BATCH
+from .services.single_flight import SingleFlight
+from .services.transcript_ingest import IngestedTranscript, Snippet
+from .services.tokenized_transcript import TokenizedTranscript
+from .services.fast_tokenizer import regex_word_tokenize, regex_sent_tokenize
+from .services.language_detection import SAMPLE_CHARS, detect_language, script_histogram
+from .services import readability
+from .services.keyword_matcher import KeywordMatcher
+from .services.analysis_store import AnalysisStore, analyzer_version, transcript_hash
+from .services.analysis_executor import AnalysisExecutor, pool_size
+from .services import stage_timing
+
+
+def nltk_data_available():
+    try:
+        from nltk.tokenize import word_tokenize
+        from .services.nlp_resources import english_stopwords
+        english_stopwords()
+        word_tokenize('ready.')
+        return True
+    except LookupError:
+        return False
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.queue = JobQueue()
+
+    def test_identical_requests_share_one_job(self):
+        first = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+        second = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+        other = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'zzz123def45'})
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertNotEqual(first.pk, other.pk)
+
+    def test_finished_result_is_reused(self):
+        job = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+        self.queue.complete(job, {'title': 'Cached'})
+
+        again = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+        self.assertEqual(again.pk, job.pk)
+        self.assertEqual(again.status, AnalysisJob.STATUS_DONE)
+        self.assertEqual(again.result, {'title': 'Cached'})
+
+    def test_claim_hands_each_job_to_one_worker(self):
+        job = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+
+        claimed = self.queue.claim('worker-a')
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, AnalysisJob.STATUS_RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(self.queue.claim('worker-b'))
+
+    def test_worker_stores_result_and_failures(self):
+        ok = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+        bad = self.queue.enqueue(AnalysisJob.KIND_COMPARE, {'video_urls': [], 'target_level': 'beginner'})
+
+        handlers = {
+            AnalysisJob.KIND_ANALYZE: lambda payload, progress: {'video_id': payload['video_id']},
+            AnalysisJob.KIND_COMPARE: mock.Mock(side_effect=RuntimeError('quota exceeded')),
+        }
+        with mock.patch.dict(job_queue.JOB_HANDLERS, handlers):
+            JobWorker(worker_id='test').run_forever(exit_when_idle=True)
+
+        ok.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(ok.status, AnalysisJob.STATUS_DONE)
+        self.assertEqual(ok.result, {'video_id': 'abc123def45'})
+        self.assertEqual(bad.status, AnalysisJob.STATUS_FAILED)
+        self.assertIn('quota', bad.error.lower())
+
+    def test_error_result_fails_the_job_and_is_not_reused(self):
+        job = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+
+        handlers = {AnalysisJob.KIND_ANALYZE: lambda payload, progress: {'error': 'YouTube API quota exceeded'}}
+        with mock.patch.dict(job_queue.JOB_HANDLERS, handlers):
+            JobWorker(worker_id='test').run_forever(exit_when_idle=True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'YouTube API quota exceeded')
+        self.assertEqual(job.result, {'error': 'YouTube API quota exceeded'})
+        again = self.queue.enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'})
+        self.assertNotEqual(again.pk, job.pk)
+        self.assertEqual(again.status, AnalysisJob.STATUS_QUEUED)
+
+
+class JobStatusViewTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner@example.com', 'owner@example.com', 'password123')
+        self.other = User.objects.create_user('other@example.com', 'other@example.com', 'password123')
+        self.job = JobQueue().enqueue(
+            AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'}, user=self.owner
+        )
+
+    def test_owner_sees_progress(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('job_status', args=[self.job.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], AnalysisJob.STATUS_QUEUED)
+
+    def test_other_users_cannot_see_job(self):
+        self.client.force_login(self.other)
+        response = self.client.get(reverse('job_status', args=[self.job.pk]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_identical_request_from_another_user_gets_own_job(self):
+        again = JobQueue().enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'}, user=self.owner)
+        theirs = JobQueue().enqueue(AnalysisJob.KIND_ANALYZE, {'video_id': 'abc123def45'}, user=self.other)
+
+        self.assertEqual(again.pk, self.job.pk)
+        self.assertNotEqual(theirs.pk, self.job.pk)
+        self.client.force_login(self.other)
+        response = self.client.get(reverse('job_status', args=[theirs.pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+class ComparisonTests(TestCase):
+    def fake_video(self, url, level):
+        return {
+            'video_id': url[-3:], 'url': url, 'title': f'Video {url[-3:]}', 'channel': 'Guide',
+            'skill_level': level, 'level_score': 4, 'word_count': 900, 'transcript_hash': 'hash',
+            'analysis': {'pacing': {'words_per_minute': 140}, 'curve': [{'minute': 0}] * 100},
+        }
+
+    def test_urls_from_numbered_fields_and_list(self):
+        from django.http import QueryDict
+        from .views_comparison import comparison_urls
+
+        post = QueryDict(mutable=True)
+        post.update({
+            'video_url_10': 'https://youtu.be/ccc', 'video_url_2': 'https://youtu.be/bbb',
+            'video_url_1': ' https://youtu.be/aaaaaaaaaaa ',
+            'video_urls': 'https://youtu.be/ddd\n\nhttps://www.youtube.com/watch?v=aaaaaaaaaaa&t=30\nhttps://youtu.be/ddd\n',
+        })
+
+        self.assertEqual(comparison_urls(post), [
+            'https://youtu.be/aaaaaaaaaaa', 'https://youtu.be/bbb', 'https://youtu.be/ccc', 'https://youtu.be/ddd',
+        ])
+
+    @override_settings(COMPARE_CONCURRENCY=3)
+    def test_ranking_is_reported_as_videos_finish(self):
+        from .services.video_pipeline import VideoPipeline
+
+        levels = {'https://youtu.be/v01': 'Advanced', 'https://youtu.be/v02': 'Beginner',
+                  'https://youtu.be/v03': 'Intermediate', 'https://youtu.be/bad': None}
+
+        def process(url):
+            if levels[url] is None:
+                return None, {'url': url, 'error': 'Invalid YouTube URL format'}
+            return self.fake_video(url, levels[url]), None
+
+        partials = []
+        pipeline = VideoPipeline(api_key='test-key')
+        with mock.patch.object(pipeline, 'get_youtube'), \
+                mock.patch.object(pipeline, 'process_comparison_video', side_effect=process), \
+                mock.patch.object(pipeline, '_add_recommendation_details'):
+            result = pipeline.compare_videos(
+                list(levels), 'beginner',
+                progress=lambda percent, message, partial=None: partial and partials.append(partial)
+            )
+
+        self.assertEqual([partial['completed'] for partial in partials], [1, 2, 3, 4])
+        final = partials[-1]
+        self.assertEqual([video['video_id'] for video in final['ranking']], ['v02', 'v03', 'v01'])
+        self.assertEqual(len(final['failed_videos']), 1)
+        self.assertNotIn('transcript_text', final['ranking'][0])
+        self.assertEqual(result['recommended_video']['video_id'], 'v02')
+        self.assertEqual([video['video_id'] for video in result['videos']], ['v02', 'v03', 'v01'])
+        self.assertEqual(result['videos'][0]['analysis'], {'pacing': {'words_per_minute': 140}})
+        self.assertIs(result['best_for_beginner'], result['recommended_video'])
+
+    @override_settings(COMPARE_FINALISTS=2, COMPARE_CONCURRENCY=1)
+    def test_only_finalists_get_full_evaluation(self):
+        from .services.video_pipeline import VideoPipeline
+
+        screened_levels = {'https://youtu.be/v01': 'Beginner', 'https://youtu.be/v02': 'Advanced',
+                           'https://youtu.be/v03': 'Intermediate', 'https://youtu.be/v04': 'Advanced'}
+
+        def screen(url):
+            video = self.fake_video(url, screened_levels[url])
+            video.update(analysis={'estimated': True}, _transcript=object())
+            return video, None
+
+        def evaluate(video):
+            video.pop('_transcript')
+            # Full analysis disagrees with the screen for v01
+            video.update(analysis={'skill_level': 'Intermediate'}, skill_level='Intermediate')
+            return video
+
+        pipeline = VideoPipeline(api_key='test-key')
+        with mock.patch.object(pipeline, 'get_youtube'), \
+                mock.patch.object(pipeline, 'screen_comparison_video', side_effect=screen), \
+                mock.patch.object(pipeline, 'evaluate_comparison_video', side_effect=evaluate) as full, \
+                mock.patch.object(pipeline, '_add_recommendation_details'):
+            result = pipeline.compare_videos(list(screened_levels), 'beginner')
+
+        self.assertEqual(sorted(call.args[0]['video_id'] for call in full.call_args_list), ['v01', 'v03'])
+        self.assertEqual([video['video_id'] for video in result['videos'][:2]], ['v01', 'v03'])
+        self.assertTrue(all(video['screened_out'] for video in result['videos'][2:]))
+        self.assertTrue(all('_transcript' not in video for video in result['videos']))
+        self.assertEqual(result['cascade']['deep_evaluations'], 2)
+        self.assertEqual(result['cascade']['deep_evaluations_skipped'], 2)
+
+    def test_finalist_shares_evaluation_with_concurrent_comparison(self):
+        from .services.video_pipeline import VideoPipeline
+
+        shared = {'skill_level': 'Beginner', 'level_score': 8, 'comments': {'total_comments': 3}}
+        AnalysisLease.objects.create(
+            key=f'compare-video:v01:{analyzer_version()}', owner='other-host:1:1',
+            status=AnalysisLease.STATUS_DONE,
+            result={'video': {'video_id': 'v01', 'analysis': shared}, 'failure': None},
+            expires_at=timezone.now() + timedelta(seconds=60)
+        )
+        video = self.fake_video('https://youtu.be/v01', 'Advanced')
+        video.update(analysis={'estimated': True}, _transcript=object())
+
+        pipeline = VideoPipeline(api_key='test-key')
+        with mock.patch.object(pipeline, '_full_analysis') as full, \
+                mock.patch.object(pipeline, '_add_comments') as comments:
+            evaluated = pipeline.evaluate_comparison_video(video)
+
+        full.assert_not_called()
+        comments.assert_not_called()
+        self.assertEqual(evaluated['analysis'], shared)
+        self.assertEqual(evaluated['skill_level'], 'Beginner')
+
+    def test_single_url_is_rejected(self):
+        user = User.objects.create_user('viewer@example.com', 'viewer@example.com', 'password123')
+        self.client.force_login(user)
+
+        response = self.client.post(reverse('compare'), {'video_urls': 'https://youtu.be/aaa'})
+
+        self.assertContains(response, 'Please enter at least 2 YouTube URLs')
+
+    def test_job_status_carries_partial_ranking_until_done(self):
+        queue = JobQueue()
+        job = queue.enqueue(AnalysisJob.KIND_COMPARE, {'video_urls': ['a', 'b'], 'target_level': 'beginner'})
+        job = queue.claim('worker-a')
+        partial = {'partial': True, 'total': 2, 'completed': 1, 'ranking': [], 'failed_videos': []}
+
+        queue.update_progress(job, 40, 'Analyzed 1 of 2 videos', partial=partial)
+        job.refresh_from_db()
+        self.assertEqual(job.to_status_dict()['partial'], partial)
+
+        queue.complete(job, {'videos': []})
+        job.refresh_from_db()
+        self.assertIsNone(job.to_status_dict()['partial'])
+
+
+class CascadeRankerTests(unittest.TestCase):
+    def test_title_names_the_audience(self):
+        from .services.cascade_ranker import title_level
+
+        self.assertEqual(title_level('Python for Absolute Beginners'), 'Beginner')
+        self.assertEqual(title_level('Advanced Python: generator internals'), 'Advanced')
+        self.assertIsNone(title_level('Intro to Python - a deep dive'))
+        self.assertIsNone(title_level('Python decorators'))
+
+    def test_cheap_analysis_reads_a_sample(self):
+        from .services.cascade_ranker import SAMPLE_WORDS, cheap_analysis, transcript_sample
+
+        snippets = [Snippet(f'today we see how a variable and a function work in part {i}.', i * 4.0, 4.0)
+                    for i in range(600)]
+        transcript = IngestedTranscript.from_snippets(snippets)
+
+        sample = transcript_sample(transcript)
+        analysis = cheap_analysis('Variables explained', transcript, duration_minutes=40)
+
+        self.assertLess(len(sample.split()), SAMPLE_WORDS * 1.2)
+        self.assertIn('part 599', transcript.text)
+        self.assertIn('part 500', sample)
+        self.assertTrue(analysis['estimated'])
+        self.assertEqual(analysis['pacing']['words_per_minute'], round(transcript.word_count / (599 * 4 / 60)))
+        self.assertIn(analysis['skill_level'], ('Beginner', 'Intermediate', 'Advanced'))
+
+    def test_agreement_between_screen_and_full_scores(self):
+        from .services.cascade_ranker import agreement, kendall_tau
+
+        self.assertEqual(kendall_tau('abcd', 'abcd'), 1.0)
+        self.assertEqual(kendall_tau('abcd', 'dcba'), -1.0)
+        self.assertIsNone(kendall_tau('ab', 'cb'))
+
+        report = agreement({'a': 90, 'b': 80, 'c': 70, 'd': 60}, {'a': 70, 'b': 95, 'c': 50, 'd': 80}, 2)
+
+        self.assertTrue(report['best_is_finalist'])
+        self.assertEqual(report['top_k_recall'], 0.5)
+
+
+class TranscriptStoreTests(TestCase):
+    def test_handle_round_trip_is_idempotent(self):
+        store = TranscriptStore()
+        handle = store.save('abc123def45', 'one two three', title='Lecture', duration_minutes=12.5)
+
+        self.assertEqual(store.save('abc123def45', 'one two three'), handle)
+        transcript = store.load(handle)
+        self.assertEqual(transcript['text'], 'one two three')
+        self.assertEqual(transcript['word_count'], 3)
+        self.assertEqual(transcript['duration_minutes'], 12.5)
+        self.assertIsNone(store.load('missing-handle'))
+
+    def test_transcripts_expire_after_ttl(self):
+        store = TranscriptStore(ttl=timedelta(hours=1))
+        handle = store.save('abc123def45', 'one two three')
+        StoredTranscript.objects.filter(handle=handle).update(created_at=timezone.now() - timedelta(hours=2))
+        cache.clear()
+
+        self.assertIsNone(store.load(handle))
+        self.assertEqual(store.purge_expired(), 1)
+        self.assertFalse(StoredTranscript.objects.exists())
+
+    def test_question_with_unknown_handle_asks_to_reanalyze(self):
+        user = User.objects.create_user('qa@example.com', 'qa@example.com', 'password123')
+        self.client.force_login(user)
+
+        response = self.client.post(reverse('video_analyse_QA'), {
+            'question_mode': 'true',
+            'question': 'What is recursion?',
+            'video_id': 'abc123def45',
+            'transcript_handle': 'missing-handle',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'analyze the video again')
+
+
+class AnalyzeBulkTests(TestCase):
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.output = f'{self.dir.name}/results.jsonl'
+        self.transcript = IngestedTranscript.from_snippets(
+            [Snippet(f'today we write function number {i}', i * 3.0, 3.0) for i in range(10)]
+        )
+
+    def run_bulk(self, lines, fetch_video):
+        from django.core.management import call_command
+        from io import StringIO
+        from .services.video_pipeline import VideoPipeline
+
+        source = f'{self.dir.name}/videos.txt'
+        with open(source, 'w', encoding='utf-8') as videos:
+            videos.write('\n'.join(lines) + '\n')
+
+        stderr = StringIO()
+        analyzed = {'analysis': {'skill_level': 'Beginner'}, 'topics': {}, 'analysis_seconds': 0.0}
+        with mock.patch.object(VideoPipeline, 'get_youtube'), \
+                mock.patch.object(VideoPipeline, 'fetch_video', side_effect=fetch_video) as fetch, \
+                mock.patch.object(VideoPipeline, 'fetch_transcript', return_value=self.transcript), \
+                mock.patch('analyzer.management.commands.analyze_bulk.AnalysisExecutor',
+                           side_effect=lambda processes: AnalysisExecutor(processes=0)), \
+                mock.patch('analyzer.services.analysis_executor.analyze_compact', return_value=analyzed), \
+                mock.patch('analyzer.management.commands.analyze_bulk.connections') as connections:
+            call_command('analyze_bulk', source, output=self.output, concurrency=1,
+                         stdout=StringIO(), stderr=stderr)
+
+        with open(self.output, encoding='utf-8') as output:
+            results = [json.loads(line) for line in output]
+        return results, fetch, stderr.getvalue(), connections
+
+    @staticmethod
+    def found(video_id):
+        return {'snippet': {'title': f'Video {video_id}', 'channelTitle': 'Guide'},
+                'contentDetails': {'duration': 'PT10M'}}
+
+    def test_resumes_from_checkpoint_and_skips_invalid_lines(self):
+        with open(f'{self.output}.checkpoint', 'w', encoding='utf-8') as checkpoint:
+            checkpoint.write('aaaaaaaaaaa\tok\nbbbbbbbbbbb\terror\n')
+
+        results, fetch, stderr, connections = self.run_bulk([
+            '# catalog', 'aaaaaaaaaaa', 'https://youtu.be/bbbbbbbbbbb', 'not a url!!',
+            'https://www.youtube.com/watch?v=ccccccccccc', 'ccccccccccc',
+        ], fetch_video=self.found)
+
+        self.assertEqual(sorted(call.args[0] for call in fetch.call_args_list), ['bbbbbbbbbbb', 'ccccccccccc'])
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok'])
+        self.assertIn('Skipping invalid video URL/ID: not a url!!', stderr)
+        self.assertEqual(connections.close_all.call_count, 2)
+
+    def test_stops_when_daily_quota_runs_out(self):
+        ids = [f'video{index:06d}' for index in range(5)]
+        exhausted = QuotaExceeded('Daily YouTube API quota exhausted for batch requests (8000 units)')
+
+        results, fetch, stderr, _ = self.run_bulk(ids, fetch_video=mock.Mock(side_effect=exhausted))
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(results, [{'video_id': ids[0], 'status': 'error', 'stage': 'quota',
+                                    'error': str(exhausted)}])
+        self.assertIn('stopping; rerun to resume', stderr)
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class QuotaGovernorTests(TestCase):
+    def make_governor(self, clock, **overrides):
+        options = {'daily_budget': 100, 'rate_per_second': 1, 'burst': 10, 'batch_reserve': 0.2}
+        options.update(overrides)
+        return QuotaGovernor(clock=clock, sleep=clock.sleep, **options)
+
+    def test_spend_is_tracked_per_call_type(self):
+        governor = self.make_governor(FakeClock())
+        governor.acquire('videos.list')
+        governor.acquire('commentThreads.list')
+        governor.acquire('commentThreads.list', priority=PRIORITY_BATCH)
+
+        spend = governor.current_spend()
+        self.assertEqual(spend['units_used'], 3)
+        self.assertEqual(spend['units_remaining'], 97)
+        self.assertEqual(spend['by_call_type']['commentThreads.list']['calls'], 2)
+        self.assertEqual(spend['by_call_type']['commentThreads.list']['by_priority'][PRIORITY_BATCH], 1)
+
+    def test_batch_cannot_use_interactive_reserve(self):
+        clock = FakeClock()
+        governor = self.make_governor(clock, daily_budget=5, burst=100)
+
+        for _ in range(4):  # batch limit is 80% of 5 units
+            governor.acquire('videos.list', priority=PRIORITY_BATCH)
+        with self.assertRaises(QuotaExceeded):
+            governor.acquire('videos.list', priority=PRIORITY_BATCH)
+
+        governor.acquire('videos.list')  # interactive still fits
+        with self.assertRaises(QuotaExceeded):
+            governor.acquire('videos.list')
+
+    def test_token_bucket_waits_for_refill(self):
+        clock = FakeClock()
+        governor = self.make_governor(clock)
+
+        for _ in range(10):
+            governor.acquire('videos.list')
+        started = clock.now
+        governor.acquire('videos.list')
+
+        self.assertAlmostEqual(clock.now - started, 1.0)
+        with self.assertRaises(QuotaExceeded):
+            governor.acquire('search.list', timeout=5)
+
+
+class SingleFlightTests(TestCase):
+    def test_follower_reads_result_published_by_another_process(self):
+        AnalysisLease.objects.create(
+            key='analyze:abc123def45:1',
+            owner='other-host:1234:1',
+            status=AnalysisLease.STATUS_DONE,
+            result={'title': 'Shared'},
+            expires_at=timezone.now() + timedelta(seconds=60)
+        )
+        compute = mock.Mock(return_value={'title': 'Recomputed'})
+
+        result = SingleFlight().run('analyze:abc123def45:1', compute)
+
+        self.assertEqual(result, {'title': 'Shared'})
+        compute.assert_not_called()
+
+    def test_failed_or_expired_lease_is_taken_over(self):
+        AnalysisLease.objects.create(
+            key='analyze:abc123def45:1',
+            owner='crashed:1:1',
+            status=AnalysisLease.STATUS_RUNNING,
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        result = SingleFlight().run('analyze:abc123def45:1', lambda: {'title': 'Fresh'})
+
+        lease = AnalysisLease.objects.get(key='analyze:abc123def45:1')
+        self.assertEqual(result, {'title': 'Fresh'})
+        self.assertEqual(lease.status, AnalysisLease.STATUS_DONE)
+        self.assertEqual(lease.result, {'title': 'Fresh'})
+
+    def test_uncacheable_result_is_not_shared_for_long(self):
+        SingleFlight(share_seconds=120).run(
+            'analyze:abc123def45:1',
+            lambda: {'error': 'Video not found'},
+            cacheable=lambda result: 'error' not in result
+        )
+
+        lease = AnalysisLease.objects.get(key='analyze:abc123def45:1')
+        self.assertLess(lease.expires_at, timezone.now() + timedelta(seconds=5))
+
+    def test_expired_leases_are_purged(self):
+        for key, age in (('old', timedelta(hours=1)), ('recent', timedelta(seconds=1))):
+            AnalysisLease.objects.create(
+                key=key, owner='host:1:1', status=AnalysisLease.STATUS_DONE,
+                expires_at=timezone.now() - age
+            )
+
+        self.assertEqual(SingleFlight.purge_expired(), 1)
+        self.assertEqual(list(AnalysisLease.objects.values_list('key', flat=True)), ['recent'])
+
+    def test_each_caller_gets_its_own_copy(self):
+        flight = SingleFlight()
+        result = flight.run('analyze:abc123def45:1', lambda: {'title': 'Shared'})
+        result['url'] = 'mine'
+
+        again = flight.run('analyze:abc123def45:1', lambda: {'title': 'Recomputed'})
+        self.assertEqual(again, {'title': 'Shared'})
+
+
+class SingleFlightConcurrencyTests(TransactionTestCase):
+    def test_concurrent_callers_share_one_computation(self):
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {'title': 'Once'}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                SingleFlight(poll_interval=0.01).run('analyze:abc123def45:1', compute)
+            ))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'title': 'Once'}] * 5)
+
+
+class IngestedTranscriptTests(TestCase):
+    def setUp(self):
+        self.snippets = [
+            Snippet('so today we learn', 0.0, 2.0),
+            Snippet('about python\nfunctions', 2.0, 2.5),
+            Snippet('अब हम लूप देखेंगे', 4.5, 3.0),
+        ]
+        self.transcript = IngestedTranscript.from_snippets(iter(self.snippets))
+
+    def test_single_pass_matches_naive_processing(self):
+        self.assertEqual(self.transcript.text, ' '.join(s.text for s in self.snippets))
+        self.assertEqual(self.transcript.word_count, sum(len(s.text.split()) for s in self.snippets))
+        self.assertEqual(self.transcript.sample, self.transcript.text)
+        self.assertEqual(list(self.transcript), self.snippets)
+        self.assertEqual(self.transcript[-1].start, 4.5)
+        self.assertEqual(self.transcript.devanagari_words, 4)
+
+    def test_pacing_fast_path_matches_snippet_list(self):
+        from .services.analysis_service import TranscriptAnalyzer
+
+        snippets = [Snippet(f'word {i} and more', i * 2.0, 2.0) for i in range(30)]
+        analyzer = TranscriptAnalyzer.__new__(TranscriptAnalyzer)  # pacing needs no NLTK data
+
+        self.assertEqual(
+            analyzer.analyze_pacing(IngestedTranscript.from_snippets(snippets)),
+            analyzer.analyze_pacing(snippets)
+        )
+
+
+class TokenizedTranscriptTests(TestCase):
+    TEXT = "So today we define a function. The function uses recursion, and recursion is neat!"
+
+    def test_words_do_not_need_nltk_tokenization(self):
+        tokenized = TokenizedTranscript(self.TEXT)
+
+        self.assertEqual(tokenized.words, self.TEXT.split())
+        self.assertEqual(tokenized.word_count, 14)
+        self.assertNotIn('_tokenized', tokenized.__dict__)
+
+    @unittest.skipUnless(nltk_data_available(), 'NLTK punkt/stopwords not installed')
+    def test_content_words_match_separate_word_tokenize_pass(self):
+        from nltk.tokenize import word_tokenize
+        from .services.nlp_resources import english_stopwords
+
+        tokenized = TokenizedTranscript(self.TEXT)
+        legacy = [
+            word for word in word_tokenize(self.TEXT.lower())
+            if word.isalnum() and word not in english_stopwords()
+        ]
+
+        self.assertEqual(tokenized.content_words, legacy)
+        self.assertEqual(tokenized.sentence_count, 2)
+        self.assertEqual(tokenized.counts['recursion'], 2)
+
+    def test_tokenizer_setting_selects_mode(self):
+        with override_settings(ANALYZER_TOKENIZER='regex'):
+            tokenized = TokenizedTranscript(self.TEXT)
+
+        self.assertEqual(tokenized.tokenizer, 'regex')
+        self.assertEqual(tokenized.sentence_count, 2)
+        self.assertEqual(TokenizedTranscript(self.TEXT, tokenizer='nltk').tokenizer, 'nltk')
+
+    def test_preload_reports_missing_nltk_data(self):
+        from .services import nlp_resources
+
+        missing = mock.Mock(side_effect=LookupError('Resource punkt_tab not found'), __name__='punkt_tokenizer')
+        with mock.patch.object(nlp_resources, 'punkt_tokenizer', missing), \
+                mock.patch.object(nlp_resources, 'english_stopwords', return_value=frozenset()), \
+                mock.patch.object(nlp_resources, 'cmu_pronunciations', return_value={}):
+            with override_settings(ANALYZER_TOKENIZER='regex'):
+                nlp_resources.preload()
+            missing.assert_not_called()
+
+            with self.assertLogs('analyzer.services.nlp_resources', 'WARNING') as logs:
+                nlp_resources.preload()
+
+        missing.assert_called_once_with()
+        self.assertIn('punkt_tokenizer', logs.output[0])
+
+
+class RegexTokenizerTests(TestCase):
+    SAMPLES = [
+        # auto-captions: no punctuation at all
+        "so today we're gonna learn about python functions and you know we can't "
+        "really skip recursion because it's everywhere so let's get started",
+        # punctuated English with numbers, hyphens and quotes
+        'Python 3.5 added type hints. Lists cost O(n) to search; dicts are ~1,000x faster! '
+        'The "x-ray" view -- as I said -- shows c++ and/or Java at 10:30, e.g. in the U.S.',
+        "Don't worry: I'm sure you'd have done it. 'Tis fine, cannot fail, gimme a sec... "
+        "students' code won't compile (it's missing a colon) [see below] #python @guide 50% $5",
+        # Hinglish and Devanagari
+        'dekho yaha pe hum ek function banayenge jo list leta hai aur sum return karta hai, samjhe?',
+        'अब हम एक फंक्शन बनाएंगे, जो लिस्ट लेता है। Python में loop बहुत important है!',
+    ]
+
+    def test_alphanumeric_words_match_nltk_treebank(self):
+        from nltk.tokenize import word_tokenize
+
+        for sample in self.SAMPLES:
+            with self.subTest(sample=sample[:40]):
+                # Sentences split the same way for both, so this needs no Punkt data
+                expected = [
+                    token for sentence in regex_sent_tokenize(sample)
+                    for token in word_tokenize(sentence, preserve_line=True) if token.isalnum()
+                ]
+                actual = [token for token in regex_word_tokenize(sample) if token.isalnum()]
+                self.assertEqual(actual, expected)
+
+    @unittest.skipUnless(nltk_data_available(), 'NLTK punkt/stopwords not installed')
+    def test_content_words_match_nltk_mode(self):
+        for sample in self.SAMPLES:
+            with self.subTest(sample=sample[:40]):
+                self.assertEqual(
+                    TokenizedTranscript(sample, tokenizer='regex').content_words,
+                    TokenizedTranscript(sample, tokenizer='nltk').content_words
+                )
+
+
+class LanguageDetectionTests(TestCase):
+    SAMPLES = {
+        'en': 'So today we define a function and call it in a loop, that is the whole idea.',
+        'hi': 'अब हम एक फंक्शन बनाएंगे, जो लिस्ट लेता है और उसका योग लौटाता है।',
+        'hinglish': 'dekho yaha pe hum ek function banayenge jo list leta hai aur sum return karta hai, samjhe?',
+        'es': 'Hoy vamos a aprender el lenguaje Python y como usar las funciones para el programa.',
+        'fr': "Aujourd'hui nous allons apprendre le langage Python et les fonctions dans le code.",
+        'ru': 'Сегодня мы изучаем функции в языке Python.',
+        'zh': '今天我们学习Python编程语言的基础知识。',
+        'ja': '今日はPythonのプログラミングを学びます。',
+    }
+
+    def test_detects_script_and_latin_languages(self):
+        for language, sample in self.SAMPLES.items():
+            with self.subTest(language=language):
+                self.assertEqual(detect_language(sample), language)
+
+        self.assertEqual(detect_language(''), 'en')
+        self.assertEqual(detect_language('12:30 -- !!'), 'en')
+
+    def test_long_text_is_sampled(self):
+        text = ' '.join([self.SAMPLES['hi']] * 3000)
+        counts = script_histogram(text)
+
+        self.assertLessEqual(counts['chars'], 2 * SAMPLE_CHARS)
+        self.assertGreater(counts['devanagari'], counts['latin'])
+        self.assertEqual(detect_language(text), 'hi')
+
+    def test_services_share_the_engine(self):
+        from .services.analysis_service import TranscriptAnalyzer
+
+        analyzer = TranscriptAnalyzer.__new__(TranscriptAnalyzer)
+        self.assertEqual(analyzer.detect_language(self.SAMPLES['hinglish']), 'hinglish')
+
+
+class ReadabilityTests(TestCase):
+    TEXT = (
+        "So today we define a function. The function uses recursion, and recursion is neat! "
+        "Don't worry: it's 'simple'. e.g. this (works) -- I think? Yes. Lists cost O(n) to search; dicts are faster."
+    )
+
+    def setUp(self):
+        # Same syllable source on both sides, whether or not cmudict is installed
+        patches = [
+            mock.patch('textstat.backend.counts._count_syllables.get_cmudict', return_value=None),
+            mock.patch.object(readability, '_pronunciations', return_value={}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        readability.count_syllables.cache_clear()
+        self.addCleanup(readability.count_syllables.cache_clear)
+
+    def test_one_pass_matches_textstat(self):
+        import textstat
+
+        scores = readability.readability_scores(self.TEXT, sample_sentences=0)
+
+        self.assertAlmostEqual(scores['flesch'], textstat.flesch_reading_ease(self.TEXT))
+        self.assertAlmostEqual(scores['fk_grade'], textstat.flesch_kincaid_grade(self.TEXT))
+        self.assertIsNone(scores['flesch_ci'])
+
+    def test_syllables_counted_once_per_distinct_word(self):
+        readability.readability_scores(' '.join([self.TEXT] * 20), sample_sentences=0)
+        first = readability.count_syllables.cache_info()
+        readability.readability_scores(self.TEXT, sample_sentences=0)
+
+        self.assertEqual(first.misses, len(set(readability._words(readability._clean(self.TEXT)))))
+        self.assertEqual(readability.count_syllables.cache_info().misses, first.misses)
+
+    def test_stratified_sample_reports_interval(self):
+        text = ' '.join(f"{self.TEXT} Step {i} shows another example of the same idea." for i in range(200))
+        exact = readability.readability_scores(text, sample_sentences=0)
+        sampled = readability.readability_scores(text, sample_sentences=200)
+
+        low, high = sampled['flesch_ci']
+        self.assertEqual(sampled['sampled'], 200)
+        self.assertLess(low, high)
+        self.assertLessEqual(low, exact['flesch'])
+        self.assertGreaterEqual(high, exact['flesch'])
+
+    def test_sample_size_setting(self):
+        with override_settings(READABILITY_SAMPLE_SENTENCES=500):
+            self.assertEqual(readability.sample_size(), 500)
+
+    def test_scoring_failure_falls_back_to_zero_readability(self):
+        from .services.analysis_service import TranscriptAnalyzer
+
+        analyzer = TranscriptAnalyzer.__new__(TranscriptAnalyzer)  # no NLTK data needed
+        with mock.patch('analyzer.services.analysis_service.readability_scores',
+                        side_effect=LookupError('cmudict not found')):
+            result = analyzer.calculate_readability(self.TEXT)
+
+        self.assertEqual(result, {'flesch_score': 0, 'fk_grade': 0, 'normalized': 0, 'interpretation': 'Not enough text'})
+
+
+class TimeSeriesTests(TestCase):
+    def setUp(self):
+        from .services.analysis_service import TranscriptAnalyzer
+
+        self.analyzer = TranscriptAnalyzer.__new__(TranscriptAnalyzer)  # no NLTK data needed
+        self.analyzer.stop_words = frozenset({'we', 'a', 'the', 'and', 'is'})
+        self.analyzer.technical_terms = frozenset({'function', 'recursion'})
+        # 30 snippets, 4 seconds apart: windows of 60s hold 15 snippets each
+        self.snippets = [
+            Snippet('we define a function.' if i % 3 else 'the recursion is easy and short', i * 4.0, 4.0)
+            for i in range(30)
+        ]
+
+    def test_windows_match_naive_counts(self):
+        curve = self.analyzer.analyze_time_series(IngestedTranscript.from_snippets(self.snippets))
+
+        self.assertEqual(curve['start'], [0, 60])
+        for window, start in enumerate(curve['start']):
+            inside = [s for s in self.snippets if start <= s.start < start + 60]
+            words = sum(len(s.text.split()) for s in inside)
+            content = sum(len([w for w in s.text.strip('.').split() if w not in self.analyzer.stop_words]) for s in inside)
+            technical = sum(s.text.count('function') + s.text.count('recursion') for s in inside)
+            self.assertEqual(curve['wpm'][window], words)
+            self.assertEqual(curve['jargon'][window], round(technical * 100 / content, 1))
+        self.assertTrue(all(0 <= score <= 100 for score in curve['readability']))
+
+    def test_plain_snippet_lists_and_short_transcripts(self):
+        curve = self.analyzer.analyze_time_series(self.snippets, readability=False)
+
+        self.assertEqual(len(curve['wpm']), 2)
+        self.assertIsNone(curve['readability'])
+        self.assertIsNone(self.analyzer.analyze_time_series(self.snippets[:5]))
+
+
+class KeywordMatcherTests(TestCase):
+    def test_word_boundaries_prefixes_and_contained_terms(self):
+        matcher = KeywordMatcher(['ai', 'web', 'website', 'program*', 'c++', 'machine learning', 'learning'])
+        counts = matcher.counts(
+            'said again: machine learning, programs and programming in c++ on a website (not webs)'
+        )
+
+        self.assertEqual(counts['ai'], 0)
+        self.assertEqual(counts['program*'], 2)
+        self.assertEqual(counts['c++'], 1)
+        self.assertEqual((counts['machine learning'], counts['learning']), (1, 1))
+        self.assertEqual((counts['website'], counts['web']), (1, 0))
+        self.assertEqual(matcher.found('learning ai'), ['ai', 'learning'])
+
+    def test_counts_match_one_regex_per_term(self):
+        import re
+        from .services.nlp_resources import lexicon_matcher
+
+        matcher = lexicon_matcher()
+        text = ('Intro to Python and C++ for data science: machine learning basics, '
+                'analyzing spreadsheets in Excel, then advanced design of a website. ' * 3).lower()
+        counts = matcher.counts(text)
+
+        for term in matcher.terms:
+            stem = re.escape(term.rstrip('*')) + (r'\w*' if term.endswith('*') else '')
+            with self.subTest(term=term):
+                self.assertEqual(counts[term], len(re.findall(rf'(?<!\w){stem}(?!\w)', text)))
+
+    def test_topic_detector_uses_word_boundaries(self):
+        from .services.nlp_resources import lexicon_matcher
+        from .services.topic_detector import TopicDetector
+
+        detector = TopicDetector.__new__(TopicDetector)  # no NLTK data needed
+        # Substring scans saw 'ai' (data_science) in "said", "again" and "painting"
+        counts = lexicon_matcher().counts('we said it again: start with the basics of painting')
+
+        self.assertEqual(detector._identify_domain([], counts), 'general')
+        self.assertEqual(detector._categorize_topics([], counts), ['beginner_level'])
+        self.assertFalse(detector._is_technical(counts))
+
+
+class AnalysisStoreTests(TestCase):
+    def test_results_are_keyed_by_transcript_and_version(self):
+        store = AnalysisStore(version='v1')
+        text_hash = transcript_hash('so today we learn python')
+
+        store.save('vid1', text_hash, title='Python', analysis={'skill_level': 'Beginner'})
+        store.save('vid1', text_hash, chapters=[{'title': 'Intro'}])
+
+        self.assertEqual(
+            store.get('vid1', text_hash),
+            {'analysis': {'skill_level': 'Beginner'}, 'topics': None, 'chapters': [{'title': 'Intro'}]}
+        )
+        self.assertIsNone(store.get('vid1', transcript_hash('a different transcript')))
+        self.assertIsNone(AnalysisStore(version='v2').get('vid1', text_hash))
+
+        self.assertEqual(AnalysisStore(version='v2').purge_stale(), 1)
+        self.assertEqual(VideoAnalysis.objects.count(), 0)
+
+    def test_version_tracks_analyzer_code(self):
+        from .services.analysis_service import ANALYSIS_VERSION
+
+        self.assertTrue(analyzer_version().startswith(f'{ANALYSIS_VERSION}-'))
+        self.assertEqual(analyzer_version(), AnalysisStore().version)
+
+    def test_pipeline_reuses_stored_analysis(self):
+        from .services.video_pipeline import VideoPipeline
+
+        snippets = [Snippet(f'we define function number {i} today', i * 3.0, 3.0) for i in range(12)]
+        video = {
+            'snippet': {'title': 'Functions', 'channelTitle': 'Guide', 'description': ''},
+            'contentDetails': {'duration': 'PT10M'},
+        }
+        pipeline = VideoPipeline(api_key='test-key')
+        analysis = {'skill_level': 'Beginner', 'level_score': 8}
+
+        with mock.patch.object(pipeline, 'fetch_video', return_value=video), \
+                mock.patch.object(pipeline, 'fetch_transcript',
+                                  side_effect=lambda _: IngestedTranscript.from_snippets(snippets)), \
+                mock.patch('analyzer.services.video_pipeline.shared_executor') as executor:
+            executor.return_value.analyze.return_value = {'analysis': analysis, 'topics': {'domain': 'programming'}}
+            first = pipeline._analyze_video('abc123', lambda *args: None)
+            second = pipeline._analyze_video('abc123', lambda *args: None)
+
+        self.assertEqual(executor.return_value.analyze.call_count, 1)
+        self.assertEqual(first['analysis'], second['analysis'])
+        self.assertTrue(second['analysis_cached'])
+
+
+class AnalysisExecutorTests(unittest.TestCase):
+    def setUp(self):
+        self.transcript = IngestedTranscript.from_snippets(
+            [Snippet(f'today we write function number {i} in python.', i * 3.0, 3.0) for i in range(40)]
+        )
+
+    def test_pool_size_setting(self):
+        from django.conf import settings
+
+        self.assertGreater(settings.ANALYSIS_POOL_SIZE, 0)
+        with override_settings(ANALYSIS_POOL_SIZE=3):
+            self.assertEqual(pool_size(), 3)
+        with override_settings(ANALYSIS_POOL_SIZE=-1):
+            self.assertEqual(pool_size(), 0)
+
+    def test_zero_processes_analyze_inline(self):
+        with mock.patch('analyzer.services.analysis_executor.analyze_compact',
+                        return_value={'analysis': {}, 'topics': {}}) as analyze_compact:
+            executor = AnalysisExecutor(processes=0)
+            self.assertEqual(executor.analyze('vid1', 'Functions', self.transcript), {'analysis': {}, 'topics': {}})
+
+        analyze_compact.assert_called_once_with('vid1', 'Functions', self.transcript)
+        self.assertIsNone(executor._pool)
+
+    @unittest.skipUnless(nltk_data_available(), 'NLTK data not downloaded')
+    def test_pool_matches_inline_analysis(self):
+        from .services.bulk_analysis import analyze_compact
+
+        with AnalysisExecutor(processes=1).start() as executor:
+            pooled = executor.analyze('vid1', 'Python functions', self.transcript)
+        inline = analyze_compact('vid1', 'Python functions', self.transcript)
+
+        self.assertEqual(pooled['analysis'], inline['analysis'])
+        self.assertEqual(pooled['topics'], inline['topics'])
+
+
+def _start_analysis_pool(worker_index, *worker_args):
+    # Stands in for _worker_main: what a job does first in a worker with ANALYSIS_POOL_SIZE > 0
+    AnalysisExecutor(processes=1).start().shutdown()
+
+
+class AnalysisWorkerCommandTests(TestCase):
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'needs fork to patch the worker entry point')
+    def test_workers_can_start_an_analysis_pool(self):
+        from django.core.management import call_command
+
+        fork = multiprocessing.get_context('fork')
+        started = []
+
+        def process(*args, **kwargs):
+            started.append(fork.Process(*args, **kwargs))
+            return started[-1]
+
+        with mock.patch('analyzer.management.commands.run_analysis_worker._worker_main', _start_analysis_pool), \
+                mock.patch('analyzer.management.commands.run_analysis_worker.multiprocessing.Process',
+                           side_effect=process):
+            call_command('run_analysis_worker', processes=2, once=True, stdout=mock.Mock())
+
+        self.assertEqual(len(started), 2)
+        # A daemonic worker fails here: "daemonic processes are not allowed to have children"
+        self.assertEqual([worker.exitcode for worker in started], [0, 0])
+
+
+class CommentScoringTests(TestCase):
+    def test_scores_are_shares_of_comments(self):
+        from .services.comments_analyzer import CommentsAnalyzer
+
+        analyzer = CommentsAnalyzer.__new__(CommentsAnalyzer)  # no API client needed
+        scores = analyzer.score_comments([
+            'thank you, very helpful', 'samajh nahi aaya', 'samajh aa gaya', 'first!'
+        ])
+
+        self.assertEqual(scores['total_comments'], 4)
+        self.assertEqual(scores['understanding_score'], 50.0)
+        self.assertEqual(scores['confusion_score'], 25.0)
+        self.assertEqual(scores['sentiment'], 'Positive')
+        self.assertEqual(analyzer.score_comments([])['sentiment'], 'No comments')
+
+    def pages(self, *pages, newest=3000):
+        """(id, publishedAt, text) pages, numbered down from `newest` (newest comment first)"""
+        numbered = []
+        for page in pages:
+            numbered.append([
+                (f'c{number}', f'2026-01-01T{number // 3600:02d}:{number // 60 % 60:02d}:{number % 60:02d}Z', text)
+                for number, text in zip(range(newest, newest - len(page), -1), page)
+            ])
+            newest -= len(page)
+        return numbered
+
+    def paged_analyzer(self, pages):
+        from .services.comments_analyzer import CommentsAnalyzer
+
+        analyzer = CommentsAnalyzer.__new__(CommentsAnalyzer)
+        analyzer.quota = mock.Mock()
+        analyzer.priority = PRIORITY_BATCH
+        responses = [
+            {
+                'items': [
+                    {'snippet': {'topLevelComment': {'id': comment_id, 'snippet': {
+                        'textDisplay': text, 'publishedAt': published_at
+                    }}}}
+                    for comment_id, published_at, text in page
+                ],
+                **({'nextPageToken': f'page{index + 1}'} if index + 1 < len(pages) else {}),
+            }
+            for index, page in enumerate(pages)
+        ]
+        analyzer.youtube = mock.Mock()
+        analyzer.youtube.commentThreads.return_value.list.return_value.execute.side_effect = responses
+        return analyzer
+
+    def test_stops_paging_once_scores_are_stable(self):
+        analyzer = self.paged_analyzer(self.pages(['Thank you!'] * 100, ['confusing'] * 100, ['first'] * 100))
+
+        result = analyzer.analyze_video_comments('vid1', max_comments=500)
+
+        self.assertEqual(result['pages_fetched'], 1)
+        self.assertEqual(result['understanding_score'], 100.0)
+        self.assertTrue(result['stopped_early'])
+        self.assertEqual(result['quota_units_saved'], 4)
+        self.assertEqual(analyzer.quota.acquire.call_count, 1)
+
+    def test_follows_pages_up_to_the_budget(self):
+        analyzer = self.paged_analyzer(self.pages(['thanks, clear'] * 100, ['not clear'] * 100, ['first'] * 100))
+
+        with override_settings(COMMENT_MAX_COMMENTS=250):
+            result = analyzer.analyze_video_comments('vid1', tolerance=0.001)
+
+        self.assertEqual(result['pages_fetched'], 3)
+        self.assertEqual(result['total_comments'], 300)
+        # "not clear" is confusion only, not also 'clear'
+        self.assertEqual((result['understanding_score'], result['confusion_score']), (33.3, 33.3))
+        self.assertFalse(result['stopped_early'])
+        list_calls = analyzer.youtube.commentThreads.return_value.list.call_args_list
+        self.assertEqual([call.kwargs['pageToken'] for call in list_calls], [None, 'page1', 'page2'])
+        self.assertEqual(list_calls[-1].kwargs['maxResults'], 50)
+
+    def test_refresh_reads_only_newer_comments(self):
+        first_run = self.pages(['thanks'] * 100, ['confusing'] * 100)
+        self.paged_analyzer(first_run).analyze_video_comments('vid1', max_comments=500, tolerance=0.001)
+
+        # Five new comments on top of the ones already counted
+        new = self.pages(['can you explain again?'] * 5, newest=3005)[0]
+        analyzer = self.paged_analyzer([new + first_run[0][:95], first_run[0][95:] + first_run[1][:95]])
+        result = analyzer.analyze_video_comments('vid1', max_comments=500)
+
+        self.assertEqual(analyzer.quota.acquire.call_count, 1)
+        self.assertEqual(result['new_comments'], 5)
+        self.assertEqual(result['total_comments'], 205)
+        self.assertEqual(result['confusion_score'], round(105 / 205 * 100, 1))
+        self.assertEqual(result['sample_comments'][0], 'can you explain again?')
+        self.assertEqual(CommentAggregate.objects.get(video_id='vid1').newest_comment_id, 'c3005')
+
+    def test_refresh_that_misses_comments_forces_a_recount(self):
+        from .services.comments_analyzer import RECOUNT_VERSION
+
+        first_run = self.pages(['thanks'] * 100, ['confusing'] * 100)
+        self.paged_analyzer(first_run).analyze_video_comments('vid1', max_comments=500, tolerance=0.001)
+
+        # 300 new comments, but the budget stops the refresh after 200 of them
+        new = self.pages(['can you explain again?'] * 100, ['great video'] * 100, ['first'] * 100, newest=3300)
+        self.paged_analyzer(new + first_run).analyze_video_comments('vid1', max_comments=200)
+
+        aggregate = CommentAggregate.objects.get(video_id='vid1')
+        self.assertEqual(aggregate.scoring_version, RECOUNT_VERSION)
+
+        # The next analysis counts from scratch instead of adding to counts with a gap
+        analyzer = self.paged_analyzer(new + first_run)
+        result = analyzer.analyze_video_comments('vid1', max_comments=500, tolerance=0.001)
+        self.assertEqual(result['total_comments'], 500)
+        self.assertEqual(CommentAggregate.objects.get(video_id='vid1').newest_comment_id, 'c3300')
+
+
+class StageTimingTests(TestCase):
+    def test_stages_outside_a_request_are_not_collected(self):
+        self.assertIs(stage_timing.stage('analysis'), stage_timing.stage('render'))
+
+    def test_repeated_stages_add_up(self):
+        timings, token = stage_timing.start_request()
+        try:
+            for _ in range(2):
+                with stage_timing.stage('transcript'):
+                    pass
+        finally:
+            stage_timing.finish_request(token)
+
+        self.assertEqual(list(timings), ['transcript'])
+        header = stage_timing.server_timing({'transcript': 0.5, 'url parse': 0.001}, 0.75)
+        self.assertEqual(header, 'transcript;dur=500.0, url_parse;dur=1.0, total;dur=750.0')
+
+    def test_registry_renders_cumulative_buckets(self):
+        registry = stage_timing.MetricsRegistry()
+        registry.observe_stage('llm', 0.3)
+        registry.observe_stage('llm', 3.0)
+        registry.observe_request('home', 'GET', 200, 0.02)
+
+        text = registry.render()
+        self.assertIn('guide_tube_requests_total{view="home",method="GET",status="200"} 1', text)
+        self.assertIn('guide_tube_stage_duration_seconds_bucket{stage="llm",le="0.5"} 1', text)
+        self.assertIn('guide_tube_stage_duration_seconds_bucket{stage="llm",le="+Inf"} 2', text)
+        self.assertIn('guide_tube_stage_duration_seconds_count{stage="llm"} 2', text)
+
+    @override_settings(METRICS_ENABLED=True, METRICS_TOKEN='scrape-secret')
+    def test_server_timing_header_and_metrics_endpoint(self):
+        response = self.client.get(reverse('login'))
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+$')
+
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        scrape = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(scrape.status_code, 200)
+        self.assertIn('guide_tube_request_duration_seconds_count{view="login"}', scrape.content.decode())
+
+    def test_disabled_metrics_add_no_header(self):
+        response = self.client.get(reverse('login'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+class LogFilterTests(unittest.TestCase):
+    def record(self, level, msg, *args):
+        return logging.LogRecord('analyzer.views', level, __file__, 1, msg, args, None)
+
+    def test_long_messages_are_truncated(self):
+        from .utils.log_filters import TruncateFilter
+
+        record = self.record(logging.DEBUG, 'transcript: %s', 'word ' * 100)
+        self.assertTrue(TruncateFilter(max_length=20).filter(record))
+        self.assertEqual(record.getMessage(), 'transcript: word wor… [492 chars truncated]')
+
+    def test_sampling_never_drops_warnings(self):
+        from .utils.log_filters import SampleFilter
+
+        sampler = SampleFilter(rate=0.0)
+        self.assertFalse(sampler.filter(self.record(logging.INFO, 'queued')))
+        self.assertTrue(sampler.filter(self.record(logging.WARNING, 'quota low')))
+        self.assertTrue(SampleFilter(rate=1.0).filter(self.record(logging.DEBUG, 'chunked')))
+
+
+class CommentClassifierTests(unittest.TestCase):
+    def test_batch_labels(self):
+        from .services.comment_classifier import keyword_classifier, label_counts
+
+        comments = [
+            'thanks a lot, samjh aa gaya',
+            'sir samajh nhi aaya, dobara samjhao',
+            'it was not clear at first but now i finally understand it',
+            'the unclear part at 3:20',
+            'nice shirt',
+            '',
+            'confused about recursion',
+        ]
+        labels = keyword_classifier().classify(comments)
+
+        self.assertEqual(labels, ['understood', 'confused', 'mixed', 'confused', 'neutral', 'neutral', 'confused'])
+        self.assertEqual(label_counts(labels)['understanding'], 2)
+        self.assertEqual(label_counts(labels)['confusion'], 4)
+
+    def test_terms_match_whole_words(self):
+        from .services.comment_classifier import keyword_classifier
+
+        # 'clear' inside "nuclear", 'thank*' needs the word to start with "thank"
+        self.assertEqual(keyword_classifier().classify(['nuclear physics', 'unthankful']), ['neutral', 'neutral'])
+
+    def test_embedding_labels_keyword_misses(self):
+        import numpy as np
+        from .services.comment_classifier import CONFUSED, PROTOTYPES, UNDERSTOOD, EmbeddingCommentClassifier
+
+        vectors = {
+            'bahut mast samjhaya sir': [0.9, 0.1, 0.42],
+            'ye wala part phir se': [0.2, 0.95, 0.24],
+        }
+        calls = []
+
+        class FakeModel:
+            def encode(self, texts, batch_size, **kwargs):
+                calls.append(list(texts))
+                rows = []
+                for text in texts:
+                    if text in PROTOTYPES[UNDERSTOOD]:
+                        rows.append([1.0, 0.0, 0.0])
+                    elif text in PROTOTYPES[CONFUSED]:
+                        rows.append([0.0, 1.0, 0.0])
+                    else:
+                        rows.append(vectors.get(text, [0.0, 0.0, 1.0]))
+                rows = np.array(rows)
+                return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+        classifier = EmbeddingCommentClassifier(model=FakeModel(), threshold=0.5, margin=0.05)
+        comments = [
+            'bahut mast samjhaya sir',
+            'ye wala part phir se',
+            'bahut mast samjhaya sir',
+            'kuch pata nahi chala par badhiya',
+            'thanks!',
+            'first',
+        ]
+
+        self.assertEqual(classifier.classify(comments),
+                         ['understood', 'confused', 'understood', 'understood', 'understood', 'neutral'])
+        self.assertEqual(classifier.classify(['kuch pata nahi chala']), ['neutral'])
+        # Prototypes encode once; keyword hits ('badhiya', 'thanks') and repeats are never encoded
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[0], ['bahut mast samjhaya sir', 'ye wala part phir se', 'first'])
+
+    def test_close_scores_are_mixed(self):
+        import numpy as np
+        from .services.comment_classifier import EmbeddingCommentClassifier
+
+        classifier = EmbeddingCommentClassifier(model=mock.Mock(), threshold=0.5, margin=0.05)
+        classifier._prototype_matrix = (np.eye(2), 1)
+
+        labels = classifier._labels(np.array([[0.7, 0.71], [0.3, 0.2], [0.9, 0.4]]))
+
+        self.assertEqual(labels, ['mixed', 'neutral', 'understood'])
+
+    def test_classifier_setting_changes_scoring_version(self):
+        from .services.comments_analyzer import CommentsAnalyzer
+
+        with override_settings(COMMENT_CLASSIFIER='keyword'):
+            keyword_version = CommentsAnalyzer.scoring_version()
+        with override_settings(COMMENT_CLASSIFIER='embedding'):
+            embedding_version = CommentsAnalyzer.scoring_version()
+
+        self.assertNotEqual(keyword_version, embedding_version)
+
+
+class LibraryIndexTests(TestCase):
+    def store(self, video_id, title, skill_level, key_terms, jargon=3, version='v1'):
+        return VideoAnalysis.objects.create(
+            video_id=video_id, transcript_hash='h', analyzer_version=version, title=title,
+            analysis={
+                'skill_level': skill_level,
+                'readability': {'normalized': 75},
+                'jargon': {'percentage': jargon},
+                'pacing': {'words_per_minute': 150},
+            },
+            topics={'key_terms': key_terms, 'topics': ['programming'], 'domain': 'programming'},
+        )
+
+    def setUp(self):
+        from .services.library_index import LibraryIndex
+
+        self.store('rec1', 'Recursion for beginners', 'Beginner', [['recursion', 14], ['function', 6]])
+        self.store('rec2', 'Recursion schemes', 'Advanced', [['recursion', 9], ['functor', 4]], jargon=22)
+        self.store('sql1', 'SQL joins', 'Beginner', [['joins', 8], ['table', 5]])
+        self.index = LibraryIndex(refresh_seconds=0)
+
+    def test_best_videos_for_topic_and_level(self):
+        beginner = self.index.search('best beginner videos about recursion')
+        advanced = self.index.search('recursion', level='advanced')
+
+        self.assertEqual([video['video_id'] for video in beginner], ['rec1', 'rec2'])
+        self.assertEqual(advanced[0]['video_id'], 'rec2')
+        self.assertEqual(self.index.search('join')[0]['video_id'], 'sql1')
+        self.assertEqual(self.index.search('kubernetes'), [])
+
+    def test_new_analyses_are_picked_up(self):
+        self.assertEqual(len(self.index.search('recursion')), 2)
+
+        self.store('rec3', 'Recursion in Hindi', 'Beginner', [['recursion', 20]])
+        # A newer analysis of rec1 that is no longer about recursion
+        self.store('rec1', 'Loops for beginners', 'Beginner', [['loop', 10]], version='v2')
+
+        self.assertEqual([video['video_id'] for video in self.index.search('recursion')], ['rec3', 'rec2'])
+        self.assertEqual(self.index.search('loops')[0]['video_id'], 'rec1')
+        self.assertEqual(len(self.index), 4)
+
+    def test_late_commit_is_picked_up(self):
+        self.assertEqual(len(self.index.search('recursion')), 2)
+
+        # Saved before the last refresh but committed after it and its overlap window
+        late = self.store('rec3', 'Recursion in Hindi', 'Beginner', [['recursion', 20]])
+        VideoAnalysis.objects.filter(pk=late.pk).update(updated_at=late.updated_at - timedelta(minutes=5))
+
+        self.assertIn('rec3', [video['video_id'] for video in self.index.search('recursion')])
+
+    def test_level_only_query_ranks_by_level(self):
+        beginner = self.index.search('beginner')
+        advanced = self.index.search('', level='advanced')
+
+        self.assertEqual(len(beginner), 3)
+        self.assertEqual(beginner[-1]['video_id'], 'rec2')
+        self.assertEqual(advanced[0]['video_id'], 'rec2')
+        self.assertEqual(self.index.search('best videos'), [])
+
+    def test_search_view(self):
+        user = User.objects.create_user('reader@example.com', 'reader@example.com', 'password123')
+        self.client.force_login(user)
+
+        with mock.patch('analyzer.views_library.shared_library_index', return_value=self.index):
+            response = self.client.get(reverse('library_search'), {'q': 'recursion', 'level': 'beginner'})
+            invalid = self.client.get(reverse('library_search'), {'q': 'recursion', 'level': 'expert'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['video_id'], 'rec1')
+        self.assertEqual(invalid.status_code, 400)
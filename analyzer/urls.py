@@ -1,6 +1,10 @@
 from django.urls import path
 from . import views
 from . import views_comparison
+from . import views_jobs
+from . import views_quota
+from . import views_metrics
+from . import views_library
 
 urlpatterns = [
     # Public pages
@@ -16,4 +20,13 @@ urlpatterns = [
     # Protected pages (require login)
     path('analyze/', views.video_analyse_QA, name='video_analyse_QA'),
     path('compare/', views_comparison.compare_videos, name='compare'),
+    path('library/search/', views_library.library_search, name='library_search'),
+    
+    # Background analysis jobs
+    path('jobs/<uuid:job_id>/', views_jobs.job_status, name='job_status'),
+    path('jobs/<uuid:job_id>/stream/', views_jobs.job_stream, name='job_stream'),
+    
+    # Operations
+    path('quota/', views_quota.quota_status, name='quota_status'),
+    path('metrics', views_metrics.metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,12 +1,13 @@
-import traceback
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ErrorHandler:
     @staticmethod
     def log_error(error, context=""):
-        """Log errors with context"""
+        """Log errors with context (and the traceback being handled, if any)"""
         error_msg = f"❌ ERROR ({context}): {str(error)}"
-        print(error_msg)
-        print(traceback.format_exc())
+        logger.error("%s", error_msg, exc_info=error)
         return error_msg
     
     @staticmethod
@@ -14,7 +15,9 @@ class ErrorHandler:
         """Convert technical errors to user-friendly messages"""
         error_str = str(error).lower()
         
-        if "quota" in error_str:
+        if "rate limit" in error_str:
+            return "Too many YouTube requests right now. Please try again in a minute."
+        elif "quota" in error_str:
             return "YouTube API quota exceeded. Try again tomorrow or use a different API key."
         elif "transcript" in error_str:
             return "No transcript available for this video. Try a different video with captions."
@@ -0,0 +1,35 @@
+# analyzer/utils/log_filters.py
+#
+# logging filters referenced from LOGGING in guide_tube/settings.py. Filters
+# run only for records that passed the logger's level, so debug calls below
+# the configured level never format their arguments.
+import logging
+import random
+
+
+class TruncateFilter(logging.Filter):
+    """Cut formatted messages to `max_length` characters (transcripts, API payloads)"""
+
+    def __init__(self, max_length=1000):
+        super().__init__()
+        self.max_length = int(max_length)
+
+    def filter(self, record):
+        message = record.getMessage()
+        if len(message) > self.max_length:
+            record.msg = f"{message[:self.max_length]}… [{len(message) - self.max_length} chars truncated]"
+            record.args = None
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """Keep a `rate` share of records below `always_level`; warnings and errors always pass"""
+
+    def __init__(self, rate=1.0, always_level='WARNING'):
+        super().__init__()
+        self.rate = float(rate)
+        self.always_level = logging.getLevelName(always_level)
+
+    def filter(self, record):
+        return record.levelno >= self.always_level or self.rate >= 1.0 or random.random() < self.rate
+
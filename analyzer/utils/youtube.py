@@ -0,0 +1,91 @@
+from urllib.parse import urlparse, parse_qs
+import re
+
+def extract_video_id(url):
+    """
+    Extract YouTube video ID from various URL formats.
+    Supports:
+    - https://www.youtube.com/watch?v=VIDEO_ID
+    - https://youtu.be/VIDEO_ID
+    - https://www.youtube.com/shorts/VIDEO_ID
+    - https://m.youtube.com/watch?v=VIDEO_ID
+    - https://www.youtube.com/embed/VIDEO_ID
+    - https://www.youtube.com/v/VIDEO_ID
+    """
+    if not url:
+        return None
+    
+    # Remove whitespace
+    url = url.strip()
+    
+    # Pattern 1: Standard watch URL with v parameter
+    if 'v=' in url:
+        try:
+            parsed_url = urlparse(url)
+            query_params = parse_qs(parsed_url.query)
+            if 'v' in query_params:
+                video_id = query_params['v'][0]
+                # Video IDs are 11 characters
+                return video_id[:11] if len(video_id) >= 11 else video_id
+        except:
+            pass
+    
+    # Pattern 2: Short URL (youtu.be/VIDEO_ID)
+    if 'youtu.be/' in url:
+        try:
+            video_id = url.split('youtu.be/')[1].split('?')[0].split('&')[0]
+            return video_id[:11] if len(video_id) >= 11 else video_id
+        except:
+            pass
+    
+    # Pattern 3: Shorts URL
+    if '/shorts/' in url:
+        try:
+            video_id = url.split('/shorts/')[1].split('?')[0].split('&')[0]
+            return video_id[:11] if len(video_id) >= 11 else video_id
+        except:
+            pass
+    
+    # Pattern 4: Embed URL
+    if '/embed/' in url:
+        try:
+            video_id = url.split('/embed/')[1].split('?')[0].split('&')[0]
+            return video_id[:11] if len(video_id) >= 11 else video_id
+        except:
+            pass
+    
+    # Pattern 5: /v/ URL
+    if '/v/' in url:
+        try:
+            video_id = url.split('/v/')[1].split('?')[0].split('&')[0]
+            return video_id[:11] if len(video_id) >= 11 else video_id
+        except:
+            pass
+    
+    # Pattern 6: Just the video ID (11 characters, alphanumeric with - and _)
+    # YouTube video IDs are exactly 11 characters: letters, numbers, hyphens, underscores
+    if len(url) == 11:
+        # Check if it's a valid video ID format
+        valid_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
+        if all(char in valid_chars for char in url):
+            return url
+    
+    return None
+
+def parse_duration(duration_iso):
+    """Convert YouTube duration (PT1H15M30S) to minutes"""
+    # PT1H15M30S -> 75.5 minutes
+    hours = re.search(r'(\d+)H', duration_iso)
+    minutes = re.search(r'(\d+)M', duration_iso)
+    seconds = re.search(r'(\d+)S', duration_iso)
+    
+    total_minutes = 0
+    
+    if hours:
+        total_minutes += int(hours.group(1)) * 60
+    if minutes:
+        total_minutes += int(minutes.group(1))
+    if seconds:
+        total_minutes += int(seconds.group(1)) / 60
+    
+    return round(total_minutes, 1)
@@ -1,92 +1,22 @@
+import logging
 from django.shortcuts import render
-import os
-import re
-from googleapiclient.discovery import build
-from .utils.error_handler import ErrorHandler
+from .utils.youtube import extract_video_id
 from .services.rag_service import RAGService
 from .services.qa_service import QAService
+from .services.video_pipeline import VideoPipeline
+from .services.job_queue import JobQueue
+from .services.transcript_store import TranscriptStore
+from .services.stage_timing import stage
+from .models import AnalysisJob
+from .views_jobs import get_job_for_user
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
 from django.conf import settings
-from urllib.parse import urlparse, parse_qs
 
-# ======================
-# UTILITY FUNCTIONS
-# ======================
-
-def extract_video_id(url):
-    """
-    Extract YouTube video ID from various URL formats.
-    Supports:
-    - https://www.youtube.com/watch?v=VIDEO_ID
-    - https://youtu.be/VIDEO_ID
-    - https://www.youtube.com/shorts/VIDEO_ID
-    - https://m.youtube.com/watch?v=VIDEO_ID
-    - https://www.youtube.com/embed/VIDEO_ID
-    - https://www.youtube.com/v/VIDEO_ID
-    """
-    if not url:
-        return None
-    
-    # Remove whitespace
-    url = url.strip()
-    
-    # Pattern 1: Standard watch URL with v parameter
-    if 'v=' in url:
-        try:
-            parsed_url = urlparse(url)
-            query_params = parse_qs(parsed_url.query)
-            if 'v' in query_params:
-                video_id = query_params['v'][0]
-                # Video IDs are 11 characters
-                return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 2: Short URL (youtu.be/VIDEO_ID)
-    if 'youtu.be/' in url:
-        try:
-            video_id = url.split('youtu.be/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 3: Shorts URL
-    if '/shorts/' in url:
-        try:
-            video_id = url.split('/shorts/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 4: Embed URL
-    if '/embed/' in url:
-        try:
-            video_id = url.split('/embed/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 5: /v/ URL
-    if '/v/' in url:
-        try:
-            video_id = url.split('/v/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 6: Just the video ID (11 characters, alphanumeric with - and _)
-    # YouTube video IDs are exactly 11 characters: letters, numbers, hyphens, underscores
-    if len(url) == 11:
-        # Check if it's a valid video ID format
-        valid_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
-        if all(char in valid_chars for char in url):
-            return url
-    
-    return None
+logger = logging.getLogger(__name__)
 
 # ======================
 # HOME PAGE (Landing Page)
@@ -249,24 +179,6 @@ def dashboard_view(request):
 # ======================
 # VIDEO ANALYSIS & Q&A
 # ======================
-def _parse_duration(duration_iso):
-    """Convert YouTube duration (PT1H15M30S) to minutes"""
-    # PT1H15M30S -> 75.5 minutes
-    hours = re.search(r'(\d+)H', duration_iso)
-    minutes = re.search(r'(\d+)M', duration_iso)
-    seconds = re.search(r'(\d+)S', duration_iso)
-    
-    total_minutes = 0
-    
-    if hours:
-        total_minutes += int(hours.group(1)) * 60
-    if minutes:
-        total_minutes += int(minutes.group(1))
-    if seconds:
-        total_minutes += int(seconds.group(1)) / 60
-    
-    return round(total_minutes, 1)
-
 @login_required
 def video_analyse_QA(request):
     """Video analysis page - requires login"""
@@ -274,13 +186,11 @@ def video_analyse_QA(request):
     question_asked = False
     question = ""
     answer_lines = []
+    pending_job = None
     
-    print(f"\n{'='*60}")
-    print(f"🔍 VIDEO ANALYSE REQUEST")
-    print(f"{'='*60}")
-    print(f"Method: {request.method}")
-    print(f"POST data: {dict(request.POST)}")
-    print(f"{'='*60}\n")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Never log field values: form posts can be large and user-supplied
+        logger.debug("🔍 Video analyse request: %s, fields %s", request.method, sorted(request.POST.keys()))
     
     if request.method == 'POST':
         # Check if it's a Q&A question
@@ -289,179 +199,122 @@ def video_analyse_QA(request):
             question = request.POST.get('question', '')
             video_id = request.POST.get('video_id', '')
             video_title = request.POST.get('video_title', '')
-            transcript_text = request.POST.get('transcript_text', '')
-            duration_minutes = request.POST.get('duration_minutes', 60)
             
-            # IMPORTANT: Reconstruct video_info from POST data
-            video_info = {
-                'title': video_title,
-                'video_id': video_id,
-                'has_transcript': True,
-                'transcript_text': transcript_text,
-                'duration_minutes': float(duration_minutes),
-                # Add minimal info needed for display
-                'channel': 'Previous Analysis',
-                'description': 'Video previously analyzed',
-                'word_count': len(transcript_text.split()),
-                'analysis': {'level_score': 'N/A'},
-                'skill_level': 'Beginner'
-            }
+            # The transcript stays on the server; the form only carries its handle
+            transcript = TranscriptStore().load(request.POST.get('transcript_handle', ''))
+            if transcript is None or transcript['video_id'] != video_id:
+                question_asked = False
+                video_info = {
+                    'error': 'This analysis has expired or was not found. Please analyze the video again to ask questions.'
+                }
+            else:
+                transcript_text = transcript['text']
             
-            # ========== USE RAG SERVICE ==========
-            try:
-                rag_service = RAGService()
+                # IMPORTANT: Reconstruct video_info from the stored transcript
+                video_info = {
+                    'title': video_title or transcript['title'],
+                    'video_id': video_id,
+                    'has_transcript': True,
+                    'transcript_handle': transcript['handle'],
+                    'duration_minutes': transcript['duration_minutes'],
+                    # Add minimal info needed for display
+                    'channel': 'Previous Analysis',
+                    'description': 'Video previously analyzed',
+                    'word_count': transcript['word_count'],
+                    'analysis': {'level_score': 'N/A'},
+                    'skill_level': 'Beginner'
+                }
+            
+                # ========== USE RAG SERVICE ==========
+                try:
+                    rag_service = RAGService()
                 
-                # Process transcript first (store in vector DB)
-                print("🔄 Processing transcript for RAG...")
-                chunks_count = rag_service.process_transcript(
-                    transcript_text, 
-                    video_id, 
-                    video_info.get('duration_minutes', 60)
-                )
-                print(f"✅ Processed {chunks_count} chunks")
+                    # Process transcript first (store in vector DB)
+                    logger.debug("🔄 Processing transcript for RAG")
+                    with stage('embedding'):
+                        chunks_count = rag_service.process_transcript(
+                            transcript_text, 
+                            video_id, 
+                            video_info.get('duration_minutes', 60)
+                        )
+                    logger.debug("✅ Processed %d chunks", chunks_count)
                 
-                # Ask question using RAG
-                print(f"🤔 Asking: {question[:50]}...")
-                rag_result = rag_service.ask_question(
-                    question, 
-                    video_id, 
-                    video_title,
-                    video_info.get('duration_minutes', 60)
-                )
+                    # Ask question using RAG
+                    logger.debug("🤔 Asking: %.50s", question)
+                    rag_result = rag_service.ask_question(
+                        question, 
+                        video_id, 
+                        video_title,
+                        video_info.get('duration_minutes', 60)
+                    )
                 
-                # Format answer for display
-                answer_lines = rag_service.format_for_display(rag_result)
-                print("✅ RAG answer generated")
+                    # Format answer for display
+                    answer_lines = rag_service.format_for_display(rag_result)
+                    logger.debug("✅ RAG answer generated")
                 
-            except Exception as e:
-                print(f"❌ RAG Error: {e}")
-                # Fallback to simple Q&A if RAG fails
-                qa_service = QAService()
-                qa_result = qa_service.find_answer_in_transcript(
-                    question, 
-                    transcript_text, 
-                    video_title
-                )
-                answer_lines = qa_service.format_answer_for_display(qa_result)
-            # ========== END RAG ==========
+                except Exception as e:
+                    logger.warning("❌ RAG failed, answering from the transcript instead: %s", e)
+                    # Fallback to simple Q&A if RAG fails
+                    qa_service = QAService()
+                    qa_result = qa_service.find_answer_in_transcript(
+                        question, 
+                        transcript_text, 
+                        video_title
+                    )
+                    answer_lines = qa_service.format_answer_for_display(qa_result)
+                # ========== END RAG ==========
             
         # Original video analysis code
         elif 'video_url' in request.POST:
             video_url = request.POST['video_url']
-            print(f"📹 Video URL submitted: {video_url}")
+            logger.debug("📹 Video URL submitted: %.200s", video_url)
             
             # Extract video ID using comprehensive parser
-            video_id = extract_video_id(video_url)
-            print(f"🔑 Extracted video ID: {video_id}")
+            with stage('url_parse'):
+                video_id = extract_video_id(video_url)
+            logger.debug("🔑 Extracted video ID: %s", video_id)
             
             if not video_id:
                 # Invalid URL format
-                print(f"❌ Invalid video URL format")
+                logger.info("❌ Invalid video URL format: %.200s", video_url)
                 video_info = {
                     'error': 'Invalid YouTube URL. Please enter a valid YouTube video URL. Supported formats: youtube.com/watch?v=..., youtu.be/..., youtube.com/shorts/...'
                 }
-            else:
-                # Get API key from settings
-                API_KEY = settings.YOUTUBE_API_KEY
-                print(f"🔑 API Key loaded: {API_KEY[:20]}..." if API_KEY else "❌ No API KEY")
-                
-                if not API_KEY:
-                    video_info = {
-                        'error': 'YouTube API key is not configured. Please contact the administrator.'
-                    }
+            elif getattr(settings, 'ANALYSIS_BACKGROUND_JOBS', False):
+                # Queue the work and return immediately; the page polls the job
+                job = JobQueue().enqueue(
+                    AnalysisJob.KIND_ANALYZE,
+                    {'video_id': video_id},
+                    user=request.user
+                )
+                logger.info("📨 Queued analysis job %s (%s)", job.pk, job.status)
+                if job.status == AnalysisJob.STATUS_DONE:
+                    video_info = job.result
                 else:
-                    # Fetch video info WITH DURATION
-                    try:
-                        print(f"🌐 Calling YouTube API for video ID: {video_id}")
-                        youtube = build('youtube', 'v3', developerKey=API_KEY)
-                        request_api = youtube.videos().list(
-                            part="snippet,contentDetails",
-                            id=video_id
-                        )
-                        response = request_api.execute()
-                        print(f"✅ API Response received: {len(response.get('items', []))} items")
-                        
-                        if response.get('items') and len(response['items']) > 0:
-                            video = response['items'][0]
-                            
-                            # Get video duration
-                            duration_iso = video['contentDetails']['duration']  # PT1H15M30S
-                            duration_minutes = _parse_duration(duration_iso)
-                            
-                            video_info = {
-                                'title': video['snippet']['title'],
-                                'channel': video['snippet']['channelTitle'],
-                                'description': video['snippet']['description'],
-                                'video_id': video_id,
-                                'duration_minutes': duration_minutes,
-                                'has_transcript': False,
-                                'word_count': 0,
-                                'transcript_text': ''
-                            }
-                            
-                            # Try to get transcript
-                            try:
-                                from youtube_transcript_api import YouTubeTranscriptApi
-                                
-                                # Try with cookies first (helps bypass cloud IP blocks)
-                                try:
-                                    # If you have cookies.txt, use it here
-                                    api = YouTubeTranscriptApi()
-                                    transcript_list = api.list(video_id)
-                                except Exception as cookie_error:
-                                    print(f"⚠️ Transcript fetch with cookies failed: {cookie_error}")
-                                    # Fallback to regular API
-                                    api = YouTubeTranscriptApi()
-                                    transcript_list = api.list(video_id)
-                                
-                                # Try English first, then Hindi, then any available transcript
-                                try:
-                                    transcript_obj = transcript_list.find_transcript(['en'])
-                                except:
-                                    try:
-                                        transcript_obj = transcript_list.find_transcript(['hi'])  # Hindi
-                                    except:
-                                        # Get the first available transcript
-                                        transcript_obj = transcript_list._manually_created_transcripts[0] if transcript_list._manually_created_transcripts else transcript_list._generated_transcripts[0]
-                                
-                                transcript_data = list(transcript_obj.fetch())
-                                
-                                video_info['has_transcript'] = True
-                                video_info['word_count'] = sum(len(snippet.text.split()) for snippet in transcript_data)
-                                video_info['transcript_sample'] = ' '.join([snippet.text for snippet in transcript_data[:5]])
-                                video_info['transcript_full'] = ' '.join([snippet.text for snippet in transcript_data])
-                                video_info['transcript_text'] = video_info['transcript_full']
-                                
-                                # Analyze the transcript
-                                try:
-                                    from .services.analysis_service import TranscriptAnalyzer
-                                    analyzer = TranscriptAnalyzer()
-                                    analysis_results = analyzer.analyze_transcript(video_info['transcript_full'], transcript_data)
-                                    video_info['analysis'] = analysis_results
-                                    video_info['skill_level'] = analysis_results['skill_level']
-                                except Exception as e:
-                                    video_info['analysis_error'] = str(e)
-                                
-                            except Exception as e:
-                                print(f"❌ Transcript Error: {str(e)[:200]}")
-                                video_info['transcript_error'] = str(e)
-                                video_info['transcript_blocked'] = 'RequestBlocked' in str(e)
-                        else:
-                            # Video not found or private/deleted
-                            video_info = {
-                                'error': f'Video not found (ID: {video_id}). The video might be private, deleted, or unavailable in your region.'
-                            }
-                                
-                    except Exception as e:
-                        ErrorHandler.log_error(e, "YouTube API")
-                        video_info = {'error': ErrorHandler.get_user_friendly_error(e)}
+                    pending_job = job
+            else:
+                video_info = VideoPipeline().analyze_video(video_id)
+
+    elif 'job' in request.GET:
+        # Page reloaded by the job poller once the background analysis finished
+        job = get_job_for_user(request, request.GET['job'])
+        if job is None:
+            video_info = {'error': 'Analysis job not found.'}
+        elif job.status == AnalysisJob.STATUS_DONE:
+            video_info = job.result
+        elif job.status == AnalysisJob.STATUS_FAILED:
+            video_info = {'error': job.error or 'Analysis failed. Please try again.'}
+        else:
+            pending_job = job
     
-    return render(request, 'analyzer/video_analyse_QA.html', {
-        'video_info': video_info,
-        'question_asked': question_asked,
-        'question': question,
-        'answer_lines': answer_lines
-    })
+    with stage('render'):
+        return render(request, 'analyzer/video_analyse_QA.html', {
+            'video_info': video_info,
+            'question_asked': question_asked,
+            'question': question,
+            'answer_lines': answer_lines,
+            'pending_job': pending_job
+        })
 
 from django.contrib.auth import logout  # Make sure this import exists
 
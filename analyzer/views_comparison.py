@@ -1,171 +1,59 @@
+import logging
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .services.analysis_service import TranscriptAnalyzer
-from .services.comments_analyzer import CommentsAnalyzer
-from .utils.error_handler import ErrorHandler
-from .services.chapter_extractor import ChapterExtractor
-from .services.explanation_service import ExplanationService
-from .services.learning_path_service import LearningPathService
-import os
-from googleapiclient.discovery import build
 from django.conf import settings
-from urllib.parse import urlparse, parse_qs
-import re
+from .utils.youtube import extract_video_id
+from .services.video_pipeline import VideoPipeline
+from .services.job_queue import JobQueue
+from .services.stage_timing import stage
+from .models import AnalysisJob
+from .views_jobs import get_job_for_user
 
-def extract_video_id(url):
-    """
-    Extract YouTube video ID from various URL formats.
-    Supports:
-    - https://www.youtube.com/watch?v=VIDEO_ID
-    - https://youtu.be/VIDEO_ID
-    - https://www.youtube.com/shorts/VIDEO_ID
-    - https://m.youtube.com/watch?v=VIDEO_ID
-    - https://www.youtube.com/embed/VIDEO_ID
-    - https://www.youtube.com/v/VIDEO_ID
-    """
-    if not url:
-        return None
-    
-    # Remove whitespace
-    url = url.strip()
-    
-    # Pattern 1: Standard watch URL with v parameter
-    if 'v=' in url:
-        try:
-            parsed_url = urlparse(url)
-            query_params = parse_qs(parsed_url.query)
-            if 'v' in query_params:
-                video_id = query_params['v'][0]
-                # Video IDs are 11 characters
-                return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 2: Short URL (youtu.be/VIDEO_ID)
-    if 'youtu.be/' in url:
-        try:
-            video_id = url.split('youtu.be/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 3: Shorts URL
-    if '/shorts/' in url:
-        try:
-            video_id = url.split('/shorts/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 4: Embed URL
-    if '/embed/' in url:
-        try:
-            video_id = url.split('/embed/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 5: /v/ URL
-    if '/v/' in url:
-        try:
-            video_id = url.split('/v/')[1].split('?')[0].split('&')[0]
-            return video_id[:11] if len(video_id) >= 11 else video_id
-        except:
-            pass
-    
-    # Pattern 6: Just the video ID (11 characters, alphanumeric with - and _)
-    # YouTube video IDs are exactly 11 characters: letters, numbers, hyphens, underscores
-    if len(url) == 11:
-        # Check if it's a valid video ID format
-        valid_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
-        if all(char in valid_chars for char in url):
-            return url
-    
-    return None
+logger = logging.getLogger(__name__)
 
-def get_youtube_api():
-    """Get YouTube API instance using Django settings"""
-    API_KEY = settings.YOUTUBE_API_KEY
-    
-    if not API_KEY:
-        raise ValueError('YouTube API key is not configured in settings')
-    
-    return build('youtube', 'v3', developerKey=API_KEY)
+URL_FIELD_PREFIX = 'video_url_'
 
-def calculate_recommendation_score(video, target_level):
-    """Calculate how well this video matches target level"""
-    level_values = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
 
-    video_level = video['skill_level'].lower()
-    level_distance = abs(
-        level_values.get(video_level, 2) -
-        level_values.get(target_level, 2)
+def comparison_urls(post):
+    """
+    URLs from the numbered video_url_N fields (in order) and the video_urls
+    textarea (one per line), without blanks or repeats of the same video
+    (youtu.be and watch?v= links to one video count once).
+    """
+    numbered = sorted(
+        (int(key[len(URL_FIELD_PREFIX):]), value)
+        for key, value in post.items()
+        if key.startswith(URL_FIELD_PREFIX) and key[len(URL_FIELD_PREFIX):].isdigit()
     )
-
-    if level_distance == 0:
-        level_match_score = 100
-    elif level_distance == 1:
-        level_match_score = 70
+    urls = [value for _, value in numbered] + post.get('video_urls', '').splitlines()
+
+    unique = {}
+    for url in (url.strip() for url in urls):
+        if url:
+            # Unparseable URLs are kept (once) so they are reported as invalid
+            unique.setdefault(extract_video_id(url) or url, url)
+    return list(unique.values())
+
+
+def _flash_notice(request, comparison_results):
+    """Turn the pipeline's notice into a flash message"""
+    notice = (comparison_results or {}).get('notice')
+    if not notice:
+        return
+
+    if notice['level'] == 'error':
+        messages.error(request, notice['text'])
+    elif notice['level'] == 'warning':
+        messages.warning(request, notice['text'])
     else:
-        level_match_score = 30
-
-    # Safe access to readability with proper fallback
-    try:
-        readability = video['analysis']['readability'].get('normalized', 50)
-        if readability == 'N/A':
-            readability = 50
-        readability = float(readability) if readability else 50
-    except (KeyError, TypeError, ValueError):
-        readability = 50
-
-    # Safe access to jargon percentage
-    try:
-        jargon = video['analysis']['jargon'].get('percentage', 0)
-        jargon = float(jargon) if jargon else 0
-    except (KeyError, TypeError, ValueError):
-        jargon = 0
-
-    # Safe access to pacing
-    try:
-        pacing = video['analysis']['pacing'].get('words_per_minute', 150)
-        pacing = float(pacing) if pacing else 150
-    except (KeyError, TypeError, ValueError):
-        pacing = 150
-
-    # PROPER PACING SCORE: 130-160 WPM = ideal for learning (research-based)
-    if 130 <= pacing <= 165:
-        pacing_score = 100  # Perfect learning pace
-    elif 110 <= pacing < 130:
-        # Slower than ideal: 100 at 110, declining to 80 at 130
-        pacing_score = 100 - (130 - pacing) * 1.0
-    elif 165 < pacing <= 185:
-        # Faster than ideal: 100 at 165, declining to 60 at 185
-        pacing_score = 100 - (pacing - 165) * 2.0
-    elif pacing < 110:
-        # Too slow
-        pacing_score = max(40, 100 - (110 - pacing) * 1.5)
-    else:  # pacing > 185
-        # Too fast
-        pacing_score = max(30, 100 - (pacing - 185) * 2.5)
-
-    pacing_score = max(0, min(100, pacing_score))
-
-    # PROPER CONTENT SCORE WEIGHTING
-    content_score = (
-        readability * 0.4 +  # Readability is important
-        (100 - min(jargon * 8, 100)) * 0.35 +  # Jargon penalty (8% = 64 penalty)
-        pacing_score * 0.25  # Pacing matters for learning
-    )
-
-    overall_score = (level_match_score * 0.7) + (content_score * 0.3)
-
-    return round(overall_score, 1)
+        messages.success(request, notice['text'])
 
 @login_required
 def compare_videos(request):
     """Multi-video comparison page - requires login"""
     comparison_results = None
+    pending_job = None
 
     # If somehow user bypasses decorator, check again
     if not request.user.is_authenticated:
@@ -173,288 +61,59 @@ def compare_videos(request):
         return redirect(f'/login/?next=/compare/')
     
     if request.method == 'POST':
-        video_urls = []
-        for i in range(1, 5):
-            url_key = f'video_url_{i}'
-            if url_key in request.POST and request.POST[url_key].strip():
-                video_urls.append(request.POST[url_key].strip())
+        video_urls = comparison_urls(request.POST)
+        max_videos = settings.COMPARE_MAX_VIDEOS
+        if len(video_urls) > max_videos:
+            messages.warning(request, f'Comparing the first {max_videos} of {len(video_urls)} videos.')
+            video_urls = video_urls[:max_videos]
 
         target_level = request.POST.get('target_level', 'beginner')
         
-        print(f"\n{'='*60}")
-        print(f"📹 COMPARISON REQUEST RECEIVED")
-        print(f"{'='*60}")
-        print(f"URLs received: {len(video_urls)}")
-        for idx, url in enumerate(video_urls, 1):
-            print(f"  {idx}. {url[:80]}")
-        print(f"Target level: {target_level}")
-        print(f"{'='*60}\n")
+        logger.debug("📹 Comparison request: %d URLs, target level %s", len(video_urls), target_level)
 
         if len(video_urls) >= 2:
-            try:
-                print(f"🔑 Loading YouTube API...")
-                youtube = get_youtube_api()
-                print(f"✅ YouTube API loaded successfully")
-                analyzer = TranscriptAnalyzer()
-                videos_data = []
-                failed_videos = []  # Track failed videos
-
-                for url in video_urls:
-                    video_id = extract_video_id(url)
-                    print(f"🔍 Processing URL: {url}")
-                    print(f"📌 Extracted video_id: {video_id}")
-                    
-                    # ✅ CHECK IF VIDEO ID IS VALID
-                    if not video_id:
-                        failed_videos.append({
-                            'url': url,
-                            'error': 'Invalid YouTube URL format'
-                        })
-                        print(f"❌ Invalid URL format: {url}")
-                        continue
-
-                    try:
-                        # ✅ IMPORTANT: Use same part as working analyze feature
-                        request_api = youtube.videos().list(
-                            part="snippet,contentDetails",
-                            id=video_id
-                        )
-                        
-                        print(f"🌐 Calling YouTube API for: {video_id}")
-                        response = request_api.execute()
-                        
-                        items_count = len(response.get('items', []))
-                        print(f"✅ API Response received: {items_count} item(s)")
-                        print(f"   Response keys: {list(response.keys())}")
-                        
-                    except Exception as api_error:
-                        print(f"❌ API Error for {video_id}: {str(api_error)}")
-                        import traceback
-                        traceback.print_exc()
-                        failed_videos.append({
-                            'url': url,
-                            'video_id': video_id,
-                            'error': f'YouTube API error: {str(api_error)[:100]}'
-                        })
-                        continue
-
-                    items = response.get('items', [])
-                    print(f"   Items list: {items}")
-                    
-                    if not items or len(items) == 0:
-                        # Video not found
-                        print(f"❌ No items returned from API")
-                        failed_videos.append({
-                            'url': url,
-                            'video_id': video_id,
-                            'error': 'Video not found. It may be private, deleted, or unavailable in your region.'
-                        })
-                        print(f"❌ Video not found: {video_id}")
-                        continue
-
-                    print(f"✅ Video found: {video_id}")
-                    video = items[0]
-
-                    from youtube_transcript_api import YouTubeTranscriptApi
-                    
-                    try:
-                        api = YouTubeTranscriptApi()
-                        transcript_list = api.list(video_id)
-                    except Exception as transcript_error:
-                        print(f"⚠️ Transcript blocked for {video_id}: {str(transcript_error)[:150]}")
-                        failed_videos.append({
-                            'url': url,
-                            'video_id': video_id,
-                            'error': 'Transcript unavailable or blocked'
-                        })
-                        # Skip this video if transcript is blocked
-                        continue
-
-                    try:
-                        transcript_obj = transcript_list.find_transcript(['en'])
-                    except:
-                        try:
-                            transcript_obj = transcript_list.find_transcript(['hi'])
-                        except:
-                            transcript_obj = (
-                                transcript_list._manually_created_transcripts[0]
-                                if transcript_list._manually_created_transcripts
-                                else transcript_list._generated_transcripts[0]
-                            )
-
-                    transcript_data = list(transcript_obj.fetch())
-                    transcript_text = ' '.join(
-                        [snippet.text for snippet in transcript_data]
-                    )
-
-                    analysis = analyzer.analyze_transcript(
-                        transcript_text,
-                        transcript_data
-                    )
-
-                    # Add comments analysis
-                    try:
-                        API_KEY = settings.YOUTUBE_API_KEY
-                        comments_analyzer = CommentsAnalyzer(API_KEY)
-                        comments_analysis = comments_analyzer.analyze_video_comments(
-                            video_id,
-                            max_comments=50
-                        )
-                        analysis['comments'] = comments_analysis
-                    except Exception as e:
-                        analysis['comments'] = {
-                            'error': 'Could not analyze comments'
-                        }
-
-                    videos_data.append({
-                        'url': url,
-                        'video_id': video_id,
-                        'title': video['snippet']['title'],
-                        'description': video['snippet']['description'],  # ADD THIS LINE
-                        'channel': video['snippet']['channelTitle'],
-                        'analysis': analysis,
-                        'skill_level': analysis['skill_level'],
-                        'level_score': analysis['level_score'],
-                        'word_count': sum(
-                            len(snippet.text.split())
-                            for snippet in transcript_data
-                        ),
-                        'transcript_text': transcript_text
-                    })
-
-                # ✅ CHECK IF ANY VIDEOS WERE SUCCESSFULLY PROCESSED
-                if not videos_data:
-                    # All videos failed
-                    error_msg = "Unable to process any videos. "
-                    if failed_videos:
-                        error_msg += "Errors: " + "; ".join([f"{v.get('video_id', 'Unknown')}: {v['error']}" for v in failed_videos])
-                    comparison_results = {
-                        'error': error_msg,
-                        'failed_videos': failed_videos
-                    }
-                    messages.error(request, error_msg)
-                elif len(videos_data) < 2:
-                    # Less than 2 videos succeeded
-                    comparison_results = {
-                        'error': f'Only {len(videos_data)} video(s) could be processed. Please provide at least 2 valid YouTube videos.',
-                        'failed_videos': failed_videos,
-                        'videos': videos_data
-                    }
-                    messages.warning(request, f'Only {len(videos_data)} video(s) could be processed. Need at least 2 for comparison.')
+            if getattr(settings, 'ANALYSIS_BACKGROUND_JOBS', False):
+                # Queue the work and return immediately; the page polls the job
+                job = JobQueue().enqueue(
+                    AnalysisJob.KIND_COMPARE,
+                    {'video_urls': video_urls, 'target_level': target_level},
+                    user=request.user
+                )
+                logger.info("📨 Queued comparison job %s (%s)", job.pk, job.status)
+                if job.status == AnalysisJob.STATUS_DONE:
+                    comparison_results = job.result
                 else:
-                    # Success - 2 or more videos processed
-                    comparison_results = {
-                        'videos': videos_data,
-                        'target_level': target_level,
-                        'recommended_video': None,
-                        'comparison_metrics': {},
-                        'failed_videos': failed_videos  # Show which ones failed
-                    }
-
-                    for video in videos_data:
-                        try:
-                            video['recommendation_score'] = calculate_recommendation_score(
-                                video,
-                                target_level
-                            )
-                        except Exception as score_error:
-                            print(f"⚠️ Error calculating score for {video.get('title', 'Unknown')}: {score_error}")
-                            video['recommendation_score'] = 50  # Default middle score
-
-                    videos_data.sort(
-                        key=lambda x: x['recommendation_score'],
-                        reverse=True
-                    )
-
-                    comparison_results['recommended_video'] = videos_data[0]
-                    comparison_results['videos'] = videos_data
-                    
-                    # Generate explanations for recommended video
-                    try:
-                        explanation_service = ExplanationService()
-                        comparison_results['why_this_video'] = explanation_service.generate_why_this_video(
-                            videos_data[0], 
-                            target_level
-                        )
-                    except Exception as exp_error:
-                        print(f"⚠️ Error generating explanation: {exp_error}")
-                        comparison_results['why_this_video'] = "Unable to generate explanation"
-                    
-                    # Make sure we have transcript text in the video data
-                    try:
-                        comparison_results['pre_watch_summary'] = explanation_service.generate_pre_watch_summary(
-                            videos_data[0]  # Now has transcript_text
-                        )
-                    except Exception as summary_error:
-                        print(f"⚠️ Error generating summary: {summary_error}")
-                        comparison_results['pre_watch_summary'] = "Unable to generate summary"
-                    
-                    # Add learning path suggestions
-                    try:
-                        learning_service = LearningPathService()
-
-                        # Get chapters for the recommended video
-                        chapter_extractor = ChapterExtractor()
-                        description = videos_data[0].get('description', '')
-                        chapters = chapter_extractor.extract_chapters_from_description(description)
-
-                        comparison_results['learning_path'] = learning_service.generate_learning_path(
-                            videos_data[0]['title'],
-                            chapters,
-                            videos_data[0]['skill_level'],
-                            videos_data[0].get('word_count', 0)
-                        )
-                    except Exception as path_error:
-                        print(f"⚠️ Error generating learning path: {path_error}")
-                        comparison_results['learning_path'] = "Unable to generate learning path"
-                    
-                    def get_level_display_name(level):
-                        return level.title()
-
-                    level_videos = [
-                        v for v in videos_data
-                        if v['skill_level'].lower() == target_level
-                    ]
-
-                    if level_videos:
-                        level_videos.sort(
-                            key=lambda x: x['recommendation_score'],
-                            reverse=True
-                        )
-                        comparison_results[f'best_for_{target_level}'] = level_videos[0]
-                        comparison_results['best_for_level_display'] = get_level_display_name(
-                            target_level
-                        )
-                    else:
-                        level_values = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
-                        closest_video = min(
-                            videos_data,
-                            key=lambda v: abs(
-                                level_values.get(v['skill_level'].lower(), 2) -
-                                level_values.get(target_level, 2)
-                            )
-                        )
-                        comparison_results[f'best_for_{target_level}'] = closest_video
-                        comparison_results['best_for_level_display'] = get_level_display_name(
-                            target_level
-                        )
-                    
-                    # Show success message with any failed videos
-                    if failed_videos:
-                        messages.warning(request, f'{len(videos_data)} videos successfully compared. {len(failed_videos)} video(s) failed.')
-                    else:
-                        messages.success(request, f'Successfully compared {len(videos_data)} videos!')
-
-            except Exception as e:
-                ErrorHandler.log_error(e, "Video Comparison")
-                comparison_results = {
-                    'error': ErrorHandler.get_user_friendly_error(e)
-                }
-
-    return render(
-        request,
-        'analyzer/compare.html',
-        {
-            'comparison_results': comparison_results
-        }
-    )
\ No newline at end of file
+                    pending_job = job
+            else:
+                comparison_results = VideoPipeline().compare_videos(video_urls, target_level)
+                _flash_notice(request, comparison_results)
+        else:
+            comparison_results = {'error': 'Please enter at least 2 YouTube URLs to compare.'}
+
+    elif 'job' in request.GET:
+        # Page reloaded by the job poller once the background comparison finished
+        job = get_job_for_user(request, request.GET['job'])
+        if job is None:
+            comparison_results = {'error': 'Comparison job not found.'}
+        elif job.status == AnalysisJob.STATUS_DONE:
+            comparison_results = job.result
+            _flash_notice(request, comparison_results)
+        elif job.status == AnalysisJob.STATUS_FAILED and (job.result or {}).get('error'):
+            # compare_videos reported the failure itself (with failed_videos and a notice)
+            comparison_results = job.result
+            _flash_notice(request, comparison_results)
+        elif job.status == AnalysisJob.STATUS_FAILED:
+            comparison_results = {'error': job.error or 'Comparison failed. Please try again.'}
+        else:
+            pending_job = job
+
+    with stage('render'):
+        return render(
+            request,
+            'analyzer/compare.html',
+            {
+                'comparison_results': comparison_results,
+                'pending_job': pending_job,
+                'compare_max_videos': settings.COMPARE_MAX_VIDEOS
+            }
+        )
@@ -0,0 +1,58 @@
+import json
+import time
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse, StreamingHttpResponse, Http404
+from .models import AnalysisJob
+
+# How long a single status stream stays open before the browser reconnects
+STREAM_MAX_SECONDS = 300
+STREAM_POLL_SECONDS = 1.0
+
+
+def get_job_for_user(request, job_id):
+    """Load a job the current user is allowed to see, or None"""
+    try:
+        job = AnalysisJob.objects.get(pk=job_id)
+    except (AnalysisJob.DoesNotExist, ValidationError, ValueError):
+        return None
+
+    if job.user_id is not None and job.user_id != request.user.id:
+        return None
+    return job
+
+
+@login_required
+def job_status(request, job_id):
+    """Polling endpoint: current status and progress of a background job"""
+    job = get_job_for_user(request, job_id)
+    if job is None:
+        raise Http404('Job not found')
+
+    return JsonResponse(job.to_status_dict())
+
+
+@login_required
+def job_stream(request, job_id):
+    """Server-Sent Events stream of job status until the job finishes"""
+    job = get_job_for_user(request, job_id)
+    if job is None:
+        raise Http404('Job not found')
+
+    def events():
+        last_sent = None
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+
+        while time.monotonic() < deadline:
+            current = AnalysisJob.objects.get(pk=job.pk).to_status_dict()
+            if current != last_sent:
+                yield f"data: {json.dumps(current)}\n\n"
+                last_sent = current
+            if current['finished']:
+                return
+            time.sleep(STREAM_POLL_SECONDS)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,30 @@
+import time
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from .services.library_index import LEVELS, shared_library_index
+
+MAX_RESULTS = 50
+
+
+@login_required
+def library_search(request):
+    """Best stored videos for a topic and level, e.g. ?q=recursion&level=beginner (no YouTube/LLM calls)"""
+    query = request.GET.get('q', '').strip()
+    level = request.GET.get('level', '').lower() or None
+    if level is not None and level not in LEVELS:
+        return JsonResponse({'error': f"level must be one of {', '.join(LEVELS)}"}, status=400)
+    try:
+        limit = max(1, min(MAX_RESULTS, int(request.GET.get('limit', 10))))
+    except ValueError:
+        limit = 10
+
+    index = shared_library_index()
+    started = time.perf_counter()
+    results = index.search(query, level=level, limit=limit)
+    return JsonResponse({
+        'query': query,
+        'level': level,
+        'results': results,
+        'indexed_videos': len(index),
+        'took_ms': round((time.perf_counter() - started) * 1000, 2),
+    })
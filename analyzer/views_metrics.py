@@ -0,0 +1,18 @@
+import hmac
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from .services.stage_timing import REGISTRY
+
+
+def metrics(request):
+    """Prometheus scrape endpoint (this process's request and stage latencies)"""
+    if not getattr(settings, 'METRICS_ENABLED', False):
+        raise Http404('Metrics are disabled')
+
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return HttpResponse('Unauthorized', status=401)
+
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from .services.quota_governor import QuotaGovernor
+
+
+@staff_member_required
+def quota_status(request):
+    """Current YouTube Data API spend (staff only)"""
+    return JsonResponse(QuotaGovernor().current_spend())
@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+#
+# The analyzers read their tuning settings (tokenizer, readability sampling)
+# from guide_tube.settings; benchmarks that don't set up Django still need
+# to say where the settings live.
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'guide_tube.settings')
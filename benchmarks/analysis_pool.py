@@ -0,0 +1,59 @@
+# benchmarks/analysis_pool.py
+#
+# Throughput of AnalysisExecutor (analyze_compact per transcript) inline and
+# with 1..N pre-warmed worker processes. Needs the NLTK data from download_nltk.py.
+#
+#   python -m benchmarks.analysis_pool [--videos 24] [--minutes 20] [--max-processes 4]
+import argparse
+import os
+import time
+
+from analyzer.services.analysis_executor import AnalysisExecutor
+from analyzer.services.nlp_resources import english_stopwords
+from analyzer.services.transcript_ingest import IngestedTranscript
+from benchmarks.synthetic import make_snippets
+
+
+def run(executor, transcripts):
+    started = time.perf_counter()
+    futures = [
+        executor.submit(f'video{index}', 'Python functions', transcript)
+        for index, transcript in enumerate(transcripts)
+    ]
+    for future in futures:
+        future.result()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--videos', type=int, default=24)
+    parser.add_argument('--minutes', type=float, default=20.0)
+    parser.add_argument('--max-processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    try:
+        english_stopwords()
+    except LookupError:
+        raise SystemExit(f"NLTK data missing - run `python download_nltk.py` first")
+
+    transcripts = [
+        IngestedTranscript.from_snippets(make_snippets(args.minutes / 60, seed=seed))
+        for seed in range(args.videos)
+    ]
+    print(f"{args.videos} transcripts of {args.minutes:g} min, {os.cpu_count()} CPUs")
+
+    baseline = None
+    for processes in range(0, args.max_processes + 1):
+        # start() pays process spawn + NLTK loading before the clock starts
+        with AnalysisExecutor(processes).start() as executor:
+            seconds = run(executor, transcripts)
+
+        baseline = baseline or seconds
+        label = 'inline' if processes == 0 else f'{processes} processes'
+        print(f"  {label:<12} {seconds:6.2f} s  {args.videos / seconds:6.1f} videos/s "
+              f"({baseline / seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/analyzer_resources.py
+#
+# Import-time and per-request cost of constructing the analyzers, comparing
+# the old per-instance resource loading with the shared nlp_resources.
+#
+#   python -m benchmarks.analyzer_resources [--requests 200]
+import argparse
+import subprocess
+import sys
+import time
+
+
+def import_seconds(module, runs=5):
+    """Best-of-N wall time of a fresh interpreter importing `module`"""
+    baseline = best_of(runs, [sys.executable, '-c', 'pass'])
+    return best_of(runs, [sys.executable, '-c', f'import {module}']) - baseline
+
+
+def best_of(runs, command):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, check=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def legacy_construct():
+    """What TranscriptAnalyzer() + TopicDetector() cost per request before"""
+    from nltk.corpus import stopwords
+    set(stopwords.words('english'))
+    set(['algorithm', 'variable', 'function', 'class', 'object', 'loop', 'array', 'database',
+         'api', 'framework', 'syntax', 'compiler', 'interpreter', 'debugging', 'python'])
+    set(stopwords.words('english'))
+    {'programming': ['code'], 'data': ['data'], 'design': ['design']}
+
+
+def shared_construct():
+    from analyzer.services.analysis_service import TranscriptAnalyzer
+    from analyzer.services.topic_detector import TopicDetector
+    TranscriptAnalyzer()
+    TopicDetector()
+
+
+def per_request_ms(construct, requests):
+    construct()  # first use pays for loading in both cases
+    started = time.perf_counter()
+    for _ in range(requests):
+        construct()
+    return (time.perf_counter() - started) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    for module in ('analyzer.services.analysis_service', 'analyzer.services.topic_detector'):
+        print(f"import {module:<36} {import_seconds(module) * 1000:7.1f} ms")
+
+    try:
+        legacy = per_request_ms(legacy_construct, args.requests)
+        shared = per_request_ms(shared_construct, args.requests)
+    except LookupError:
+        print("NLTK stopwords are not installed - run download_nltk.py first")
+        return
+
+    print(f"per request: legacy {legacy:.3f} ms, shared {shared:.4f} ms ({legacy / shared:,.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/cascade.py
+#
+# Cascade ranking on synthetic comparison candidates: cheap screening of
+# every candidate vs full analyze_transcript for every candidate, and how
+# well the screen's shortlist agrees with the full ranking. Comment fetches
+# (at least one commentThreads.list call per fully evaluated video) are
+# counted, not made. Needs the NLTK data from download_nltk.py.
+#
+#   python -m benchmarks.cascade [--candidates 40] [--finalists 5] [--level beginner]
+import argparse
+import random
+import time
+
+from analyzer.services.analysis_service import TranscriptAnalyzer
+from analyzer.services.cascade_ranker import CascadeRanker, agreement, cheap_analysis
+from analyzer.services.transcript_ingest import IngestedTranscript
+from benchmarks.synthetic import HINGLISH_WORDS, WORDS, make_snippets
+
+JARGON_WORDS = (
+    'the compiler resolves the interpreter syntax of each algorithm framework api database '
+    'class object function variable loop array debugging before runtime optimization'
+).split()
+
+TITLES = ('Python functions', 'Python for beginners', 'Advanced Python internals', 'Recursion explained',
+          'Python crash course', 'Deep dive into recursion')
+
+
+def make_candidates(count, seed=7):
+    rng = random.Random(seed)
+    candidates = []
+    for index in range(count):
+        vocabulary = rng.choice((WORDS, WORDS, JARGON_WORDS, HINGLISH_WORDS))
+        snippets = make_snippets(
+            hours=rng.uniform(8, 40) / 60, words_per_minute=rng.randint(100, 220),
+            seed=seed + index, vocabulary=vocabulary
+        )
+        candidates.append((f'video{index:03d}', rng.choice(TITLES), IngestedTranscript.from_snippets(snippets)))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--candidates', type=int, default=40)
+    parser.add_argument('--finalists', type=int, default=5)
+    parser.add_argument('--level', default='beginner', choices=('beginner', 'intermediate', 'advanced'))
+    args = parser.parse_args()
+
+    try:
+        analyzer = TranscriptAnalyzer()
+    except LookupError:
+        raise SystemExit("NLTK data missing - run `python download_nltk.py` first")
+
+    candidates = make_candidates(args.candidates)
+    ranker = CascadeRanker(args.level, args.finalists)
+
+    started = time.perf_counter()
+    screened = {
+        video_id: {'skill_level': analysis['skill_level'], 'analysis': analysis}
+        for video_id, title, transcript in candidates
+        for analysis in [cheap_analysis(title, transcript)]
+    }
+    screen_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    full = {
+        video_id: {'skill_level': analysis['skill_level'], 'analysis': analysis}
+        for video_id, title, transcript in candidates
+        for analysis in [analyzer.analyze_transcript(transcript.text, transcript)]
+    }
+    full_seconds = time.perf_counter() - started
+
+    per_video = full_seconds / len(candidates)
+    cascade_seconds = screen_seconds + per_video * min(args.finalists, len(candidates))
+    report = agreement(
+        {video_id: ranker.score(video) for video_id, video in screened.items()},
+        {video_id: ranker.score(video) for video_id, video in full.items()},
+        args.finalists
+    )
+
+    print(f"{len(candidates)} candidates, top {args.finalists} fully evaluated, target level {args.level}")
+    print(f"  {'full evaluation':<18} {full_seconds * 1000:9.1f} ms, {len(candidates)} comment fetches")
+    print(f"  {'cascade':<18} {cascade_seconds * 1000:9.1f} ms "
+          f"({full_seconds / cascade_seconds:.1f}x), {args.finalists} comment fetches "
+          f"(screening {screen_seconds * 1000:.1f} ms)")
+    print(f"  kendall tau {report['kendall_tau']}, best video shortlisted: {report['best_is_finalist']}, "
+          f"top-{args.finalists} recall {report['top_k_recall']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/comment_embeddings.py
+#
+# EmbeddingCommentClassifier throughput on the shared multilingual model:
+# one encode() call per comment vs batched encoding. Every comment gets a
+# distinct suffix so the classifier's de-duplication doesn't flatter it.
+# Needs the SentenceTransformer model to be downloaded (or cached).
+#
+#   python -m benchmarks.comment_embeddings [--comments 2000] [--batch-size 64]
+import argparse
+import time
+
+from analyzer.services.comment_classifier import NEUTRAL, EmbeddingCommentClassifier, label_counts
+from analyzer.services.embedding_model import shared_embedding_model
+from benchmarks.synthetic import make_comments
+
+
+def best_ms(function, comments, runs=3):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function(comments)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--comments', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    try:
+        model = shared_embedding_model()
+    except Exception as e:
+        raise SystemExit(f"Embedding model unavailable ({e}); download it once with network access.")
+
+    comments = [f"{comment} #{index}" for index, comment in enumerate(make_comments(args.comments))]
+    classifier = EmbeddingCommentClassifier(model=model, batch_size=args.batch_size)
+    classifier.classify(comments[:10])  # encode the prototypes outside the timing
+    misses = [comment for comment, label in zip(comments, classifier.keywords.classify(comments))
+              if label == NEUTRAL]
+
+    sample = misses[:200]
+    single_ms = best_ms(lambda texts: [classifier._encode([text]) for text in texts], sample) / len(sample)
+    batch_ms = best_ms(classifier.classify, comments)
+    counts = label_counts(classifier.classify(comments))['labels']
+    print(f"{len(comments):,} comments, {len(misses):,} without a keyword hit (encoded)")
+    print(f"  {'one at a time':<16} {single_ms * len(misses):9.1f} ms (extrapolated from {len(sample)})")
+    print(f"  {'batched':<16} {batch_ms:9.1f} ms, {len(comments) / batch_ms * 1000:,.0f} comments/s")
+    print(f"  labels: {counts}")
+
+
+if __name__ == '__main__':
+    main()
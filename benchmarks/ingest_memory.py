@@ -0,0 +1,61 @@
+# benchmarks/ingest_memory.py
+#
+# Peak memory of turning fetched snippets into text/word count/sample,
+# the old way (list copy + two full joins + per-snippet split) vs IngestedTranscript.
+#
+#   python -m benchmarks.ingest_memory [--hours 10]
+import argparse
+import gc
+import time
+import tracemalloc
+
+from analyzer.services.transcript_ingest import IngestedTranscript
+from benchmarks.synthetic import make_snippets
+
+
+def legacy_ingest(fetched):
+    """What the views did before: list(), two identical joins and split() counts"""
+    transcript_data = list(fetched)
+    transcript_full = ' '.join([snippet.text for snippet in transcript_data])
+    transcript_text = ' '.join([snippet.text for snippet in transcript_data])
+    word_count = sum(len(snippet.text.split()) for snippet in transcript_data)
+    sample = ' '.join([snippet.text for snippet in transcript_data[:5]])
+    # TranscriptAnalyzer.analyze_pacing counted the words again
+    pacing_words = sum(len(snippet.text.split()) for snippet in transcript_data)
+    return transcript_data, transcript_full, transcript_text, word_count, sample, pacing_words
+
+
+def single_pass_ingest(fetched):
+    return IngestedTranscript.from_snippets(fetched)
+
+
+def measure(label, ingest, fetched):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = ingest(fetched)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<12} peak {peak / 2**20:7.2f} MiB | retained {retained / 2**20:7.2f} MiB | {elapsed * 1000:7.1f} ms")
+    del result
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=10.0)
+    args = parser.parse_args()
+
+    fetched = make_snippets(args.hours)
+    words = sum(len(snippet.text.split()) for snippet in fetched)
+    print(f"{args.hours:g}h synthetic transcript: {len(fetched):,} snippets, {words:,} words")
+
+    before = measure('legacy', legacy_ingest, fetched)
+    after = measure('single-pass', single_pass_ingest, fetched)
+    print(f"peak memory reduced by {(1 - after / before) * 100:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# benchmarks/keyword_matcher.py
+#
+# Per-term counts for every lexicon in nlp_resources: one `text.count(term)`
+# scan per term vs one KeywordMatcher scan (which also respects word boundaries).
+#
+#   python -m benchmarks.keyword_matcher [--hours 10]
+import argparse
+import time
+
+from analyzer.services.nlp_resources import lexicon_matcher
+from benchmarks.synthetic import make_text
+
+
+def best_ms(function, text, runs=5):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=10.0)
+    args = parser.parse_args()
+
+    matcher = lexicon_matcher()
+    stems = [term.rstrip('*') for term in matcher.terms]
+
+    for hours in (0.25, args.hours):
+        text = make_text(hours).lower()
+        scans_ms, scanned = best_ms(lambda t: {stem: t.count(stem) for stem in stems}, text)
+        matcher_ms, counted = best_ms(matcher.counts, text)
+
+        # Substring hits the matcher rejects, e.g. 'ai' inside "again"
+        rejected = sum(scanned.values()) - sum(counted.values())
+        print(f"{hours:g}h, {len(text):,} chars, {len(stems)} terms")
+        print(f"  {'substring scans':<16} {scans_ms:7.1f} ms")
+        print(f"  {'KeywordMatcher':<16} {matcher_ms:7.1f} ms ({scans_ms / matcher_ms:.1f}x), "
+              f"{rejected:,} substring hits inside other words dropped")
+
+
+if __name__ == '__main__':
+    main()
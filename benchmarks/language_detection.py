@@ -0,0 +1,51 @@
+# benchmarks/language_detection.py
+#
+# Time per call of the shared language detector on 100k-character texts,
+# next to the per-character loop TranscriptAnalyzer used before.
+#
+#   python -m benchmarks.language_detection
+import time
+
+from analyzer.services.language_detection import detect_language
+from benchmarks.synthetic import make_text
+
+CHARS = 100_000
+
+
+def char_loop_language(text):
+    """The detector TranscriptAnalyzer shipped with (two Python passes over every character)"""
+    hindi_chars = ['़', 'ऽ', 'ा', 'ि', 'ी', 'ु', 'ू', 'े', 'ै', 'ो', 'ौ', 'ं', 'ः', 'ँ']
+    english_chars = sum(1 for char in text if 'a' <= char.lower() <= 'z')
+    hindi_count = sum(1 for char in text if char in hindi_chars)
+    if not text:
+        return 'en'
+    if hindi_count / len(text) > 0.1:
+        return 'hi'
+    if english_chars / len(text) > 0.5:
+        return 'en'
+    return 'hi' if hindi_count else 'en'
+
+
+def per_call_ms(function, text, calls):
+    function(text)
+    started = time.perf_counter()
+    for _ in range(calls):
+        result = function(text)
+    return (time.perf_counter() - started) / calls * 1000, result
+
+
+def main():
+    for hindi_share in (0.0, 0.5, 1.0):
+        text = make_text(2, hindi_share=hindi_share)
+        text = (text * (CHARS // len(text) + 1))[:CHARS]
+
+        loop_ms, loop_language = per_call_ms(char_loop_language, text, calls=5)
+        new_ms, new_language = per_call_ms(detect_language, text, calls=500)
+
+        print(f"{len(text):,} chars, {hindi_share:.0%} Hindi snippets")
+        print(f"  {'char loop':<12} {loop_ms:8.3f} ms  -> {loop_language}")
+        print(f"  {'vectorized':<12} {new_ms:8.3f} ms  -> {new_language} ({loop_ms / new_ms:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
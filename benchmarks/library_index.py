@@ -0,0 +1,82 @@
+# benchmarks/library_index.py
+#
+# LibraryIndex over a synthetic library: time to index N stored analyses, to
+# add one more, and per-query latency for "best <level> videos about <topic>".
+#
+#   python -m benchmarks.library_index [--videos 20000] [--queries 200]
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+LEVELS = ('Beginner', 'Intermediate', 'Advanced')
+
+
+def make_rows(count, vocabulary, seed=11):
+    rng = random.Random(seed)
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Zipf-like topic popularity: a few subjects have most of the videos
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rows = []
+    for index in range(count):
+        terms = set(rng.choices(vocabulary, weights, k=10))
+        rows.append({
+            'video_id': f'video{index:06d}',
+            'title': ' '.join(rng.sample(sorted(terms), 2)),
+            'analysis': {
+                'skill_level': rng.choice(LEVELS),
+                'readability': {'normalized': rng.uniform(30, 90)},
+                'jargon': {'percentage': rng.uniform(0, 25)},
+                'pacing': {'words_per_minute': rng.randint(100, 220)},
+            },
+            'topics': {'key_terms': [[term, rng.randint(2, 40)] for term in terms], 'domain': 'programming'},
+            'updated_at': started + timedelta(seconds=index),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--videos', type=int, default=20_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--vocabulary', type=int, default=3_000)
+    args = parser.parse_args()
+
+    # The index module imports the VideoAnalysis model
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'guide_tube.settings')
+    django.setup()
+    from analyzer.services.library_index import LibraryIndex
+
+    vocabulary = [f'topic{index}' for index in range(args.vocabulary)]
+    rows = make_rows(args.videos + 1, vocabulary)
+    index = LibraryIndex()
+
+    started = time.perf_counter()
+    index.add_rows(rows[:-1])
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.add_rows(rows[-1:])
+    add_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(3)
+    # No database here: only the in-memory search is timed
+    index.refresh = lambda force=False: 0
+    timings = []
+    for _ in range(args.queries):
+        query = f"best {rng.choice(LEVELS).lower()} videos about {rng.choice(vocabulary[:200])}"
+        started = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(f"{len(index):,} videos, {args.vocabulary:,} topic terms")
+    print(f"  {'build':<14} {build_seconds:8.2f} s")
+    print(f"  {'add one':<14} {add_ms:8.3f} ms")
+    print(f"  {'query median':<14} {statistics.median(timings):8.3f} ms (max {max(timings):.3f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/readability.py
+#
+# textstat (flesch_reading_ease + flesch_kincaid_grade) vs the one-pass,
+# memoized readability engine on a long punctuated lecture, plus the
+# stratified-sample estimate and its confidence interval.
+#
+#   python -m benchmarks.readability [--words 100000] [--sample 500]
+import argparse
+import random
+import time
+from unittest import mock
+
+from analyzer.services import readability
+from benchmarks.synthetic import make_text
+
+
+def lecture(words, seed=7):
+    """Synthetic transcript with a sentence end every ~12 words"""
+    rng = random.Random(seed)
+    tokens = make_text(words / 150 / 60).split()[:words]
+    return ' '.join(token + ('.' if rng.random() < 1 / 12 else '') for token in tokens) + '.'
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=100_000)
+    parser.add_argument('--sample', type=int, default=500)
+    args = parser.parse_args()
+
+    import textstat
+    text = lecture(args.words)
+
+    patches = []
+    if not readability._pronunciations():
+        # No cmudict here: keep textstat from downloading it, so both sides use pyphen
+        print('cmudict not installed: syllables from pyphen on both sides')
+        patches.append(mock.patch('textstat.backend.counts._count_syllables.get_cmudict', return_value=None))
+
+    for patch in patches:
+        patch.start()
+    try:
+        textstat_ms, (flesch, grade) = timed(
+            lambda: (textstat.flesch_reading_ease(text), textstat.flesch_kincaid_grade(text))
+        )
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    readability.count_syllables.cache_clear()
+    cold_ms, exact = timed(readability.readability_scores, text, sample_sentences=0)
+    warm_ms, _ = timed(readability.readability_scores, text, sample_sentences=0)
+    sample_ms, sampled = timed(readability.readability_scores, text, sample_sentences=args.sample)
+
+    print(f"{args.words:,} words, {exact['sentences']:,} sentences")
+    print(f"  {'textstat':<24} {textstat_ms:8.1f} ms  flesch {flesch:6.2f}  grade {grade:5.2f}")
+    print(f"  {'engine (cold memo)':<24} {cold_ms:8.1f} ms  flesch {exact['flesch']:6.2f}  grade {exact['fk_grade']:5.2f}")
+    print(f"  {'engine (warm memo)':<24} {warm_ms:8.1f} ms")
+    low, high = sampled['flesch_ci']
+    label = f"sample of {sampled['sampled']}"
+    print(f"  {label:<24} {sample_ms:8.1f} ms  flesch {sampled['flesch']:6.2f}"
+          f"  (95% CI {low:.2f}-{high:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+# benchmarks/suite.py
+#
+# Offline micro-benchmarks of every analyzer hot path on synthetic transcripts
+# (1k-200k words; English, Hindi, Hinglish) and on recorded fixtures in
+# benchmarks/fixtures/. Results are written as JSON and compared with a saved
+# baseline: a case whose median is more than --threshold slower is flagged and
+# the command exits with status 1.
+#
+#   python -m benchmarks.suite [--quick] [--only analyze_transcript] [--output benchmarks/results.json]
+#   python -m benchmarks.suite --save-baseline        # after a deliberate change
+#   python -m benchmarks.suite --record VIDEO_ID      # add a fixture (needs network)
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from benchmarks.synthetic import (
+    FakeSnippet, HINGLISH_WORDS, make_comments, make_description, make_snippets
+)
+
+BENCHMARKS = Path(__file__).resolve().parent
+FIXTURES = BENCHMARKS / 'fixtures'
+BASELINE = BENCHMARKS / 'baseline.json'
+
+SIZES = {'1k': 1_000, '10k': 10_000, '50k': 50_000, '200k': 200_000}
+QUICK_SIZES = ('1k', '10k')
+LANGUAGES = {
+    'en': {},
+    'hi': {'hindi_share': 0.8},
+    'hinglish': {'vocabulary': HINGLISH_WORDS},
+}
+WORDS_PER_MINUTE = 150
+
+
+def setup_django():
+    # CommentsAnalyzer and the analysis store import Django models
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'guide_tube.settings')
+    django.setup()
+
+
+def synthetic_transcripts(sizes):
+    from analyzer.services.transcript_ingest import IngestedTranscript
+
+    transcripts = {}
+    for language, options in LANGUAGES.items():
+        for size in sizes:
+            hours = SIZES[size] / WORDS_PER_MINUTE / 60
+            transcripts[f'{language}-{size}'] = IngestedTranscript.from_snippets(
+                make_snippets(hours, words_per_minute=WORDS_PER_MINUTE, **options)
+            )
+    return transcripts
+
+
+def fixture_transcripts():
+    """Recorded transcripts: benchmarks/fixtures/<name>.json, as written by --record"""
+    from analyzer.services.transcript_ingest import IngestedTranscript
+
+    transcripts = {}
+    for path in sorted(FIXTURES.glob('*.json')):
+        snippets = json.loads(path.read_text(encoding='utf-8'))['snippets']
+        transcripts[f'fixture-{path.stem}'] = IngestedTranscript.from_snippets(
+            FakeSnippet(*snippet) for snippet in snippets
+        )
+    return transcripts
+
+
+def record_fixture(video_id, name=None):
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    fetched = YouTubeTranscriptApi().fetch(video_id, languages=['en', 'hi'])
+    FIXTURES.mkdir(exist_ok=True)
+    path = FIXTURES / f'{name or video_id}.json'
+    path.write_text(json.dumps({
+        'video_id': video_id,
+        'language': fetched.language_code,
+        'snippets': [[snippet.text, snippet.start, snippet.duration] for snippet in fetched],
+    }, ensure_ascii=False), encoding='utf-8')
+    print(f"📼 Recorded {len(fetched.snippets)} snippets to {path}")
+
+
+def build_cases(transcripts):
+    """(name, callable) for every benchmark; callables take no arguments"""
+    from analyzer.services.analysis_service import TranscriptAnalyzer
+    from analyzer.services.chapter_extractor import ChapterExtractor
+    from analyzer.services.comments_analyzer import CommentsAnalyzer
+    from analyzer.services.rag_service import RAGService
+    from analyzer.services.recommendation import calculate_recommendation_score
+    from analyzer.services.topic_detector import TopicDetector
+
+    cases = []
+    # Skip __init__: no vector store, embedding model or API client is needed
+    rag = RAGService.__new__(RAGService)
+    comments = CommentsAnalyzer.__new__(CommentsAnalyzer)
+
+    for key, transcript in transcripts.items():
+        minutes = transcript.word_count / WORDS_PER_MINUTE
+        cases += [
+            (f'analyze_transcript/{key}',
+             lambda t=transcript: TranscriptAnalyzer().analyze_transcript(t.text, t)),
+            (f'detect_topics/{key}',
+             lambda t=transcript: TopicDetector().detect_topics(t.text, 'Python functions tutorial')),
+            (f'chunk_transcript/{key}',
+             lambda t=transcript, m=minutes: rag._chunk_transcript(t.text, m)),
+        ]
+
+    description = make_description()
+    cases.append(('extract_chapters/60-chapters',
+                  lambda: ChapterExtractor().extract_chapters_from_description(description)))
+
+    comment_texts = make_comments(500)
+    cases.append(('score_comments/500', lambda: comments.score_comments(comment_texts)))
+
+    videos = [
+        {
+            'skill_level': level,
+            'analysis': {
+                'readability': {'normalized': 40 + index % 50},
+                'jargon': {'percentage': index % 12},
+                'pacing': {'words_per_minute': 100 + index % 100},
+            },
+        }
+        for index, level in enumerate(['Beginner', 'Intermediate', 'Advanced'] * 334)
+    ]
+    cases.append(('recommendation_score/1000-videos',
+                  lambda: [calculate_recommendation_score(video, 'beginner') for video in videos]))
+    return cases
+
+
+def measure(function, min_runs=3, max_runs=50, budget_seconds=1.0):
+    """Median/min wall time of repeated calls: at least min_runs, then until the budget is spent"""
+    timings = []
+    spent = 0.0
+    while len(timings) < min_runs or (spent < budget_seconds and len(timings) < max_runs):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+        spent += timings[-1]
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'runs': len(timings),
+    }
+
+
+def run_cases(cases, only=None):
+    results = {}
+    # The services print progress; keep it out of the report
+    with open(os.devnull, 'w') as devnull:
+        for name, function in cases:
+            if only and not any(pattern in name for pattern in only):
+                continue
+            try:
+                with redirect_stdout(devnull):
+                    function()  # warm-up: lazy resources and caches
+                    result = measure(function)
+            except LookupError:
+                result = {'skipped': 'NLTK data missing - run download_nltk.py'}
+            results[name] = result
+            print(format_result(name, result))
+    return results
+
+
+def format_result(name, result):
+    if 'skipped' in result:
+        return f"  {name:<42} skipped ({result['skipped']})"
+    return f"  {name:<42} {result['median_ms']:10.2f} ms  (min {result['min_ms']:.2f}, {result['runs']} runs)"
+
+
+def compare(results, baseline, threshold):
+    """Names of cases slower than baseline * (1 + threshold); prints every change beyond it"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name, {})
+        if 'median_ms' not in result or 'median_ms' not in before:
+            continue
+
+        ratio = result['median_ms'] / before['median_ms']
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            print(f"  ❌ {name}: {before['median_ms']:.2f} -> {result['median_ms']:.2f} ms ({ratio:.2f}x)")
+        elif ratio < 1 - threshold:
+            print(f"  ✅ {name}: {before['median_ms']:.2f} -> {result['median_ms']:.2f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def environment():
+    from django.conf import settings
+    from analyzer.services.analysis_store import analyzer_version
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'analyzer_version': analyzer_version(),
+        'tokenizer': settings.ANALYZER_TOKENIZER,
+        'readability_sample_sentences': settings.READABILITY_SAMPLE_SENTENCES,
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--quick', action='store_true', help=f"Only the {'/'.join(QUICK_SIZES)} transcripts")
+    parser.add_argument('--only', action='append', help='Run cases whose name contains this (repeatable)')
+    parser.add_argument('--output', default=str(BENCHMARKS / 'results.json'), help='Where to write this run')
+    parser.add_argument('--baseline', default=str(BASELINE), help='Saved results to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Flag cases whose median is this fraction slower than the baseline')
+    parser.add_argument('--record', metavar='VIDEO_ID', help='Save a YouTube transcript as a fixture and exit')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixture(args.record)
+        return
+
+    setup_django()
+    transcripts = synthetic_transcripts(QUICK_SIZES if args.quick else SIZES)
+    transcripts.update(fixture_transcripts())
+    print(f"⏱️ {len(transcripts)} transcripts, {os.cpu_count()} CPUs")
+
+    report = {'environment': environment(), 'results': run_cases(build_cases(transcripts), args.only)}
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"📄 Results written to {args.output}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"📌 Baseline saved to {args.baseline}")
+        return
+
+    if not Path(args.baseline).exists():
+        print('No baseline yet - run with --save-baseline to create one')
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+    print(f"Compared with {args.baseline} (analyzer {baseline['environment'].get('analyzer_version')}):")
+    regressions = compare(report['results'], baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
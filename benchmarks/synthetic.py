@@ -0,0 +1,81 @@
+# benchmarks/synthetic.py
+#
+# Synthetic transcripts for the benchmark scripts (no network needed).
+import random
+from dataclasses import dataclass
+
+WORDS = (
+    'so now we will define a function that takes a list and returns the sum '
+    'of every element this is called recursion because the function calls itself '
+    'python django variable loop array database api framework class object '
+    'let us look at the example again and then we will move on to the next part'
+).split()
+
+HINDI_WORDS = 'अब हम एक फंक्शन बनाएंगे जो लिस्ट लेता है और उसका योग देता है'.split()
+
+HINGLISH_WORDS = (
+    'toh ab hum ek function banayenge jo list leta hai aur uska sum return karta hai '
+    'yeh recursion hai kyunki function khud ko call karta hai python variable loop '
+    'array database chalo example dekhte hai phir next part pe jayenge samajh aaya'
+).split()
+
+COMMENTS = (
+    'thank you sir, very helpful video',
+    'samajh aa gaya, bahut badhiya explanation',
+    'the recursion part was confusing',
+    'can you explain the database section again?',
+    'first!',
+    'mujhe samajh nahi aaya last wala part',
+    'explained well, easy to understand',
+    'which editor is this',
+)
+
+
+@dataclass
+class FakeSnippet:
+    """Same shape as youtube_transcript_api's FetchedTranscriptSnippet"""
+    text: str
+    start: float
+    duration: float
+
+
+def make_snippets(hours=10.0, words_per_minute=150, hindi_share=0.0, seed=42, vocabulary=WORDS):
+    """Snippets of 6-12 words, spoken at `words_per_minute`, covering `hours`"""
+    rng = random.Random(seed)
+    total_words = int(hours * 60 * words_per_minute)
+    seconds_per_word = 60.0 / words_per_minute
+
+    snippets = []
+    start = 0.0
+    produced = 0
+    while produced < total_words:
+        count = rng.randint(6, 12)
+        words = HINDI_WORDS if rng.random() < hindi_share else vocabulary
+        text = ' '.join(rng.choice(words) for _ in range(count))
+        duration = count * seconds_per_word
+        snippets.append(FakeSnippet(text, round(start, 2), round(duration, 2)))
+        start += duration
+        produced += count
+    return snippets
+
+
+def make_text(hours=10.0, **kwargs):
+    return ' '.join(snippet.text for snippet in make_snippets(hours, **kwargs))
+
+
+def make_comments(count=500, seed=42):
+    """Lowercased comment texts, as CommentsAnalyzer scores them"""
+    rng = random.Random(seed)
+    return [rng.choice(COMMENTS) for _ in range(count)]
+
+
+def make_description(chapters=60, seed=42):
+    """A video description with `chapters` timestamped chapter lines"""
+    rng = random.Random(seed)
+    lines = ['In this course we learn Python from scratch.', '', 'Chapters:']
+    for index in range(chapters):
+        minutes, seconds = divmod(index * 97, 60)
+        topic = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title()
+        lines.append(f"{minutes}:{seconds:02d} - {topic}")
+    lines += ['', 'Follow us for more tutorials!']
+    return '\n'.join(lines)
@@ -0,0 +1,63 @@
+# benchmarks/tokenization.py
+#
+# CPU time of the tokenization work behind one analysis: the old separate
+# word_tokenize/split passes vs one shared TokenizedTranscript.
+#
+#   python -m benchmarks.tokenization [--hours 1]
+import argparse
+import time
+from collections import Counter
+
+from analyzer.services.nlp_resources import english_stopwords
+from analyzer.services.tokenized_transcript import TokenizedTranscript
+from benchmarks.synthetic import make_text
+
+
+def legacy_passes(text, title):
+    """analyze_jargon, TopicDetector._extract_key_terms and the chunker, as before"""
+    from nltk.tokenize import word_tokenize
+    stop_words = english_stopwords()
+
+    jargon_words = [w for w in word_tokenize(text.lower()) if w.isalnum() and w not in stop_words]
+    topic_words = [w.lower() for w in word_tokenize(f"{title} {text}".lower()) if w.isalnum() and len(w) > 2]
+    topic_counts = Counter(w for w in topic_words if w not in stop_words)
+    chunk_words = text.split()
+    return len(jargon_words), topic_counts, len(chunk_words)
+
+
+def shared_pass(text, title):
+    tokenized = TokenizedTranscript(text)
+    title_words = TokenizedTranscript(title).content_words
+    topic_counts = Counter(w for w in title_words if len(w) > 2)
+    topic_counts.update({w: c for w, c in tokenized.counts.items() if len(w) > 2})
+    return len(tokenized.content_words), topic_counts, len(tokenized.words)
+
+
+def cpu_seconds(function, *args):
+    started = time.process_time()
+    function(*args)
+    return time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=1.0)
+    args = parser.parse_args()
+
+    text = make_text(args.hours)
+    title = 'Python functions and recursion for beginners'
+    print(f"{args.hours:g}h synthetic transcript: {len(text.split()):,} words")
+
+    try:
+        legacy_passes(title, title)  # load Punkt before timing
+    except LookupError:
+        print("NLTK punkt/stopwords are not installed - run download_nltk.py first")
+        return
+
+    legacy = cpu_seconds(legacy_passes, text, title)
+    shared = cpu_seconds(shared_pass, text, title)
+    print(f"legacy {legacy * 1000:.0f} ms CPU, shared {shared * 1000:.0f} ms CPU ({(1 - shared / legacy) * 100:.0f}% less)")
+
+
+if __name__ == '__main__':
+    main()
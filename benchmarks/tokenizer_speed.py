@@ -0,0 +1,53 @@
+# benchmarks/tokenizer_speed.py
+#
+# NLTK word_tokenize vs the regex tokenizer (ANALYZER_TOKENIZER=regex) on
+# synthetic transcripts, plus how many alphanumeric words differ.
+#
+#   python -m benchmarks.tokenizer_speed [--hours 1]
+import argparse
+import time
+
+from analyzer.services.fast_tokenizer import regex_word_tokenize
+from benchmarks.synthetic import make_text
+
+
+def best_ms(function, text, runs=3):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=1.0)
+    args = parser.parse_args()
+
+    from nltk.tokenize import word_tokenize
+    try:
+        word_tokenize('warm up.')
+        nltk_label, nltk_tokenize = 'nltk', word_tokenize
+    except LookupError:
+        # Without Punkt data only the Treebank half can run: a lower bound for NLTK
+        nltk_label = 'nltk (Treebank only, Punkt not installed)'
+        def nltk_tokenize(text):
+            return word_tokenize(text, preserve_line=True)
+
+    for hindi_share in (0.0, 0.5):
+        text = make_text(args.hours, hindi_share=hindi_share)
+        nltk_ms, nltk_tokens = best_ms(nltk_tokenize, text)
+        regex_ms, regex_tokens = best_ms(regex_word_tokenize, text)
+
+        nltk_words = [t for t in nltk_tokens if t.isalnum()]
+        regex_words = [t for t in regex_tokens if t.isalnum()]
+        differing = sum(a != b for a, b in zip(nltk_words, regex_words)) + abs(len(nltk_words) - len(regex_words))
+
+        print(f"{args.hours:g}h, {hindi_share:.0%} Hindi, {len(text.split()):,} words")
+        print(f"  {nltk_label:<42} {nltk_ms:8.1f} ms")
+        print(f"  {'regex':<42} {regex_ms:8.1f} ms ({nltk_ms / regex_ms:.1f}x), {differing} words differ")
+
+
+if __name__ == '__main__':
+    main()
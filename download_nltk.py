@@ -3,4 +3,5 @@ import nltk
 # Download required NLTK data
 nltk.download('punkt', quiet=False)
 nltk.download('stopwords', quiet=False)
+nltk.download('cmudict', quiet=False)  # syllable counts for readability
 print("✅ NLTK data downloaded successfully!")
\ No newline at end of file
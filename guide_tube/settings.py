@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'analyzer.middleware.StageTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,6 +83,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Web and worker processes share this file; wait for locks instead of failing
+            'timeout': 20,
+        },
     }
 }
 
@@ -130,3 +135,92 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # API Keys
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY', '')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')
+
+
+# Background analysis jobs (run workers with `python manage.py run_analysis_worker`)
+ANALYSIS_BACKGROUND_JOBS = os.getenv('ANALYSIS_BACKGROUND_JOBS', 'False') == 'True'
+ANALYSIS_WORKER_PROCESSES = int(os.getenv('ANALYSIS_WORKER_PROCESSES', '2'))
+ANALYSIS_JOB_RESULT_TTL_HOURS = int(os.getenv('ANALYSIS_JOB_RESULT_TTL_HOURS', '24'))
+# Hours a transcript kept for Q&A stays available after its last analysis (then it is deleted)
+STORED_TRANSCRIPT_TTL_HOURS = int(os.getenv('STORED_TRANSCRIPT_TTL_HOURS', '168'))
+# Pre-warmed processes for CPU-bound transcript analysis in each web/worker process (0 = analyze inline)
+ANALYSIS_POOL_SIZE = int(os.getenv('ANALYSIS_POOL_SIZE', str(min(4, os.cpu_count() or 1))))
+
+# Transcript analysis: 'nltk' (Treebank + Punkt) or 'regex' (faster, no NLTK data needed)
+ANALYZER_TOKENIZER = os.getenv('ANALYZER_TOKENIZER', 'nltk').strip().lower()
+# Sentences sampled to estimate readability of long transcripts (0 = exact)
+READABILITY_SAMPLE_SENTENCES = int(os.getenv('READABILITY_SAMPLE_SENTENCES', '0'))
+
+# Q&A vector index: in-memory unless this names a directory to keep it in (needed by analyze_bulk --index)
+CHROMA_PERSIST_DIR = os.getenv('CHROMA_PERSIST_DIR', '')
+
+# Video comparison: most URLs per request, and how many are fetched/analyzed at once
+COMPARE_MAX_VIDEOS = int(os.getenv('COMPARE_MAX_VIDEOS', '50'))
+COMPARE_CONCURRENCY = int(os.getenv('COMPARE_CONCURRENCY', '4'))
+# Above this many candidates, all are screened cheaply and only these get the full analysis (0 = all)
+COMPARE_FINALISTS = int(os.getenv('COMPARE_FINALISTS', '5'))
+
+# Viewer comments: most read per video (paging stops sooner once scores are stable)
+COMMENT_MAX_COMMENTS = int(os.getenv('COMMENT_MAX_COMMENTS', '500'))
+# 'keyword', or 'embedding' to also label comments the keyword lists miss (loads the multilingual model)
+COMMENT_CLASSIFIER = os.getenv('COMMENT_CLASSIFIER', 'keyword').strip().lower()
+
+# Library search (/library/search/): seconds between checks for newly stored analyses
+LIBRARY_INDEX_REFRESH_SECONDS = float(os.getenv('LIBRARY_INDEX_REFRESH_SECONDS', '5'))
+
+# YouTube Data API quota governor (shared by web, worker and batch processes)
+YOUTUBE_QUOTA_DAILY_BUDGET = int(os.getenv('YOUTUBE_QUOTA_DAILY_BUDGET', '10000'))
+YOUTUBE_QUOTA_RATE_PER_SECOND = float(os.getenv('YOUTUBE_QUOTA_RATE_PER_SECOND', '5'))
+YOUTUBE_QUOTA_BURST = int(os.getenv('YOUTUBE_QUOTA_BURST', '20'))
+# Share of the daily budget and burst that batch jobs may not use
+YOUTUBE_QUOTA_BATCH_RESERVE = float(os.getenv('YOUTUBE_QUOTA_BATCH_RESERVE', '0.2'))
+
+# Per-stage timing: Server-Timing headers and a Prometheus /metrics endpoint
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False') == 'True'
+# When set, /metrics requires `Authorization: Bearer <token>`
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Logging: LOG_LEVEL for everything under `analyzer`, LOG_LEVELS to override
+# subsystems, e.g. LOG_LEVELS=analyzer.services.rag_service=DEBUG,analyzer.views=WARNING
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = dict(
+    (name.strip(), level.strip().upper())
+    for name, _, level in (item.partition('=') for item in os.getenv('LOG_LEVELS', '').split(','))
+    if name.strip() and level.strip()
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {
+            'format': '%(asctime)s %(levelname)s %(name)s [%(process)d] %(message)s',
+        },
+    },
+    'filters': {
+        'truncate': {
+            '()': 'analyzer.utils.log_filters.TruncateFilter',
+            'max_length': int(os.getenv('LOG_MAX_MESSAGE_CHARS', '1000')),
+        },
+        # Share of DEBUG/INFO records kept under load; warnings and errors always pass
+        'sample': {
+            '()': 'analyzer.utils.log_filters.SampleFilter',
+            'rate': float(os.getenv('LOG_SAMPLE_RATE', '1.0')),
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'plain',
+            'filters': ['sample', 'truncate'],
+        },
+    },
+    'loggers': {
+        'analyzer': {
+            'handlers': ['console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        **{name: {'level': level} for name, level in LOG_LEVELS.items()},
+    },
+}